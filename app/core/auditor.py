@@ -2,136 +2,397 @@
 Core audit engine
 """
 import asyncio
+import time
+from dataclasses import asdict
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import logging
 
 from app.data.merchant_loader import Merchant
 from app.core.browser import BrowserManager
-from app.detectors.footer_klarna_logo_detector import FooterKlarnaLogoDetector
+from app.core.host_limiter import HostLimiter
+from app.core.retry import (
+    RETRYABLE, NavigationError, StageError, backoff_delay, classify_error
+)
+from app.detectors import DETECTORS
 from app.report.report_generator import AuditResult, ReportGenerator
+from app.core.result_cache import ResultCache, detector_version, page_fingerprint
+from app.utils.memory import MemoryWatermark
+from app.utils.metrics import RpcCounter
+from app.utils.profiling import MerchantProfiler
+from app.utils.timeouts import AdaptiveTimeouts, is_timeout
 
 logger = logging.getLogger(__name__)
 
 
+def detector_rules(detector: Any) -> List[Tuple[str, str]]:
+    """
+    (rule_id, description) of every rule a detector reports
+
+    Single-rule detectors define RULE_ID and DESCRIPTION; detectors reporting
+    several rules (e.g. RuleSetDetector) list them in `rules`.
+    """
+    rules = getattr(detector, "rules", None)
+    if rules is not None:
+        return list(rules)
+    return [(detector.RULE_ID, detector.DESCRIPTION)]
+
+
 class Auditor:
     """Core audit engine"""
 
-    def __init__(self, headless: bool = True, timeout: int = 30000, max_retries: int = 2):
+    # Audit stages, in order; a retry resumes from the first stage without output
+    STAGES = ("navigate", "fingerprint", "page_source", "detect", "screenshot")
+
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 30000,
+        max_retries: int = 2,
+        retry_backoff: float = 1.0,
+        rpc_counter: Optional[RpcCounter] = None,
+        profiler: Optional[MerchantProfiler] = None,
+        timeouts: Optional[AdaptiveTimeouts] = None,
+        limiter: Optional[HostLimiter] = None,
+        memory: Optional[MemoryWatermark] = None,
+        cache: Optional[ResultCache] = None,
+        detectors: Optional[Sequence[Any]] = None
+    ):
         """
         Initialize auditor
         
         Args:
             headless: Run browser in headless mode
             timeout: Page load timeout in milliseconds
-            max_retries: Maximum number of retries for failed audits
+            max_retries: Maximum number of retries for transient failures
+            retry_backoff: Base backoff delay in seconds (doubled per retry, with jitter)
+            rpc_counter: Optional counter attributing Playwright calls to merchants
+            profiler: Optional profiler wrapping selected merchants in cProfile/tracing
+            timeouts: Optional adaptive timeouts (navigation timeout learned per domain)
+            limiter: Optional per-host limiter/circuit breaker shared by all audits
+            memory: Optional watermark sampling each merchant's JS heap after detection
+            cache: Optional result cache; unchanged pages reuse their previous result
+            detectors: Detectors run on each merchant's homepage, sharing one
+                navigation and page source (default: the FOOTER_KLARNA_LOGO detector)
+
+        Raises:
+            ValueError: If two detectors report the same rule ID
         """
         self.headless = headless
         self.timeout = timeout
         self.max_retries = max_retries
-        self.detector = FooterKlarnaLogoDetector()
+        self.retry_backoff = retry_backoff
+        self.rpc_counter = rpc_counter
+        self.profiler = profiler
+        self.timeouts = timeouts
+        self.limiter = limiter
+        self.memory = memory
+        self.cache = cache
+        self.detectors = list(detectors) if detectors else DETECTORS.instantiate("FOOTER_KLARNA_LOGO")
+        self.rules = [rule for detector in self.detectors for rule in detector_rules(detector)]
+        rule_ids = [rule_id for rule_id, _ in self.rules]
+        duplicates = sorted({rule_id for rule_id in rule_ids if rule_ids.count(rule_id) > 1})
+        if duplicates:
+            raise ValueError(f"Rules reported by more than one detector: {', '.join(duplicates)}")
+        self.detector_versions = {
+            rule_id: detector_version(detector)
+            for detector in self.detectors for rule_id, _ in detector_rules(detector)
+        }
+
+    def _rpc_scope(self, merchant: Merchant):
+        """Scope Playwright call counting to a merchant and its page's rules"""
+        if self.rpc_counter is None:
+            return nullcontext()
+        check = self.rules[0][0] if len(self.rules) == 1 else "homepage"
+        return self.rpc_counter.scope(merchant=merchant.merchant_id, check=check)
+
+    def _failed_results(
+        self,
+        merchant: Merchant,
+        timestamp: str,
+        message: str,
+        error: str,
+        screenshot_path: Optional[str] = None,
+        audit_status: str = "failed",
+        **fields: Any
+    ) -> List[AuditResult]:
+        """One failed (or skipped) AuditResult per rule"""
+        return [
+            AuditResult(
+                merchant_id=merchant.merchant_id,
+                merchant_name=merchant.merchant_name,
+                base_url=merchant.base_url,
+                audit_status=audit_status,
+                audit_timestamp=timestamp,
+                rule_id=rule_id,
+                rule_description=description,
+                passed=False,
+                confidence=0.0,
+                matched_selectors=[],
+                message=message,
+                error=error,
+                screenshot_path=screenshot_path,
+                **fields
+            )
+            for rule_id, description in self.rules
+        ]
+
+    def skipped_results(self, merchant: Merchant, reason: str) -> List[AuditResult]:
+        """
+        Results for a merchant that is not audited (e.g. unreachable in preflight)
+
+        Args:
+            merchant: Merchant skipped
+            reason: Why it was skipped
+
+        Returns:
+            One skipped AuditResult per rule
+        """
+        return self._failed_results(
+            merchant,
+            datetime.now().isoformat() + "Z",
+            f"Skipped: {reason}",
+            reason,
+            audit_status="skipped"
+        )
 
     async def audit_merchant(
         self,
         merchant: Merchant,
-        screenshot_dir: str,
-        retry_count: int = 0
-    ) -> AuditResult:
+        screenshot_dir: str
+    ) -> List[AuditResult]:
         """
         Audit a single merchant
         
+        The audit runs in stages (see STAGES). A failed stage is classified;
+        transient network failures and timeouts are retried with exponential
+        backoff and jitter, resuming from the failed stage while the browser is
+        still usable. Permanent failures and detector bugs are not retried.
+        All detectors run on the same navigation and page source.
+        
         Args:
             merchant: Merchant to audit
             screenshot_dir: Directory to save screenshots
-            retry_count: Current retry attempt
             
         Returns:
-            AuditResult object
+            One AuditResult per rule, in detector order
         """
-        browser = None
         timestamp = datetime.now().isoformat() + "Z"
-        screenshot_path = None
-        error = None
+        browser = None
+        profile_session = None
+        state: Dict[str, Any] = {}  # stage -> output of the completed stage
+        timings: Dict[str, float] = {}
+        attempt = 0
+        failure: Optional[StageError] = None
 
+        logger.info(f"Auditing {merchant.merchant_name} ({merchant.merchant_id})")
         try:
-            # Initialize browser
-            browser = BrowserManager(headless=self.headless, timeout=self.timeout)
-            await browser.start()
+            while True:
+                try:
+                    if browser is None or not browser.is_alive():
+                        if browser is not None:
+                            logger.info(f"Browser for {merchant.merchant_id} is no longer usable, restarting from navigation")
+                            if self.profiler:
+                                # Save the abandoned attempt's trace while its context still exists
+                                await self.profiler.save_attempt_trace(profile_session, attempt)
+                            await browser.close()
+                        # A new browser has none of the page state of earlier stages
+                        state.clear()
+                        browser = await self._start_browser(timings)
+                        if self.profiler:
+                            if profile_session is None:
+                                profile_session = await self.profiler.start(merchant.merchant_id, browser.context)
+                            else:
+                                await self.profiler.resume_tracing(profile_session, browser.context)
 
-            # Navigate to homepage
-            logger.info(f"Auditing {merchant.merchant_name} ({merchant.merchant_id})")
-            success = await browser.navigate(merchant.homepage_url, wait_time=3000)
-            
-            if not success:
-                raise Exception(f"Failed to navigate to {merchant.homepage_url}")
+                    await self._run_stages(merchant, browser, screenshot_dir, state, timings)
+                    failure = None
+                    break
 
-            # Get page source
-            page_source = await browser.get_page_source()
+                except StageError as e:
+                    failure = e
+                    logger.error(f"Error auditing {merchant.merchant_name}: {e}")
+                    if e.kind not in RETRYABLE or attempt >= self.max_retries:
+                        break
+                    delay = backoff_delay(attempt, base=self.retry_backoff)
+                    attempt += 1
+                    logger.info(
+                        f"Retrying {merchant.merchant_name} from stage '{e.stage}' in {delay:.1f}s "
+                        f"(attempt {attempt}/{self.max_retries})"
+                    )
+                    await asyncio.sleep(delay)
 
-            # Run detection
-            detection_result = await self.detector.detect(page_source, browser)
+        finally:
+            if self.profiler:
+                await self.profiler.finish(profile_session, failed=failure is not None)
+            if browser:
+                await browser.close()
 
-            # Capture screenshot
-            screenshot_filename = f"{merchant.merchant_id}_{self.detector.RULE_ID}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            screenshot_path = str(Path(screenshot_dir) / screenshot_filename)
-            await browser.capture_screenshot(screenshot_path)
+        if failure is not None:
+            error_msg = str(failure.cause)
+            return self._failed_results(
+                merchant,
+                timestamp,
+                f"Audit failed at {failure.stage} ({failure.kind.value}): {error_msg}",
+                error_msg,
+                screenshot_path=state.get("screenshot"),
+                timings=timings,
+                failure_kind=failure.kind.value,
+                attempts=attempt + 1
+            )
 
-            # Create audit result
+        cached = state.get("cached", {})
+        if len(cached) == len(self.rules):
+            logger.info(f"Page unchanged for {merchant.merchant_name}, reusing cached results")
+
+        results = []
+        for rule_id, description in self.rules:
+            if rule_id in cached:
+                results.append(AuditResult(**{
+                    **cached[rule_id],
+                    "audit_timestamp": timestamp,
+                    "timings": timings,
+                    "attempts": attempt + 1,
+                    "cached": True
+                }))
+                continue
+
+            detection_result = state["detect"][rule_id]
             result = AuditResult(
                 merchant_id=merchant.merchant_id,
                 merchant_name=merchant.merchant_name,
                 base_url=merchant.base_url,
                 audit_status="completed",
                 audit_timestamp=timestamp,
-                rule_id=self.detector.RULE_ID,
-                rule_description="Detect Klarna logo in footer",
+                rule_id=rule_id,
+                rule_description=description,
                 passed=detection_result.passed,
                 confidence=detection_result.confidence,
                 matched_selectors=detection_result.matched_selectors,
-                screenshot_path=screenshot_path,
+                screenshot_path=state["screenshot"],
                 message=detection_result.message,
-                error=None
+                error=None,
+                timings=timings,
+                attempts=attempt + 1
             )
+            if self.cache:
+                self.cache.store(
+                    merchant.merchant_id, rule_id, merchant.homepage_url,
+                    state["fingerprint"], self.detector_versions[rule_id], asdict(result)
+                )
+            results.append(result)
 
-            logger.info(f"Completed audit for {merchant.merchant_name}: {'PASSED' if result.passed else 'FAILED'}")
-            return result
+        passed = sum(1 for r in results if r.passed)
+        logger.info(f"Completed audit for {merchant.merchant_name}: {passed}/{len(results)} rules passed")
+        return results
 
+    async def _start_browser(self, timings: Dict[str, float]) -> BrowserManager:
+        """Launch a browser, classifying launch failures"""
+        started = time.perf_counter()
+        browser = BrowserManager(headless=self.headless, timeout=self.timeout, limiter=self.limiter)
+        try:
+            await browser.start()
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Error auditing {merchant.merchant_name}: {error_msg}")
-            
-            # Retry logic
-            if retry_count < self.max_retries:
-                logger.info(f"Retrying {merchant.merchant_name} (attempt {retry_count + 1}/{self.max_retries})")
-                await asyncio.sleep(2)  # Wait before retry
-                return await self.audit_merchant(merchant, screenshot_dir, retry_count + 1)
-
-            # Return failed result
-            return AuditResult(
-                merchant_id=merchant.merchant_id,
-                merchant_name=merchant.merchant_name,
-                base_url=merchant.base_url,
-                audit_status="failed",
-                audit_timestamp=timestamp,
-                rule_id=self.detector.RULE_ID,
-                rule_description="Detect Klarna logo in footer",
-                passed=False,
-                confidence=0.0,
-                matched_selectors=[],
-                screenshot_path=screenshot_path,
-                message=f"Audit failed: {error_msg}",
-                error=error_msg
-            )
-
+            await browser.close()
+            raise StageError("browser_start", classify_error(e), e) from e
         finally:
-            if browser:
-                await browser.close()
+            timings["browser_start"] = round((time.perf_counter() - started) * 1000, 1)
+        return browser
+
+    async def _run_stages(
+        self,
+        merchant: Merchant,
+        browser: BrowserManager,
+        screenshot_dir: str,
+        state: Dict[str, Any],
+        timings: Dict[str, float]
+    ) -> None:
+        """Run the stages not yet completed, recording their outputs in state"""
+        for stage in self.STAGES:
+            if stage in state:
+                continue
+            started = time.perf_counter()
+            try:
+                state[stage] = await self._run_stage(stage, merchant, browser, screenshot_dir, state)
+            except Exception as e:
+                raise StageError(stage, classify_error(e), e) from e
+            finally:
+                timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+
+            if stage == "fingerprint" and self.cache:
+                cached = {}
+                for rule_id, _ in self.rules:
+                    entry = self.cache.lookup(
+                        merchant.merchant_id, rule_id, merchant.homepage_url,
+                        state["fingerprint"], self.detector_versions[rule_id]
+                    )
+                    if entry is not None:
+                        cached[rule_id] = entry
+                state["cached"] = cached
+                if len(cached) == len(self.rules):
+                    return
+
+    async def _run_stage(
+        self,
+        stage: str,
+        merchant: Merchant,
+        browser: BrowserManager,
+        screenshot_dir: str,
+        state: Dict[str, Any]
+    ) -> Any:
+        """Run a single stage and return its output"""
+        if stage == "navigate":
+            url = merchant.homepage_url
+            nav_timeout = self.timeouts.timeout(url, "goto", self.timeout) if self.timeouts else self.timeout
+            if not await browser.navigate(url, wait_time=3000, timeout=nav_timeout):
+                if self.timeouts and browser.last_error is not None and is_timeout(browser.last_error):
+                    # Censored sample: the page took at least nav_timeout
+                    self.timeouts.record_timeout(url, "goto", nav_timeout)
+                raise browser.last_error or NavigationError(url, message=f"Failed to navigate to {url}")
+            if self.timeouts and browser.last_goto_ms is not None:
+                # page.goto only: no host limiter queueing, no fixed post-navigation wait
+                self.timeouts.record(url, "goto", browser.last_goto_ms)
+            return url
+
+        if stage == "fingerprint":
+            if self.cache is None:
+                return None
+            return await page_fingerprint(browser.page, browser.last_headers)
+
+        if stage == "page_source":
+            return await browser.get_page_source_view()
+
+        if stage == "detect":
+            cached = state.get("cached", {})
+            detections = {}
+            for detector in self.detectors:
+                # Detectors whose rules are all cached are skipped
+                if all(rule_id in cached for rule_id, _ in detector_rules(detector)):
+                    continue
+                outcome = await detector.detect(state["page_source"], browser)
+                for detection_result in (outcome if isinstance(outcome, list) else [outcome]):
+                    detections[detection_result.rule_id] = detection_result
+            if self.memory:
+                await self.memory.check(browser.page, merchant.merchant_id)
+            return detections
+
+        if stage == "screenshot":
+            # One screenshot of the page serves as evidence for all its rules
+            screenshot_filename = f"{merchant.merchant_id}_homepage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            screenshot_path = str(Path(screenshot_dir) / screenshot_filename)
+            if not await browser.capture_screenshot(screenshot_path):
+                raise browser.last_error or RuntimeError(f"Failed to capture screenshot {screenshot_path}")
+            return screenshot_path
+
+        raise ValueError(f"Unknown stage: {stage}")
 
     async def audit_all(
         self,
         merchants: List[Merchant],
-        screenshot_dir: str
+        screenshot_dir: str,
+        concurrency: int = 1
     ) -> List[AuditResult]:
         """
         Audit all merchants
@@ -139,36 +400,36 @@ class Auditor:
         Args:
             merchants: List of merchants to audit
             screenshot_dir: Directory to save screenshots
+            concurrency: Maximum number of merchants audited at the same time
             
         Returns:
-            List of AuditResult objects
+            List of AuditResult objects (in input order, one per merchant and rule)
         """
-        results = []
-        
         # Create screenshot directory
         Path(screenshot_dir).mkdir(parents=True, exist_ok=True)
 
-        for merchant in merchants:
-            try:
-                result = await self.audit_merchant(merchant, screenshot_dir)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Unexpected error processing {merchant.merchant_id}: {e}")
-                # Create error result
-                results.append(AuditResult(
-                    merchant_id=merchant.merchant_id,
-                    merchant_name=merchant.merchant_name,
-                    base_url=merchant.base_url,
-                    audit_status="failed",
-                    audit_timestamp=datetime.now().isoformat() + "Z",
-                    rule_id=self.detector.RULE_ID,
-                    rule_description="Detect Klarna logo in footer",
-                    passed=False,
-                    confidence=0.0,
-                    matched_selectors=[],
-                    screenshot_path=None,
-                    message=f"Unexpected error: {str(e)}",
-                    error=str(e)
-                ))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-        return results
+        async def audit_one(merchant: Merchant) -> List[AuditResult]:
+            # A profiled merchant waits for the running audits to drain and runs alone
+            profiled = self.profiler.slot(merchant.merchant_id) if self.profiler else nullcontext()
+            async with semaphore, profiled:
+                return await self._audit_isolated(merchant, screenshot_dir)
+
+        per_merchant = await asyncio.gather(*(audit_one(m) for m in merchants))
+        return [result for results in per_merchant for result in results]
+
+    async def _audit_isolated(self, merchant: Merchant, screenshot_dir: str) -> List[AuditResult]:
+        """Audit a merchant, converting unexpected errors into a failed result"""
+        try:
+            with self._rpc_scope(merchant):
+                return await self.audit_merchant(merchant, screenshot_dir)
+        except Exception as e:
+            logger.error(f"Unexpected error processing {merchant.merchant_id}: {e}")
+            # Create error results
+            return self._failed_results(
+                merchant,
+                datetime.now().isoformat() + "Z",
+                f"Unexpected error: {str(e)}",
+                str(e)
+            )
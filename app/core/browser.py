@@ -1,32 +1,50 @@
 """
 Browser control using Playwright
 """
+from __future__ import annotations
 import asyncio
-from typing import Optional, List, Dict, Any
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
 from pathlib import Path
 
+from app.core.host_limiter import HostLimiter
+from app.core.retry import NavigationError
+from app.detectors.page_source import DEFAULT_CAP, PageSourceView
+from app.utils.memory import js_heap_mb
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page, BrowserContext
+
 
 class BrowserManager:
     """Manage browser instances using Playwright"""
 
-    def __init__(self, headless: bool = True, timeout: int = 30000):
+    def __init__(self, headless: bool = True, timeout: int = 30000, limiter: Optional[HostLimiter] = None):
         """
         Initialize browser manager
         
         Args:
             headless: Run browser in headless mode
             timeout: Page load timeout in milliseconds
+            limiter: Optional per-host limiter shared by concurrent browsers
         """
         self.headless = headless
         self.timeout = timeout
+        self.limiter = limiter
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.playwright = None
+        self.last_error: Optional[Exception] = None
+        self.last_headers: Optional[Dict[str, str]] = None  # main document response headers
+        self.last_goto_ms: Optional[float] = None  # duration of the last page.goto, limiter wait excluded
 
     async def start(self):
         """Start browser instance"""
+        # Imported here so processes that never launch a browser don't load Playwright
+        from playwright.async_api import async_playwright
+
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(headless=self.headless)
         self.context = await self.browser.new_context(
@@ -35,28 +53,55 @@ class BrowserManager:
         self.page = await self.context.new_page()
         self.page.set_default_timeout(self.timeout)
 
-    async def navigate(self, url: str, wait_time: int = 5000) -> bool:
+    async def navigate(self, url: str, wait_time: int = 5000, timeout: Optional[int] = None) -> bool:
         """
         Navigate to URL
         
         Args:
             url: URL to navigate to
             wait_time: Wait time after navigation in milliseconds
+            timeout: Navigation timeout in milliseconds (default: self.timeout)
             
         Returns:
-            True if navigation successful, False otherwise
+            True if navigation successful, False otherwise (cause in self.last_error)
         """
+        self.last_error = None
+        self.last_headers = None
+        self.last_goto_ms = None
         try:
-            await self.page.goto(url, wait_until='domcontentloaded', timeout=self.timeout)
+            async with self.limiter.slot(url) if self.limiter else nullcontext():
+                # Timed inside the slot so queueing behind the host limiter is not latency
+                started = time.perf_counter()
+                response = await self.page.goto(url, wait_until='domcontentloaded', timeout=timeout or self.timeout)
+                self.last_goto_ms = (time.perf_counter() - started) * 1000
+            if response is not None:
+                self.last_headers = response.headers
+            if response is not None and response.status >= 400:
+                self.last_error = NavigationError(url, status=response.status)
+                return False
             await self.page.wait_for_timeout(wait_time)
             return True
-        except Exception:
+        except Exception as e:
+            self.last_error = e
             return False
 
+    def is_alive(self) -> bool:
+        """Whether the browser, context and page can still be used"""
+        return (
+            self.browser is not None
+            and self.browser.is_connected()
+            and self.page is not None
+            and not self.page.is_closed()
+        )
+
     async def get_page_source(self) -> str:
         """Get page source HTML"""
         return await self.page.content()
 
+    async def get_page_source_view(self, cap: int = DEFAULT_CAP) -> PageSourceView:
+        """Get a size-capped, lower-cased view of the page source, built in the browser"""
+        return await PageSourceView.from_page(self.page, cap)
+
     async def find_elements(self, selector: str) -> List[Any]:
         """
         Find elements by CSS selector
@@ -65,7 +110,7 @@ class BrowserManager:
             selector: CSS selector
             
         Returns:
-            List of element handles
+            List of element handles (owned by the caller, which should dispose them)
         """
         try:
             elements = await self.page.query_selector_all(selector)
@@ -73,6 +118,10 @@ class BrowserManager:
         except Exception:
             return []
 
+    async def js_heap_mb(self) -> Optional[float]:
+        """Used JS heap of the page in MB, or None if unavailable"""
+        return await js_heap_mb(self.page)
+
     async def capture_screenshot(self, file_path: str) -> bool:
         """
         Capture screenshot
@@ -81,22 +130,28 @@ class BrowserManager:
             file_path: Path to save screenshot
             
         Returns:
-            True if successful, False otherwise
+            True if successful, False otherwise (cause in self.last_error)
         """
+        self.last_error = None
         try:
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
             await self.page.screenshot(path=file_path, full_page=True)
             return True
-        except Exception:
+        except Exception as e:
+            self.last_error = e
             return False
 
     async def close(self):
-        """Close browser instance"""
-        if self.page:
-            await self.page.close()
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        """Close browser instance (tolerates an already crashed or closed browser)"""
+        for close in (
+            self.page.close if self.page else None,
+            self.context.close if self.context else None,
+            self.browser.close if self.browser else None,
+            self.playwright.stop if self.playwright else None,
+        ):
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception:
+                pass
@@ -0,0 +1,179 @@
+"""
+Per-host concurrency limiting, rate limiting and circuit breaking for navigations
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from app.core.retry import CircuitOpenError, FailureKind, classify_error
+from app.utils.urls import host_key
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` acquisitions per second with bursts of `burst`"""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class CircuitBreaker:
+    """
+    Open after `failure_threshold` consecutive timeouts, for `cooldown` seconds
+
+    Once the cool-down has passed a single probe request is let through
+    (half-open); its success closes the circuit, its failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self, host: str, claim: bool = True) -> bool:
+        """
+        Raise CircuitOpenError unless a request may be attempted
+
+        Returns True if the request is the half-open probe; with claim=False
+        the probe is not taken (a fast-fail check before waiting for a slot).
+        """
+        if self.opened_at is None:
+            return False
+        remaining = self.opened_at + self.cooldown - self.clock()
+        if remaining > 0 or self.probing:
+            raise CircuitOpenError(host, max(0.0, remaining))
+        self.probing = claim
+        return claim
+
+    def release_probe(self) -> None:
+        """Abandon an unfinished probe (e.g. a cancelled one) so a later request may probe"""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self.probing = False
+
+
+class HostLimiter:
+    """
+    Shared gate in front of every page navigation
+
+    Per host (see host_key) it caps concurrent navigations, rate-limits them
+    with a token bucket, and fast-fails navigations while the host's circuit
+    breaker is open. One instance is shared by all concurrent audits.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        rate: float = 1.0,
+        burst: int = 2,
+        failure_threshold: int = 3,
+        cooldown: float = 120.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize host limiter
+
+        Args:
+            max_concurrent: Concurrent navigations per host
+            rate: Navigations per second per host
+            burst: Navigations a host may receive back-to-back
+            failure_threshold: Consecutive timeouts that open a host's circuit
+            cooldown: Seconds a host's circuit stays open
+            clock: Monotonic clock (for tests)
+        """
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Circuit breaker for the host of `url`"""
+        host = host_key(url)
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_threshold, self.cooldown, self.clock)
+        return self._breakers[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Hold a navigation slot for the host of `url`
+
+        Raises CircuitOpenError without waiting if the host's circuit is open,
+        and again after waiting if it opened in the meantime. A timeout raised
+        inside the block counts towards opening the circuit; any other outcome
+        resets the host's failure count. A cancelled block records nothing.
+        """
+        host = host_key(url)
+        breaker = self.breaker(url)
+        breaker.check(host, claim=False)
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrent)
+            self._buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+
+        async with self._semaphores[host]:
+            await self._buckets[host].acquire()
+            probe = breaker.check(host)
+            try:
+                yield
+            except Exception as e:
+                if classify_error(e) == FailureKind.TIMEOUT:
+                    breaker.record_failure()
+                    if breaker.is_open:
+                        logger.warning(f"Circuit opened for {host} after {breaker.failures} timeouts")
+                else:
+                    breaker.record_success()
+                raise
+            except BaseException:
+                if probe:
+                    breaker.release_probe()
+                raise
+            else:
+                breaker.record_success()
+
+    def summary(self) -> Dict[str, int]:
+        """Hosts whose circuit is currently open, with their consecutive timeouts"""
+        return {host: b.failures for host, b in self._breakers.items() if b.is_open}
@@ -0,0 +1,293 @@
+"""
+Result cache for incremental re-audits
+
+A cached result is reused while the merchant, page URL, page fingerprint and
+detector version are all unchanged. The fingerprint is the page's ETag or
+Last-Modified validator when the server sends one, and otherwise a hash of
+the normalized page content. The detector version is a hash of the detector's
+source module and of every app/auditor module it imports (transitively), so
+editing a detector or a helper it relies on invalidates its entries.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import re
+import sys
+import urllib.request
+from contextlib import nullcontext
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Structural hash of the rendered DOM: tags, ids, classes, image/link targets
+# and visible text; scripts, styles and whitespace are ignored. Two 32-bit
+# FNV-1a lanes with different offsets give a 64-bit fingerprint.
+DOM_FINGERPRINT_SCRIPT = """
+() => {
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    let a = 0x811c9dc5, b = 0x01000193 ^ 0x5bd1e995;
+    const feed = (s) => {
+        for (let i = 0; i < s.length; i++) {
+            const c = s.charCodeAt(i);
+            a = Math.imul(a ^ c, 0x01000193) >>> 0;
+            b = Math.imul(b ^ c, 0x01000193) >>> 0;
+        }
+        a = Math.imul(a ^ 0x1f, 0x01000193) >>> 0;
+        b = Math.imul(b ^ 0x1f, 0x01000193) >>> 0;
+    };
+    const root = document.body || document.documentElement;
+    if (!root) return '';
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode: (node) => SKIP.has(node.tagName) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT
+    });
+    for (let node = walker.currentNode; node; node = walker.nextNode()) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            const text = node.nodeValue.replace(/\\s+/g, ' ').trim();
+            if (text) feed(text);
+        } else {
+            feed(node.tagName);
+            if (node.id) feed('#' + node.id);
+            const cls = node.getAttribute('class');
+            if (cls) feed('.' + cls.trim().replace(/\\s+/g, '.'));
+            for (const attr of ['src', 'alt', 'href']) {
+                const value = node.getAttribute(attr);
+                if (value) feed(attr + '=' + value);
+            }
+        }
+    }
+    return a.toString(16).padStart(8, '0') + b.toString(16).padStart(8, '0');
+}
+"""
+
+_VOLATILE_HTML = re.compile(
+    r'<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->|\snonce="[^"]*"',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+# Top-level packages whose modules count towards a detector's version
+PROJECT_PACKAGES = ("app", "auditor")
+
+
+def project_modules(module: ModuleType) -> List[ModuleType]:
+    """
+    A module and every project module it imports, transitively
+
+    Imports are found through the module globals (imported modules and
+    imported functions/classes), so imports made only for type checking
+    or inside functions are not followed.
+
+    Args:
+        module: Module to start from
+
+    Returns:
+        Modules sorted by name
+    """
+    seen: Dict[str, ModuleType] = {}
+    pending = [module]
+    while pending:
+        current = pending.pop()
+        if current is None or current.__name__ in seen:
+            continue
+        seen[current.__name__] = current
+        for value in vars(current).values():
+            name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+            if isinstance(name, str) and name.split(".")[0] in PROJECT_PACKAGES and name not in seen:
+                pending.append(sys.modules.get(name))
+    return [seen[name] for name in sorted(seen)]
+
+
+@lru_cache(maxsize=None)
+def _source_hash(cls: type) -> str:
+    digest = hashlib.sha1()
+    module = inspect.getmodule(cls)
+    for current in project_modules(module) if module else []:
+        try:
+            digest.update(inspect.getsource(current).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(current.__name__.encode('utf-8'))
+    if module is None:
+        digest.update(cls.__qualname__.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def detector_version(detector: Any) -> str:
+    """
+    Version of a detector or check: a hash of the module defining its class
+    and of the project helper modules it imports (see project_modules)
+
+    Detectors driven by configuration (e.g. declarative rules) expose a
+    `config_version` that is appended, so editing the configuration also
+    invalidates their entries.
+    """
+    version = _source_hash(type(detector))
+    config_version = getattr(detector, "config_version", None)
+    return f"{version}:{config_version}" if config_version else version
+
+
+def header_fingerprint(headers: Optional[Mapping[str, str]]) -> Optional[str]:
+    """ETag or Last-Modified validator of a response, if the server sent one"""
+    if not headers:
+        return None
+    headers = {k.lower(): v for k, v in headers.items()}
+    if headers.get('etag'):
+        return f"etag:{headers['etag']}"
+    if headers.get('last-modified'):
+        return f"last-modified:{headers['last-modified']}"
+    return None
+
+
+def html_fingerprint(html: str) -> str:
+    """Hash of HTML with scripts, styles, comments, nonces and whitespace removed"""
+    normalized = re.sub(r'\s+', ' ', _VOLATILE_HTML.sub('', html)).strip()
+    return "html:" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+async def page_fingerprint(page, headers: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Fingerprint of a loaded page
+
+    Args:
+        page: Playwright page
+        headers: Headers of the main document response
+
+    Returns:
+        Response validator if present, otherwise a normalized DOM hash
+    """
+    return header_fingerprint(headers) or "dom:" + await page.evaluate(DOM_FINGERPRINT_SCRIPT)
+
+
+def _fetch_fingerprint(url: str, timeout: float) -> str:
+    request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; klarna-auditor)'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        validator = header_fingerprint(dict(response.headers))
+        if validator:
+            return validator
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return html_fingerprint(response.read().decode(charset, errors='replace'))
+
+
+async def http_fingerprint(url: str, timeout: float = 10.0, limiter: Any = None) -> Optional[str]:
+    """
+    Fingerprint a page over plain HTTP, without a browser
+
+    Args:
+        url: Page URL
+        timeout: Request timeout in seconds
+        limiter: HostLimiter the request goes through, like page navigations
+
+    Returns:
+        Response validator or normalized server-HTML hash, or None if the fetch
+        failed or the host's circuit is open
+    """
+    try:
+        async with limiter.slot(url) if limiter else nullcontext():
+            return await asyncio.to_thread(_fetch_fingerprint, url, timeout)
+    except Exception as e:
+        logger.debug(f"Fingerprint fetch failed for {url}: {e}")
+        return None
+
+
+class ResultCache:
+    """
+    Last result per (merchant, rule), reusable while its key is unchanged
+
+    Entries are stored as JSON; only the most recent result of each
+    (merchant, rule) is kept, so a changed page replaces its old entry.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            path: JSON file to load from and save to (None keeps the cache in memory)
+        """
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        if self.path and self.path.exists():
+            self.load()
+
+    def load(self) -> None:
+        """Load entries from JSON file"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load result cache from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Save entries to JSON file"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+
+    @staticmethod
+    def _slot(merchant_id: str, rule_id: str) -> str:
+        return f"{merchant_id}|{rule_id}"
+
+    def lookup(
+        self,
+        merchant_id: str,
+        rule_id: str,
+        url: str,
+        fingerprint: Optional[str],
+        version: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for a key
+
+        Args:
+            merchant_id: Merchant ID
+            rule_id: Detector rule or check ID
+            url: Audited page URL
+            fingerprint: Page fingerprint (None never hits)
+            version: Detector version
+
+        Returns:
+            The stored result dict, or None on a miss
+        """
+        entry = self._entries.get(self._slot(merchant_id, rule_id))
+        if (
+            fingerprint is not None
+            and entry is not None
+            and entry["url"] == url
+            and entry["fingerprint"] == fingerprint
+            and entry["version"] == version
+        ):
+            self.hits += 1
+            return entry["result"]
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        merchant_id: str,
+        rule_id: str,
+        url: str,
+        fingerprint: Optional[str],
+        version: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Store a result (as a JSON-serializable dict) under its key"""
+        if fingerprint is None:
+            return
+        self._entries[self._slot(merchant_id, rule_id)] = {
+            "url": url,
+            "fingerprint": fingerprint,
+            "version": version,
+            "result": result
+        }
+
+    def summary(self) -> Dict[str, int]:
+        """Hit and miss counts of this run"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,129 @@
+"""
+Failure classification and retry backoff for merchant audits
+"""
+import random
+from enum import Enum
+from typing import Optional
+
+
+class FailureKind(Enum):
+    """Why an audit stage failed"""
+    TRANSIENT_NETWORK = "transient_network"
+    TIMEOUT = "timeout"
+    PERMANENT = "permanent"
+    DETECTOR_BUG = "detector_bug"
+
+
+# Failures worth retrying; permanent errors and our own bugs fail immediately
+RETRYABLE = {FailureKind.TRANSIENT_NETWORK, FailureKind.TIMEOUT}
+
+# Chromium network error codes that will not go away on retry
+PERMANENT_NET_ERRORS = (
+    "ERR_NAME_NOT_RESOLVED",
+    "ERR_NAME_RESOLUTION_FAILED",
+    "ERR_ADDRESS_INVALID",
+    "ERR_ADDRESS_UNREACHABLE",
+    "ERR_CERT_",
+    "ERR_SSL_",
+    "ERR_INVALID_URL",
+    "ERR_UNKNOWN_URL_SCHEME",
+    "ERR_BLOCKED_BY_CLIENT",
+    "ERR_TOO_MANY_REDIRECTS",
+)
+
+# Environment problems that no retry can fix
+PERMANENT_MESSAGES = (
+    "Executable doesn't exist",
+)
+
+TIMEOUT_NET_ERRORS = (
+    "ERR_TIMED_OUT",
+    "ERR_CONNECTION_TIMED_OUT",
+)
+
+
+class NavigationError(Exception):
+    """Navigation failed or returned an HTTP error status"""
+
+    def __init__(self, url: str, status: Optional[int] = None, message: Optional[str] = None):
+        self.url = url
+        self.status = status
+        super().__init__(message or f"HTTP {status} for {url}")
+
+
+class CircuitOpenError(Exception):
+    """A host's circuit breaker is open; the request was not attempted"""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host} (retry in {retry_in:.0f}s)")
+
+
+class StageError(Exception):
+    """An audit stage failed, with the failure classified"""
+
+    def __init__(self, stage: str, kind: FailureKind, cause: Exception):
+        self.stage = stage
+        self.kind = kind
+        self.cause = cause
+        super().__init__(f"{stage} failed ({kind.value}): {cause}")
+
+
+def _is_playwright_error(exc: Exception) -> bool:
+    return any(cls.__module__.startswith("playwright") for cls in type(exc).__mro__)
+
+
+def classify_error(exc: Exception) -> FailureKind:
+    """
+    Classify an exception raised while auditing
+
+    Args:
+        exc: Exception raised by a stage
+
+    Returns:
+        FailureKind of the exception
+    """
+    if isinstance(exc, StageError):
+        return exc.kind
+
+    # The host already failed repeatedly; retrying within the cool-down would fast-fail again
+    if isinstance(exc, CircuitOpenError):
+        return FailureKind.PERMANENT
+
+    if isinstance(exc, NavigationError) and exc.status is not None:
+        if exc.status == 429 or exc.status >= 500:
+            return FailureKind.TRANSIENT_NETWORK
+        return FailureKind.PERMANENT
+
+    message = str(exc)
+    if isinstance(exc, TimeoutError) or type(exc).__name__ == "TimeoutError":
+        return FailureKind.TIMEOUT
+    if any(code in message for code in TIMEOUT_NET_ERRORS):
+        return FailureKind.TIMEOUT
+    if any(code in message for code in PERMANENT_NET_ERRORS + PERMANENT_MESSAGES):
+        return FailureKind.PERMANENT
+
+    # Any other driver/network error (connection reset, target closed, crash) may succeed on retry
+    if isinstance(exc, (NavigationError, ConnectionError)) or _is_playwright_error(exc):
+        return FailureKind.TRANSIENT_NETWORK
+
+    # Plain Python errors come from our own code
+    return FailureKind.DETECTOR_BUG
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0, rng: random.Random = None) -> float:
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay ceiling for the first retry in seconds
+        cap: Maximum delay ceiling in seconds
+        rng: Random generator (for deterministic tests)
+
+    Returns:
+        Delay in seconds, uniformly drawn from [0, min(cap, base * 2**attempt)]
+    """
+    rng = rng or random
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
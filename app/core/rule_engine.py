@@ -0,0 +1,238 @@
+"""
+Declarative rule engine
+
+Rules loaded from YAML are compiled once per page type into a JSON plan, and
+a single static evaluator script runs the whole plan inside the page. All
+rules of a page therefore cost one `page.evaluate` round trip (plus one per
+scannable child frame for rules with `frames: all`, run concurrently under
+one deadline), however many rules there are.
+Within an evaluation, element queries and scope text are memoized, so rules
+sharing a selector or scope do not repeat DOM work.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List
+
+from app.data.rule_loader import DetectionConfig, Rule
+from app.detectors.footer_klarna_logo_detector import DetectionResult
+from app.utils.frames import scan_frames
+
+logger = logging.getLogger(__name__)
+
+# Evidence entries kept per condition
+MAX_EVIDENCE = 5
+
+EVALUATOR_JS = """
+(plan) => {
+    const queries = new Map();
+    const texts = new Map();
+    const query = (selector) => {
+        if (!queries.has(selector)) {
+            let elements;
+            try {
+                elements = Array.from(document.querySelectorAll(selector));
+            } catch (e) {
+                elements = [];
+            }
+            queries.set(selector, elements);
+        }
+        return queries.get(selector);
+    };
+    const text = (scope, caseSensitive) => {
+        const key = (caseSensitive ? '1' : '0') + (scope || '');
+        if (!texts.has(key)) {
+            const elements = scope ? query(scope) : [document.body || document.documentElement].filter(Boolean);
+            const value = elements.map((el) => el.textContent || '').join('\\n');
+            texts.set(key, caseSensitive ? value : value.toLowerCase());
+        }
+        return texts.get(key);
+    };
+    const run = (cond, evidence) => {
+        if (cond.t === 'selector') {
+            const count = query(cond.s).length;
+            if (count) evidence.push(`selector:${cond.s} (${count})`);
+            return count > 0;
+        }
+        if (cond.t === 'keyword') {
+            const haystack = text(cond.s, cond.cs);
+            let found = false;
+            for (const keyword of cond.k) {
+                if (haystack.includes(keyword)) {
+                    evidence.push(`keyword:${keyword}`);
+                    found = true;
+                }
+            }
+            return found;
+        }
+        if (cond.t === 'attribute') {
+            const pattern = new RegExp(cond.p, cond.cs ? '' : 'i');
+            let hits = 0;
+            for (const el of query(cond.s || '*')) {
+                for (const attr of cond.a) {
+                    const value = el.getAttribute(attr);
+                    if (value && pattern.test(value)) {
+                        if (hits < cond.n) evidence.push(`${el.tagName.toLowerCase()}[${attr}=${value.slice(0, 200)}]`);
+                        hits++;
+                        break;
+                    }
+                }
+                if (hits >= cond.n) break;
+            }
+            return hits > 0;
+        }
+        if (cond.t === 'any') {
+            let found = false;
+            for (const child of cond.c) {
+                if (run(child, evidence)) found = true;
+            }
+            return found;
+        }
+        return false;
+    };
+    // A rule that throws (e.g. a pattern the browser rejects) fails alone
+    return plan.map((rule) => {
+        const evidence = [];
+        try {
+            return {id: rule.id, found: run(rule.cond, evidence), evidence: evidence};
+        } catch (e) {
+            return {id: rule.id, found: false, evidence: [], error: String(e)};
+        }
+    });
+}
+"""
+
+
+def compile_condition(detection: DetectionConfig) -> Dict[str, Any]:
+    """Compile a detection config into its plan form (keywords pre-folded)"""
+    if detection.type == "selector":
+        return {"t": "selector", "s": detection.selector}
+    if detection.type == "keyword":
+        keywords = detection.keywords if detection.case_sensitive else [k.lower() for k in detection.keywords]
+        return {"t": "keyword", "s": detection.selector, "k": keywords, "cs": detection.case_sensitive}
+    if detection.type == "attribute":
+        return {
+            "t": "attribute",
+            "s": detection.selector,
+            "a": detection.attributes,
+            "p": detection.pattern,
+            "cs": detection.case_sensitive,
+            "n": MAX_EVIDENCE
+        }
+    if detection.type == "any":
+        return {"t": "any", "c": [compile_condition(c) for c in detection.conditions]}
+    raise ValueError(f"Unsupported detection type: {detection.type}")
+
+
+class RuleEngine:
+    """Evaluate declarative rules with one in-page evaluation per page"""
+
+    def __init__(self, rules: List[Rule]):
+        """
+        Initialize rule engine
+
+        Args:
+            rules: Parsed rules (see RuleLoader)
+        """
+        self.rules = rules
+        self._plans: Dict[str, tuple] = {}
+
+    def match_rules(self, page_type: str) -> List[Rule]:
+        """Enabled rules applying to a page type"""
+        return [r for r in self.rules if r.enabled and r.page_type in (page_type, "all")]
+
+    def compile(self, page_type: str) -> tuple:
+        """
+        Compiled plans for a page type, built once and reused
+
+        Returns:
+            (rules, main frame plan, child frame plan)
+        """
+        if page_type not in self._plans:
+            rules = self.match_rules(page_type)
+            plan = [{"id": r.rule_id, "cond": compile_condition(r.detection)} for r in rules]
+            frame_plan = [p for p, r in zip(plan, rules) if r.detection.frames == "all"]
+            self._plans[page_type] = (rules, plan, frame_plan)
+        return self._plans[page_type]
+
+    async def evaluate(self, page, page_type: str = "homepage") -> List[DetectionResult]:
+        """
+        Evaluate all rules of a page type on a page
+
+        Args:
+            page: Playwright page
+            page_type: Page type the rules are matched against
+
+        Returns:
+            One DetectionResult per matched rule
+        """
+        rules, plan, frame_plan = self.compile(page_type)
+        if not plan:
+            return []
+
+        outcomes = {o["id"]: o for o in await page.evaluate(EVALUATOR_JS, plan)}
+        if frame_plan:
+            # Ad/chat/analytics frames are filtered out; detached, navigating
+            # or slow frames are skipped, not fatal
+            scanned = await scan_frames(page, lambda frame: frame.evaluate(EVALUATOR_JS, frame_plan))
+            for frame, frame_outcomes in scanned:
+                for outcome in frame_outcomes:
+                    if outcome.get("error"):
+                        continue
+                    merged = outcomes[outcome["id"]]
+                    merged["found"] = merged["found"] or outcome["found"]
+                    merged["evidence"].extend(f"frame:{e}" for e in outcome["evidence"])
+
+        return [self._result(rule, outcomes[rule.rule_id]) for rule in rules]
+
+    @staticmethod
+    def _result(rule: Rule, outcome: Dict[str, Any]) -> DetectionResult:
+        if outcome.get("error") and not outcome["found"]:
+            logger.warning(f"Rule {rule.rule_id} failed in the page: {outcome['error']}")
+            return DetectionResult(
+                rule_id=rule.rule_id,
+                passed=False,
+                expected=rule.detection.expected,
+                actual=False,
+                confidence=0.0,
+                matched_selectors=[],
+                message=f"{rule.description}: rule error: {outcome['error']}"
+            )
+        found = bool(outcome["found"])
+        evidence = outcome["evidence"]
+        confidence = 0.0
+        if found:
+            confidence = 1.0 if len(evidence) > 1 else 0.95
+        return DetectionResult(
+            rule_id=rule.rule_id,
+            passed=found == rule.detection.expected,
+            expected=rule.detection.expected,
+            actual=found,
+            confidence=confidence,
+            matched_selectors=evidence,
+            message=f"{rule.description}: {'found' if found else 'not found'}"
+        )
+
+
+
+class RuleSetDetector:
+    """Declarative rules of one page type, run by the Auditor like a detector"""
+
+    def __init__(self, engine: RuleEngine, page_type: str = "homepage"):
+        """
+        Initialize detector
+
+        Args:
+            engine: Rule engine holding the rules
+            page_type: Page type the audited page is matched against
+        """
+        self.engine = engine
+        self.page_type = page_type
+        rules, plan, _ = engine.compile(page_type)
+        self.rules = [(r.rule_id, r.description) for r in rules]
+        # Editing a rule file changes the plan and invalidates cached results
+        self.config_version = hashlib.sha1(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    async def detect(self, page_source, browser_manager) -> List[DetectionResult]:
+        """Evaluate all rules on the browser's current page in one call"""
+        return await self.engine.evaluate(browser_manager.page, self.page_type)
@@ -0,0 +1,364 @@
+"""
+Registry preflight: row validation, URL normalization and reachability probes
+
+Runs before any browser is launched. Malformed and duplicate rows are
+reported instead of aborting the load. Each distinct base URL is probed
+once with a HEAD request (GET when HEAD is refused), following redirects
+by hand over pooled keep-alive connections; a probe that fails on the
+network is retried once. Merchants whose site cannot be reached at all, or
+answers 404/410, are skipped up front.
+"""
+import asyncio
+import csv
+import http.client
+import logging
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from app.data.merchant_loader import Merchant
+
+logger = logging.getLogger(__name__)
+
+# Statuses meaning the site is gone; 5xx and bot walls (403/429) still get audited
+DEAD_STATUSES = {404, 410}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+PROBE_RETRY_DELAY = 1.0  # seconds before retrying a probe that failed on the network
+USER_AGENT = "Mozilla/5.0 (compatible; klarna-auditor-preflight)"
+
+
+@dataclass
+class RowIssue:
+    """Problem found in a registry row"""
+    row: int
+    merchant_id: str
+    problem: str
+    fatal: bool = True  # the row is left out of the audit
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a reachability probe"""
+    url: str
+    status: Optional[int] = None
+    final_url: Optional[str] = None
+    redirects: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def reachable(self) -> bool:
+        return self.status is not None and self.status not in DEAD_STATUSES
+
+    @property
+    def reason(self) -> str:
+        """Human-readable outcome"""
+        if self.error:
+            return self.error
+        if self.redirects:
+            return f"HTTP {self.status} after redirect to {self.final_url}"
+        return f"HTTP {self.status}"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a base URL
+
+    Adds a missing https:// scheme, lower-cases scheme and host, drops
+    default ports, fragments and a bare "/" path.
+
+    Raises:
+        ValueError: If the URL has no host or an unsupported scheme
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise ValueError(f"unsupported URL scheme: {parts.scheme}")
+    host = (parts.hostname or "").lower()
+    if not host or " " in host or ("." not in host and host != "localhost"):
+        raise ValueError(f"invalid host in URL: {url}")
+    try:
+        port = parts.port
+    except ValueError:
+        raise ValueError(f"invalid port in URL: {url}")
+    netloc = host
+    if port and port != {"http": 80, "https": 443}[scheme]:
+        netloc = f"{host}:{port}"
+    path = "" if parts.path == "/" else parts.path
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def validate_registry(csv_path: str) -> Tuple[List[Merchant], List[RowIssue]]:
+    """
+    Load a merchant registry, collecting row problems instead of raising
+
+    Base URLs are normalized. Rows with missing fields, an invalid URL or
+    priority, or a merchant_id seen before are left out. Rows repeating an
+    earlier row's base URL are left out as duplicates.
+
+    Args:
+        csv_path: Path to CSV file
+
+    Returns:
+        (valid merchants, issues)
+
+    Raises:
+        FileNotFoundError: If the CSV file doesn't exist
+    """
+    if not Path(csv_path).exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    merchants: List[Merchant] = []
+    issues: List[RowIssue] = []
+    seen_ids: Dict[str, int] = {}
+    seen_urls: Dict[str, str] = {}
+
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row_num, row in enumerate(csv.DictReader(f), start=2):  # header is row 1
+            merchant_id = (row.get('merchant_id') or '').strip()
+            name = (row.get('merchant_name') or '').strip()
+            raw_url = (row.get('base_url') or '').strip()
+
+            missing = [key for key, value in
+                       (('merchant_id', merchant_id), ('merchant_name', name), ('base_url', raw_url)) if not value]
+            if missing:
+                issues.append(RowIssue(row_num, merchant_id, f"missing {', '.join(missing)}"))
+                continue
+            if merchant_id in seen_ids:
+                issues.append(RowIssue(row_num, merchant_id, f"duplicate merchant_id (first on row {seen_ids[merchant_id]})"))
+                continue
+            seen_ids[merchant_id] = row_num
+
+            try:
+                base_url = normalize_url(raw_url)
+            except ValueError as e:
+                issues.append(RowIssue(row_num, merchant_id, str(e)))
+                continue
+            if base_url in seen_urls:
+                issues.append(RowIssue(row_num, merchant_id, f"duplicate base_url {base_url} (same as {seen_urls[base_url]})"))
+                continue
+
+            priority = (row.get('priority') or '').strip()
+            if priority and not priority.lstrip('-').isdigit():
+                issues.append(RowIssue(row_num, merchant_id, f"invalid priority {priority!r}, using 5", fatal=False))
+                priority = ''
+            if base_url not in (raw_url, raw_url.rstrip('/')):
+                issues.append(RowIssue(row_num, merchant_id, f"base_url normalized to {base_url}", fatal=False))
+
+            seen_urls[base_url] = merchant_id
+            merchants.append(Merchant(
+                merchant_id=merchant_id,
+                merchant_name=name,
+                base_url=base_url,
+                checkout_url=(row.get('checkout_url') or '').strip() or None,
+                product_url=(row.get('product_url') or '').strip() or None,
+                cart_url=(row.get('cart_url') or '').strip() or None,
+                status=(row.get('status') or 'active').strip(),
+                priority=int(priority) if priority else 5,
+                notes=(row.get('notes') or '').strip() or None
+            ))
+
+    return merchants, issues
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per origin, shared by probe threads"""
+
+    def __init__(self, timeout: float = 10.0, max_per_origin: int = 4):
+        self.timeout = timeout
+        self.max_per_origin = max_per_origin
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+
+    def acquire(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if reusable and len(idle) < self.max_per_origin:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def request(self, method: str, url: str) -> http.client.HTTPResponse:
+        """
+        Send one request and drain the response (at most 64 KB of a GET body)
+
+        A pooled connection the server closed in the meantime is retried once
+        on a fresh connection.
+        """
+        parts = urlsplit(url)
+        path = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        headers = {"User-Agent": USER_AGENT, "Accept": "text/html,*/*"}
+        for attempt in range(2):
+            conn = self.acquire(parts.scheme, parts.netloc)
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                response.read(65536)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+            self.release(parts.scheme, parts.netloc, conn, reusable=not response.will_close and response.isclosed())
+            return response
+
+
+def probe(url: str, pool: ConnectionPool, retries: int = 1) -> ProbeResult:
+    """
+    Probe a URL: HEAD (GET if HEAD is refused), following redirects
+
+    A network failure (DNS, connect, timeout) is retried `retries` times
+    after a short pause, so a single dropped connection does not skip a
+    merchant. Never raises; failures are reported in ProbeResult.error.
+    """
+    for attempt in range(retries + 1):
+        result = _probe_once(url, pool)
+        if result.status is not None or attempt == retries:
+            return result
+        logger.debug(f"Probe of {url} failed ({result.error}), retrying")
+        time.sleep(PROBE_RETRY_DELAY * (attempt + 1))
+    return result
+
+
+def _probe_once(url: str, pool: ConnectionPool) -> ProbeResult:
+    """One probe attempt, following redirects"""
+    result = ProbeResult(url=url)
+    started = time.perf_counter()
+    current = url
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = pool.request("HEAD", current)
+            if response.status in (405, 501):
+                response = pool.request("GET", current)
+            result.status = response.status
+            location = response.getheader("Location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                break
+            current = urljoin(current, location)
+            result.redirects.append(current)
+        else:
+            result.error = f"more than {MAX_REDIRECTS} redirects"
+            result.status = None
+        result.final_url = current
+    except Exception as e:
+        result.status = None
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def probe_all(urls: List[str], concurrency: int = 16, timeout: float = 10.0) -> Dict[str, ProbeResult]:
+    """
+    Probe URLs concurrently on a thread pool sharing one connection pool
+
+    Args:
+        urls: URLs to probe (duplicates are probed once)
+        concurrency: Probes in flight at the same time
+        timeout: Socket timeout per request in seconds
+
+    Returns:
+        URL -> ProbeResult
+    """
+    unique = list(dict.fromkeys(urls))
+    pool = ConnectionPool(timeout=timeout)
+    loop = asyncio.get_running_loop()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="preflight") as executor:
+            results = await asyncio.gather(*(loop.run_in_executor(executor, probe, url, pool) for url in unique))
+    finally:
+        pool.close()
+    return dict(zip(unique, results))
+
+
+@dataclass
+class PreflightReport:
+    """Result of a registry preflight"""
+    merchants: List[Merchant]  # valid, reachable merchants to audit
+    skipped: List[Tuple[Merchant, ProbeResult]]  # valid but unreachable merchants
+    issues: List[RowIssue]
+    probes: Dict[str, ProbeResult]
+    registry: List[Merchant] = field(default_factory=list)  # all valid merchants, in registry order
+
+    def to_dict(self) -> Dict:
+        return {
+            "audit": [m.merchant_id for m in self.merchants],
+            "skipped": [
+                {"merchant_id": m.merchant_id, "base_url": m.base_url, "reason": p.reason}
+                for m, p in self.skipped
+            ],
+            "issues": [
+                {"row": i.row, "merchant_id": i.merchant_id, "problem": i.problem, "fatal": i.fatal}
+                for i in self.issues
+            ],
+            "probes": {
+                url: {
+                    "status": p.status,
+                    "final_url": p.final_url,
+                    "redirects": p.redirects,
+                    "error": p.error,
+                    "elapsed_ms": p.elapsed_ms
+                }
+                for url, p in self.probes.items()
+            }
+        }
+
+
+async def preflight(csv_path: str, concurrency: int = 16, timeout: float = 10.0) -> PreflightReport:
+    """
+    Validate a registry and probe every merchant's base URL
+
+    Args:
+        csv_path: Path to the merchant registry CSV
+        concurrency: Probes in flight at the same time
+        timeout: Socket timeout per request in seconds
+
+    Returns:
+        PreflightReport
+    """
+    merchants, issues = validate_registry(csv_path)
+    probes = await probe_all([m.homepage_url for m in merchants], concurrency=concurrency, timeout=timeout)
+
+    reachable, skipped = [], []
+    for merchant in merchants:
+        result = probes[merchant.homepage_url]
+        if result.reachable:
+            reachable.append(merchant)
+            if result.redirects and urlsplit(result.final_url).hostname != urlsplit(merchant.homepage_url).hostname:
+                logger.warning(f"{merchant.merchant_id}: {merchant.homepage_url} redirects to {result.final_url}")
+        else:
+            skipped.append((merchant, result))
+            logger.warning(f"{merchant.merchant_id}: unreachable ({result.reason}), skipping")
+    for issue in issues:
+        log = logger.warning if issue.fatal else logger.info
+        log(f"Row {issue.row} ({issue.merchant_id or '?'}): {issue.problem}")
+
+    return PreflightReport(merchants=reachable, skipped=skipped, issues=issues, probes=probes, registry=merchants)
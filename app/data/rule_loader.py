@@ -0,0 +1,186 @@
+"""
+Rule configuration loader
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+DETECTION_TYPES = ("selector", "keyword", "attribute", "any")
+PAGE_TYPES = ("homepage", "product", "cart", "checkout", "all")
+SEVERITIES = ("high", "medium", "low")
+FRAME_SCOPES = ("main", "all")
+
+# Patterns run as JavaScript RegExps in the page; these Python-only constructs
+# (named groups, inline flags, comments, atomic groups, \A/\Z) are not portable
+_NON_PORTABLE_REGEX = re.compile(r'\(\?P[<=>]|\(\?[aiLmsux-]+[:)]|\(\?#|\(\?>|\\[AZ]')
+
+
+@dataclass
+class DetectionConfig:
+    """How a rule is detected in the page"""
+    type: str  # "selector" | "keyword" | "attribute" | "any"
+    expected: bool = True
+    # selector: elements that must exist; keyword/attribute: elements to search (default: body)
+    selector: Optional[str] = None
+    # keyword specific
+    keywords: List[str] = field(default_factory=list)
+    case_sensitive: bool = False
+    # attribute specific
+    attributes: List[str] = field(default_factory=list)
+    pattern: Optional[str] = None
+    # any: matches if one of the conditions matches
+    conditions: List["DetectionConfig"] = field(default_factory=list)
+    frames: str = "main"  # "main" | "all" (also search child frames)
+
+
+@dataclass
+class Rule:
+    """Rule data model"""
+    rule_id: str
+    description: str
+    severity: str  # "high" | "medium" | "low"
+    page_type: str  # "homepage" | "product" | "cart" | "checkout" | "all"
+    detection: DetectionConfig
+    enabled: bool = True
+
+
+class RuleLoader:
+    """Load rule configurations from YAML files"""
+
+    @staticmethod
+    def validate_rule(rule: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """
+        Validate a rule dict
+
+        Args:
+            rule: Rule as parsed from YAML
+
+        Returns:
+            (valid, list of error messages)
+        """
+        errors = []
+        for key in ("rule_id", "description", "page_type", "detection"):
+            if not rule.get(key):
+                errors.append(f"missing {key}")
+        if rule.get("severity", "medium") not in SEVERITIES:
+            errors.append(f"severity must be one of {', '.join(SEVERITIES)}")
+        if rule.get("page_type") and rule["page_type"] not in PAGE_TYPES:
+            errors.append(f"page_type must be one of {', '.join(PAGE_TYPES)}")
+        if isinstance(rule.get("detection"), dict):
+            errors.extend(RuleLoader._validate_detection(rule["detection"]))
+        elif rule.get("detection"):
+            errors.append("detection must be a mapping")
+        return not errors, errors
+
+    @staticmethod
+    def _validate_detection(detection: Dict[str, Any], path: str = "detection") -> List[str]:
+        errors = []
+        kind = detection.get("type")
+        if kind not in DETECTION_TYPES:
+            return [f"{path}.type must be one of {', '.join(DETECTION_TYPES)}"]
+        if kind == "selector" and not detection.get("selector"):
+            errors.append(f"{path}.selector is required for selector rules")
+        if kind == "keyword" and not (detection.get("keyword") or detection.get("keywords")):
+            errors.append(f"{path}.keywords is required for keyword rules")
+        if kind == "attribute" and not (detection.get("attributes") and detection.get("pattern")):
+            errors.append(f"{path}.attributes and {path}.pattern are required for attribute rules")
+        elif kind == "attribute":
+            errors.extend(RuleLoader._validate_pattern(str(detection["pattern"]), f"{path}.pattern"))
+        if kind == "any":
+            conditions = detection.get("conditions") or []
+            if not conditions:
+                errors.append(f"{path}.conditions is required for any rules")
+            for index, condition in enumerate(conditions):
+                errors.extend(RuleLoader._validate_detection(condition, f"{path}.conditions[{index}]"))
+        if detection.get("frames", "main") not in FRAME_SCOPES:
+            errors.append(f"{path}.frames must be one of {', '.join(FRAME_SCOPES)}")
+        return errors
+
+    @staticmethod
+    def _validate_pattern(pattern: str, path: str) -> List[str]:
+        """Errors of a regex pattern that must compile in both Python and JavaScript"""
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return [f"{path} is not a valid regular expression: {e}"]
+        if _NON_PORTABLE_REGEX.search(pattern):
+            return [f"{path} uses Python-only regex syntax (named groups, inline flags, \\A/\\Z, ...)"]
+        return []
+
+    @staticmethod
+    def parse_detection(detection: Dict[str, Any]) -> DetectionConfig:
+        """Parse a validated detection mapping"""
+        keywords = detection.get("keywords") or []
+        if detection.get("keyword"):
+            keywords = [detection["keyword"]] + list(keywords)
+        return DetectionConfig(
+            type=detection["type"],
+            expected=bool(detection.get("expected", True)),
+            selector=detection.get("selector"),
+            keywords=[str(k) for k in keywords],
+            case_sensitive=bool(detection.get("case_sensitive", False)),
+            attributes=list(detection.get("attributes") or []),
+            pattern=detection.get("pattern"),
+            conditions=[RuleLoader.parse_detection(c) for c in detection.get("conditions") or []],
+            frames=detection.get("frames", "main")
+        )
+
+    @staticmethod
+    def parse_rule(rule_dict: Dict[str, Any]) -> Rule:
+        """
+        Parse a rule dict
+
+        Raises:
+            ValueError: If the rule is invalid
+        """
+        valid, errors = RuleLoader.validate_rule(rule_dict)
+        if not valid:
+            raise ValueError(f"Rule {rule_dict.get('rule_id', '?')}: {'; '.join(errors)}")
+        return Rule(
+            rule_id=rule_dict["rule_id"],
+            description=rule_dict["description"],
+            severity=rule_dict.get("severity", "medium"),
+            page_type=rule_dict["page_type"],
+            detection=RuleLoader.parse_detection(rule_dict["detection"]),
+            enabled=bool(rule_dict.get("enabled", True))
+        )
+
+    @staticmethod
+    def load_from_file(file_path: str) -> List[Rule]:
+        """
+        Load rules from a YAML file with a top-level `rules` list
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If a rule is invalid
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Rule file not found: {file_path}")
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        try:
+            return [RuleLoader.parse_rule(rule) for rule in data.get("rules") or []]
+        except ValueError as e:
+            raise ValueError(f"{path.name}: {e}")
+
+    @staticmethod
+    def load_from_directory(dir_path: str) -> List[Rule]:
+        """
+        Load rules from all *.yaml files of a directory (sorted by name)
+
+        Raises:
+            ValueError: If a rule is invalid or a rule_id is defined twice
+        """
+        rules = []
+        seen = set()
+        for path in sorted(Path(dir_path).glob("*.yaml")):
+            for rule in RuleLoader.load_from_file(str(path)):
+                if rule.rule_id in seen:
+                    raise ValueError(f"{path.name}: duplicate rule_id {rule.rule_id}")
+                seen.add(rule.rule_id)
+                rules.append(rule)
+        return rules
@@ -1,3 +1,11 @@
 """
 Detection modules
+
+Detectors are registered by RULE_ID and imported only when selected.
 """
+from app.utils.plugins import PluginRegistry
+
+# RULE_ID -> "module:class"
+DETECTORS = PluginRegistry({
+    "FOOTER_KLARNA_LOGO": "app.detectors.footer_klarna_logo_detector:FooterKlarnaLogoDetector",
+}, group="klarna_auditor.detectors")
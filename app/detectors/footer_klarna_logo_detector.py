@@ -3,9 +3,12 @@ FOOTER_KLARNA_LOGO detector
 Detects Klarna logo in footer by checking keywords or img alt/src attributes
 """
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 from dataclasses import dataclass
 
+from app.detectors.page_source import PageSourceView
+from app.utils.handles import HandleArena
+
 
 @dataclass
 class DetectionResult:
@@ -23,6 +26,7 @@ class FooterKlarnaLogoDetector:
     """Detect Klarna logo in footer"""
 
     RULE_ID = "FOOTER_KLARNA_LOGO"
+    DESCRIPTION = "Detect Klarna logo in footer"
 
     def __init__(self):
         """Initialize detector"""
@@ -35,63 +39,65 @@ class FooterKlarnaLogoDetector:
             r'logo.*klarna'
         ]
 
-    async def detect(self, page_source: str, browser_manager) -> DetectionResult:
+    async def detect(self, page_source: Union[str, PageSourceView], browser_manager) -> DetectionResult:
         """
         Detect Klarna logo in footer
         
         Args:
-            page_source: HTML page source
+            page_source: HTML page source, or a capped lower-cased view of it
             browser_manager: Browser manager instance
             
         Returns:
             DetectionResult object
         """
-        page_source_lower = page_source.lower()
+        page_source_view = PageSourceView.coerce(page_source)
         matched_selectors = []
         found = False
 
-        # Check for keywords in footer area
-        # Try to find footer element first
-        footer_elements = await browser_manager.find_elements('footer')
-        if not footer_elements:
-            # Try alternative footer selectors
-            footer_elements = await browser_manager.find_elements('[class*="footer"]')
+        # Element handles pin DOM nodes in the renderer until disposed
+        async with HandleArena() as arena:
+            # Check for keywords in footer area
+            # Try to find footer element first
+            footer_elements = arena.track(await browser_manager.find_elements('footer'))
             if not footer_elements:
-                footer_elements = await browser_manager.find_elements('[id*="footer"]')
+                # Try alternative footer selectors
+                footer_elements = arena.track(await browser_manager.find_elements('[class*="footer"]'))
+                if not footer_elements:
+                    footer_elements = arena.track(await browser_manager.find_elements('[id*="footer"]'))
 
-        footer_text = ""
-        if footer_elements:
-            for elem in footer_elements[:1]:  # Check first footer element
-                try:
-                    footer_text = (await elem.inner_text()).lower()
-                except Exception:
-                    pass
+            footer_text = ""
+            if footer_elements:
+                for elem in footer_elements[:1]:  # Check first footer element
+                    try:
+                        footer_text = (await elem.inner_text()).lower()
+                    except Exception:
+                        pass
 
-        # Check keywords in footer text
-        for keyword in self.keywords:
-            if keyword in footer_text or keyword in page_source_lower:
-                matched_selectors.append(f"keyword:{keyword}")
-                found = True
-                break
+            # Check keywords in footer text
+            for keyword in self.keywords:
+                if keyword in footer_text or keyword in page_source_view:
+                    matched_selectors.append(f"keyword:{keyword}")
+                    found = True
+                    break
 
-        # Check img elements with klarna in alt or src
-        img_elements = await browser_manager.find_elements('img')
-        for img in img_elements:
-            try:
-                alt = await img.get_attribute('alt') or ''
-                src = await img.get_attribute('src') or ''
-                alt_lower = alt.lower()
-                src_lower = src.lower()
+            # Check img elements with klarna in alt or src
+            img_elements = arena.track(await browser_manager.find_elements('img'))
+            for img in img_elements:
+                try:
+                    alt = await img.get_attribute('alt') or ''
+                    src = await img.get_attribute('src') or ''
+                    alt_lower = alt.lower()
+                    src_lower = src.lower()
 
-                # Check if alt or src contains klarna
-                for pattern in self.img_patterns:
-                    if re.search(pattern, alt_lower, re.IGNORECASE) or \
-                       re.search(pattern, src_lower, re.IGNORECASE):
-                        matched_selectors.append(f"img:alt={alt},src={src}")
-                        found = True
-                        break
-            except Exception:
-                continue
+                    # Check if alt or src contains klarna
+                    for pattern in self.img_patterns:
+                        if re.search(pattern, alt_lower, re.IGNORECASE) or \
+                           re.search(pattern, src_lower, re.IGNORECASE):
+                            matched_selectors.append(f"img:alt={alt},src={src}")
+                            found = True
+                            break
+                except Exception:
+                    continue
 
         # Calculate confidence
         confidence = 0.95 if found else 0.0
@@ -0,0 +1,65 @@
+"""
+Bounded-memory, case-folded view of a page's HTML
+"""
+from dataclasses import dataclass
+from typing import Union
+
+# Characters kept from each end of the document; footers sit at the tail,
+# meta tags and most script/config blobs at the head
+DEFAULT_CAP = 256 * 1024
+
+# Runs in the page so only the capped slices cross the Playwright connection
+PAGE_SOURCE_VIEW_SCRIPT = """
+(cap) => {
+    const html = document.documentElement ? document.documentElement.outerHTML : '';
+    const length = html.length;
+    if (length <= 2 * cap) {
+        return {head: html.toLowerCase(), tail: '', length: length};
+    }
+    return {
+        head: html.slice(0, cap).toLowerCase(),
+        tail: html.slice(length - cap).toLowerCase(),
+        length: length
+    };
+}
+"""
+
+
+@dataclass
+class PageSourceView:
+    """
+    Lower-cased head and tail of a page's HTML, at most 2 * cap characters
+
+    Detectors test substrings with `needle in view`. Pages larger than
+    2 * cap lose their middle section; `truncated` reports when that happened.
+    """
+    head: str
+    tail: str = ""
+    length: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.length > len(self.head) + len(self.tail)
+
+    def __contains__(self, needle: str) -> bool:
+        return needle in self.head or needle in self.tail
+
+    @classmethod
+    def from_html(cls, html: str, cap: int = DEFAULT_CAP) -> "PageSourceView":
+        """Build a view from HTML already held in Python"""
+        if len(html) <= 2 * cap:
+            return cls(head=html.lower(), length=len(html))
+        return cls(head=html[:cap].lower(), tail=html[-cap:].lower(), length=len(html))
+
+    @classmethod
+    async def from_page(cls, page, cap: int = DEFAULT_CAP) -> "PageSourceView":
+        """Build a view in the browser, transferring at most 2 * cap characters"""
+        data = await page.evaluate(PAGE_SOURCE_VIEW_SCRIPT, cap)
+        return cls(head=data['head'], tail=data['tail'], length=data['length'])
+
+    @classmethod
+    def coerce(cls, page_source: Union[str, "PageSourceView"], cap: int = DEFAULT_CAP) -> "PageSourceView":
+        """Accept either raw HTML or an existing view"""
+        if isinstance(page_source, PageSourceView):
+            return page_source
+        return cls.from_html(page_source or "", cap)
@@ -0,0 +1,67 @@
+"""
+Report tools
+
+Usage:
+    python -m app.report diff OLD NEW [--out changes.jsonl]
+    python -m app.report dashboard REPORT [REPORT ...] --out out/dashboard
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from app.report.dashboard import SHARD_SIZE, build_dashboard
+from app.report.diff import diff_reports, write_changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(prog='python -m app.report', description='Audit report tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = sub.add_parser('diff', help='Report status, Klarna position and evidence changes between two runs')
+    diff_parser.add_argument('old', help='Earlier report (app/auditor JSON or JSONL)')
+    diff_parser.add_argument('new', help='Later report (app/auditor JSON or JSONL)')
+    diff_parser.add_argument('--out', default=None, help='Changes file (JSON lines, default: stdout)')
+    diff_parser.add_argument(
+        '--fail-on-change',
+        action='store_true',
+        default=False,
+        help='Exit with status 1 if anything changed (for alerting)'
+    )
+
+    dashboard_parser = sub.add_parser('dashboard', help='Build a static HTML dashboard from reports')
+    dashboard_parser.add_argument('reports', nargs='+', help='Reports (app/auditor JSON or JSONL)')
+    dashboard_parser.add_argument('--out', required=True, help='Dashboard output directory')
+    dashboard_parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help=f'Rows per data shard (default: {SHARD_SIZE})')
+    dashboard_parser.add_argument(
+        '--no-thumbnails',
+        action='store_true',
+        default=False,
+        help='Link screenshots without generating thumbnails'
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'diff':
+        changes = diff_reports(args.old, args.new)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as out:
+                counts = write_changes(changes, out)
+        else:
+            counts = write_changes(changes, sys.stdout)
+        print(
+            f"{counts['changed']} changed, {counts['added']} added, {counts['removed']} removed",
+            file=sys.stderr
+        )
+        if args.fail_on_change and any(counts.values()):
+            return 1
+    elif args.command == 'dashboard':
+        index_path = build_dashboard(
+            args.reports, args.out, shard_size=args.shard_size, thumbnails=not args.no_thumbnails
+        )
+        print(f"Dashboard: {index_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
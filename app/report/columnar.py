@@ -0,0 +1,149 @@
+"""
+Columnar (Parquet / Arrow IPC) export of audit results
+
+Requires the optional pyarrow package. Results become typed columns (status
+as a dictionary column, confidence/timings as floats, klarna_index as a
+nullable integer) and summary statistics are computed with Arrow compute
+kernels over those columns.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def require_pyarrow() -> None:
+    """Raise a helpful error if pyarrow is not installed"""
+    if pa is None:
+        raise ImportError("Columnar export requires pyarrow (pip install pyarrow)")
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.rstrip("Z"))
+    except ValueError:
+        return None
+
+
+def _status(values: List[str]):
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+
+def audit_results_table(results: List[Any]) -> "pa.Table":
+    """
+    Table of app.run AuditResults
+
+    Each timing stage becomes a float32 column `timing_<stage>_ms`.
+    """
+    require_pyarrow()
+    stages = sorted({stage for r in results for stage in r.timings})
+    columns = {
+        "merchant_id": pa.array([r.merchant_id for r in results], type=pa.string()),
+        "rule_id": _status([r.rule_id for r in results]),
+        "audit_status": _status([r.audit_status for r in results]),
+        "status": _status(["passed" if r.passed else "failed" for r in results]),
+        "passed": pa.array([r.passed for r in results], type=pa.bool_()),
+        "confidence": pa.array([r.confidence for r in results], type=pa.float32()),
+        "audit_timestamp": pa.array([_timestamp(r.audit_timestamp) for r in results], type=pa.timestamp("ms")),
+        "failure_kind": _status([r.failure_kind for r in results]),
+        "attempts": pa.array([r.attempts for r in results], type=pa.int16()),
+        "cached": pa.array([r.cached for r in results], type=pa.bool_()),
+    }
+    for stage in stages:
+        columns[f"timing_{stage}_ms"] = pa.array([r.timings.get(stage) for r in results], type=pa.float32())
+    return pa.table(columns)
+
+
+def check_results_table(merchant: str, results: List[Any]) -> "pa.Table":
+    """Table of auditor.run CheckResults"""
+    require_pyarrow()
+    return pa.table({
+        "merchant": _status([merchant] * len(results)),
+        "check_id": _status([r.check_id for r in results]),
+        "status": _status([r.status for r in results]),
+        "timestamp": pa.array([_timestamp(r.timestamp) for r in results], type=pa.timestamp("ms")),
+        "klarna_index": pa.array([r.klarna_index for r in results], type=pa.int16()),
+        "duration_ms": pa.array([r.duration_ms for r in results], type=pa.float32()),
+        "cached": pa.array([r.cached for r in results], type=pa.bool_()),
+        "error_reason": pa.array([r.error_reason for r in results], type=pa.string()),
+    })
+
+
+def write_table(table: "pa.Table", path_without_suffix: str, fmt: str = "parquet") -> str:
+    """
+    Write a table as Parquet or Arrow IPC
+
+    Args:
+        table: Table to write
+        path_without_suffix: Output path; the format's suffix is appended
+        fmt: "parquet" or "arrow"
+
+    Returns:
+        Path of the written file
+    """
+    require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt} (expected one of {', '.join(FORMATS)})")
+    path = str(Path(path_without_suffix).with_suffix(FORMATS[fmt]))
+    if fmt == "parquet":
+        pq.write_table(table, path, compression="zstd")
+    else:
+        feather.write_feather(table, path, compression="zstd")
+    return path
+
+
+def _count(mask) -> int:
+    return int(pc.sum(mask, min_count=0).as_py() or 0)
+
+
+def _quantiles(column) -> Dict[str, Optional[float]]:
+    values = pc.drop_null(column)
+    if len(values) == 0:
+        return {"p50": None, "p95": None, "max": None}
+    p50, p95 = pc.quantile(values, q=[0.5, 0.95], interpolation="nearest").to_pylist()
+    return {"p50": round(p50, 1), "p95": round(p95, 1), "max": round(pc.max(values).as_py(), 1)}
+
+
+def audit_summary(table: "pa.Table") -> Dict[str, Any]:
+    """Summary counts of an audit results table (same keys as the JSON report)"""
+    audit_status = table["audit_status"].cast(pa.string())
+    completed = pc.equal(audit_status, "completed")
+    passed = table["passed"]
+    summary = {
+        "total_merchants_audited": _count(completed),
+        "total_merchants_passed": _count(passed),
+        "total_merchants_failed": _count(pc.and_(completed, pc.invert(passed))),
+        "total_merchants_skipped": _count(pc.equal(audit_status, "skipped")),
+    }
+    timings = {
+        name[len("timing_"):-len("_ms")]: _quantiles(table[name])
+        for name in table.column_names if name.startswith("timing_")
+    }
+    if timings:
+        summary["timings_ms"] = timings
+    return summary
+
+
+def check_summary(table: "pa.Table") -> Dict[str, Any]:
+    """Summary counts of a check results table (same keys as the JSON report)"""
+    status = table["status"].cast(pa.string())
+    summary = {
+        "passed": _count(pc.equal(status, "PASS")),
+        "failed": _count(pc.equal(status, "FAIL")),
+        "warned": _count(pc.equal(status, "WARN")),
+        "total": table.num_rows,
+    }
+    if table.num_rows:
+        summary["duration_ms"] = _quantiles(table["duration_ms"])
+    return summary
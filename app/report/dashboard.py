@@ -0,0 +1,292 @@
+"""
+Static HTML dashboard for large audit runs
+
+The dashboard is a small index.html plus sharded data files. Shards are
+JavaScript files (`window.dashboardShard(n, rows)`) rather than JSON so the
+dashboard also works when opened from disk, where browsers block fetch().
+The first shard renders immediately; the rest load in the background and
+feed client-side filtering. Screenshots are referenced, never inlined:
+thumbnails are generated once (with the optional Pillow package) and
+lazy-loaded, and originals are only loaded when clicked.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.report.diff import iter_report_records
+from app.report.history import normalize_status
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+SHARD_SIZE = 500
+THUMB_SIZE = (320, 240)
+
+
+def _screenshot_of(record: Dict[str, Any]) -> Optional[str]:
+    return (record.get("evidence") or {}).get("screenshot_path")
+
+
+def _row(merchant_id: str, rule_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    evidence = record.get("evidence") or {}
+    matched = evidence.get("matched_selectors") or [
+        v for v in (evidence.get("matched_selector"), evidence.get("matched_text")) if v
+    ]
+    return {
+        "m": merchant_id,
+        "r": rule_id,
+        "s": normalize_status(record),
+        "k": record.get("klarna_index"),
+        "e": "; ".join(matched)[:200],
+        "x": (record.get("error") or record.get("error_reason") or "")[:200],
+    }
+
+
+class ThumbnailCache:
+    """Thumbnails of screenshots, generated once per source image"""
+
+    def __init__(self, out_dir: Path, size=THUMB_SIZE):
+        self.dir = out_dir / "thumbs"
+        self.size = size
+        self.enabled = Image is not None
+        if not self.enabled:
+            logger.info("Pillow not installed; dashboard rows link to full screenshots without thumbnails")
+
+    def thumbnail(self, source: Path) -> Optional[Path]:
+        """Thumbnail path for a screenshot, creating it if missing or stale"""
+        if not self.enabled or not source.exists():
+            return None
+        name = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:16] + ".jpg"
+        target = self.dir / name
+        if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+            return target
+        self.dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with Image.open(source) as image:
+                # Full-page screenshots are tall; keep the top of the page at the thumbnail's aspect ratio
+                width, height = image.size
+                crop_height = min(height, int(width * self.size[1] / self.size[0]))
+                thumb = image.crop((0, 0, width, crop_height)).convert("RGB")
+                thumb.thumbnail(self.size)
+                thumb.save(target, "JPEG", quality=70)
+        except Exception as e:
+            logger.warning(f"Failed to create thumbnail for {source}: {e}")
+            return None
+        return target
+
+
+def _resolve(path: str, report_dir: Path) -> Path:
+    candidate = Path(path)
+    if candidate.is_absolute() or candidate.exists():
+        return candidate
+    return report_dir / candidate
+
+
+def _write_js(path: Path, call: str, payload: Any) -> None:
+    """Write payload as the last argument of a JavaScript call (call is e.g. "f(1, ")"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{call}{json.dumps(payload, ensure_ascii=False, separators=(',', ':'))});\n")
+
+
+def build_dashboard(
+    report_paths: Iterable[str],
+    out_dir: str,
+    shard_size: int = SHARD_SIZE,
+    thumbnails: bool = True
+) -> str:
+    """
+    Build a static dashboard from one or more reports
+
+    Args:
+        report_paths: app.run or auditor.run JSON reports (streamed, not loaded whole)
+        out_dir: Output directory (index.html, data/, thumbs/)
+        shard_size: Rows per data shard
+        thumbnails: Generate thumbnails (requires Pillow)
+
+    Returns:
+        Path to index.html
+    """
+    out = Path(out_dir)
+    data_dir = out / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    thumbs = ThumbnailCache(out) if thumbnails else None
+
+    def link(path: Path) -> str:
+        return Path(os.path.relpath(path.resolve(), out.resolve())).as_posix()
+
+    shard: List[Dict[str, Any]] = []
+    shard_count = 0
+    total = 0
+    counts: Dict[str, Dict[str, int]] = {}
+
+    def flush() -> None:
+        nonlocal shard, shard_count
+        _write_js(data_dir / f"shard_{shard_count:05d}.js", f"window.dashboardShard({shard_count}, ", shard)
+        shard_count += 1
+        shard = []
+
+    for report_path in report_paths:
+        report_dir = Path(report_path).parent
+        for merchant_id, rule_id, record in iter_report_records(report_path):
+            row = _row(merchant_id, rule_id, record)
+            screenshot = _screenshot_of(record)
+            if screenshot:
+                source = _resolve(screenshot, report_dir)
+                row["o"] = link(source)
+                thumb = thumbs.thumbnail(source) if thumbs else None
+                if thumb:
+                    row["t"] = link(thumb)
+            shard.append(row)
+            total += 1
+            by_status = counts.setdefault(rule_id, {})
+            by_status[row["s"]] = by_status.get(row["s"], 0) + 1
+            if len(shard) >= shard_size:
+                flush()
+    if shard or shard_count == 0:
+        flush()
+
+    # Remove shards left over from an earlier, larger build
+    for stale in data_dir.glob("shard_*.js"):
+        if int(stale.stem.split("_")[1]) >= shard_count:
+            stale.unlink()
+
+    _write_js(data_dir / "index.js", "window.dashboardIndex(", {
+        "total": total,
+        "shards": shard_count,
+        "shard_size": shard_size,
+        "counts": counts,
+    })
+    index_path = out / "index.html"
+    index_path.write_text(INDEX_HTML, encoding="utf-8")
+    return str(index_path)
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Klarna Integration Audit</title>
+<style>
+  body { font: 14px/1.4 system-ui, sans-serif; margin: 1.5em; color: #17120f; }
+  header { display: flex; flex-wrap: wrap; gap: .75em; align-items: center; margin-bottom: 1em; }
+  input, select, button { font: inherit; padding: .25em .5em; }
+  table { border-collapse: collapse; width: 100%; }
+  th, td { text-align: left; padding: .35em .5em; border-bottom: 1px solid #e5e1dc; vertical-align: top; }
+  td.thumb { width: 170px; }
+  td.thumb img { width: 160px; height: 120px; object-fit: cover; cursor: zoom-in; background: #f4f2ef; }
+  .PASS { color: #0a7a32; } .FAIL, .ERROR { color: #b3261e; } .WARN, .SKIPPED { color: #8a6d00; }
+  #counts span { margin-right: 1em; }
+  #viewer { position: fixed; inset: 0; background: rgba(0,0,0,.8); display: none; overflow: auto; }
+  #viewer img { display: block; margin: 2em auto; max-width: 95%; }
+</style>
+</head>
+<body>
+<header>
+  <strong>Klarna Integration Audit</strong>
+  <input id="q" type="search" placeholder="Filter merchant / evidence">
+  <select id="rule"><option value="">All rules</option></select>
+  <select id="status"><option value="">All statuses</option></select>
+  <button id="prev">&larr;</button><span id="page"></span><button id="next">&rarr;</button>
+  <span id="loaded"></span>
+</header>
+<div id="counts"></div>
+<table>
+  <thead><tr><th></th><th>Merchant</th><th>Rule</th><th>Status</th><th>Klarna #</th><th>Evidence</th><th>Error</th></tr></thead>
+  <tbody id="rows"></tbody>
+</table>
+<div id="viewer"><img alt=""></div>
+<script>
+const PAGE_SIZE = 100;
+let index = null, rows = [], filtered = [], page = 0, loadedShards = 0;
+const $ = (id) => document.getElementById(id);
+const esc = (s) => String(s == null ? '' : s).replace(/[&<>"]/g, (c) => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})[c]);
+
+function loadScript(src) {
+  const script = document.createElement('script');
+  script.src = src;
+  document.head.appendChild(script);
+}
+
+window.dashboardIndex = (data) => {
+  index = data;
+  const statuses = new Set();
+  const counts = [];
+  for (const [rule, byStatus] of Object.entries(data.counts)) {
+    $('rule').insertAdjacentHTML('beforeend', `<option>${esc(rule)}</option>`);
+    const parts = Object.entries(byStatus).map(([s, n]) => { statuses.add(s); return `<span class="${esc(s)}">${esc(s)} ${n}</span>`; });
+    counts.push(`<div><strong>${esc(rule)}</strong>: ${parts.join(' ')}</div>`);
+  }
+  statuses.forEach((s) => $('status').insertAdjacentHTML('beforeend', `<option>${esc(s)}</option>`));
+  $('counts').innerHTML = counts.join('');
+  if (data.shards) loadScript('data/shard_00000.js');
+};
+
+window.dashboardShard = (n, data) => {
+  loadedShards++;
+  // Only the new rows are filtered, so loading stays linear in the run size
+  for (const r of data) rows.push(r);
+  const matching = data.filter(matches(currentFilter()));
+  for (const r of matching) filtered.push(r);
+  if (n === 0 || page * PAGE_SIZE + PAGE_SIZE > filtered.length - matching.length) render();
+  else updatePager();
+  $('loaded').textContent = loadedShards < index.shards ? `loading ${rows.length} / ${index.total}` : `${index.total} results`;
+  // Load the remaining shards one at a time, after the first page has rendered
+  if (n + 1 < index.shards) {
+    (window.requestIdleCallback || setTimeout)(() => loadScript(`data/shard_${String(n + 1).padStart(5, '0')}.js`));
+  }
+};
+
+function currentFilter() {
+  return {q: $('q').value.toLowerCase(), rule: $('rule').value, status: $('status').value};
+}
+
+function matches(f) {
+  return (r) => (!f.rule || r.r === f.rule) && (!f.status || r.s === f.status)
+    && (!f.q || r.m.toLowerCase().includes(f.q) || r.e.toLowerCase().includes(f.q));
+}
+
+function applyFilter() {
+  filtered = rows.filter(matches(currentFilter()));
+  page = 0;
+  render();
+}
+
+function updatePager() {
+  const pages = Math.max(1, Math.ceil(filtered.length / PAGE_SIZE));
+  page = Math.min(page, pages - 1);
+  $('page').textContent = `${page + 1} / ${pages}`;
+}
+
+function render() {
+  updatePager();
+  $('rows').innerHTML = filtered.slice(page * PAGE_SIZE, (page + 1) * PAGE_SIZE).map((r) => `
+    <tr>
+      <td class="thumb">${r.t ? `<img loading="lazy" src="${esc(r.t)}" data-original="${esc(r.o)}" alt="">`
+        : r.o ? `<a href="${esc(r.o)}" target="_blank">screenshot</a>` : ''}</td>
+      <td>${esc(r.m)}</td><td>${esc(r.r)}</td><td class="${esc(r.s)}">${esc(r.s)}</td>
+      <td>${esc(r.k)}</td><td>${esc(r.e)}</td><td>${esc(r.x)}</td>
+    </tr>`).join('');
+}
+
+$('rows').addEventListener('click', (event) => {
+  const original = event.target.dataset && event.target.dataset.original;
+  if (!original) return;
+  $('viewer').querySelector('img').src = original;
+  $('viewer').style.display = 'block';
+});
+$('viewer').addEventListener('click', () => { $('viewer').style.display = 'none'; $('viewer').querySelector('img').src = ''; });
+['q', 'rule', 'status'].forEach((id) => $(id).addEventListener('input', applyFilter));
+$('prev').addEventListener('click', () => { page = Math.max(0, page - 1); render(); });
+$('next').addEventListener('click', () => { page++; render(); });
+loadScript('data/index.js');
+</script>
+</body>
+</html>
+"""
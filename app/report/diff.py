@@ -0,0 +1,196 @@
+"""
+Run-to-run diff of audit reports
+
+Reports are read as streams: the top-level object is decoded key by key and
+the large result array element by element, so memory does not grow with the
+report size. OLD is reduced to a hash table of compact per-(merchant_id,
+rule_id) states; NEW is then streamed and probed against it (a hash join).
+Only status, Klarna position and matched-evidence changes are reported.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+from app.report.history import normalize_status
+
+CHUNK_SIZE = 1 << 20
+
+# Keys holding the result array in app.run and auditor.run reports
+RESULT_ARRAYS = ("merchants", "results")
+
+_decoder = json.JSONDecoder()
+
+
+class _StreamReader:
+    """Incremental JSON tokenizer over a text file"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in report, found {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A value ending at the buffer edge may be a truncated number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_report_records(path: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Stream (merchant_id, rule_id, record) from a report
+
+    Accepts app.run reports, auditor.run reports and JSONL files with one
+    app-format record per line.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["merchant_id"], record["rule_id"], record
+            return
+
+        reader = _StreamReader(f)
+        header: Dict[str, Any] = {}
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key in RESULT_ARRAYS:
+                reader.expect("[")
+                while reader.peek() != "]":
+                    record = reader.value()
+                    if "check_id" in record:
+                        # auditor.run reports name the merchant once, before the results
+                        yield header.get("merchant", ""), record["check_id"], record
+                    else:
+                        yield record["merchant_id"], record["rule_id"], record
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                reader.expect("]")
+            else:
+                header[key] = reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+
+
+# Evidence fields describing what was matched; anything else (screenshot
+# paths, timestamps, URLs) changes every run or is not a finding
+EVIDENCE_FIELDS = ("matched_selectors", "matched_selector", "matched_text", "snippet_ref")
+
+
+def record_evidence(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Matched evidence of a record (EVIDENCE_FIELDS plus payment methods)"""
+    raw = record.get("evidence") or {}
+    evidence = {k: raw[k] for k in EVIDENCE_FIELDS if raw.get(k) is not None}
+    if record.get("payment_methods") is not None:
+        evidence["payment_methods"] = record["payment_methods"]
+    return evidence
+
+
+def record_state(record: Dict[str, Any]) -> Tuple[str, Optional[int], bytes]:
+    """Compact comparable state: (status, klarna_index, evidence digest)"""
+    evidence = json.dumps(record_evidence(record), sort_keys=True, ensure_ascii=False)
+    digest = hashlib.blake2b(evidence.encode('utf-8'), digest_size=8).digest()
+    return normalize_status(record), record.get("klarna_index"), digest
+
+
+def diff_reports(old_path: str, new_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Changes between two reports
+
+    Args:
+        old_path: Earlier report
+        new_path: Later report
+
+    Yields:
+        Change dicts: merchant_id, rule_id, change ("changed" | "added" |
+        "removed"), fields that changed, and old/new status and klarna_index
+        (plus the new evidence when it changed)
+    """
+    old: Dict[Tuple[str, str], Tuple[str, Optional[int], bytes]] = {}
+    for merchant_id, rule_id, record in iter_report_records(old_path):
+        old[(merchant_id, rule_id)] = record_state(record)
+
+    for merchant_id, rule_id, record in iter_report_records(new_path):
+        new_state = record_state(record)
+        old_state = old.pop((merchant_id, rule_id), None)
+        new_side = {"status": new_state[0], "klarna_index": new_state[1]}
+        if old_state is None:
+            yield {"merchant_id": merchant_id, "rule_id": rule_id, "change": "added", "new": new_side}
+            continue
+        if old_state == new_state:
+            continue
+        fields = [
+            name for name, before, after in zip(("status", "klarna_index", "evidence"), old_state, new_state)
+            if before != after
+        ]
+        if "evidence" in fields:
+            new_side["evidence"] = record_evidence(record)
+        yield {
+            "merchant_id": merchant_id,
+            "rule_id": rule_id,
+            "change": "changed",
+            "fields": fields,
+            "old": {"status": old_state[0], "klarna_index": old_state[1]},
+            "new": new_side
+        }
+
+    for (merchant_id, rule_id), (status, klarna_index, _) in old.items():
+        yield {
+            "merchant_id": merchant_id,
+            "rule_id": rule_id,
+            "change": "removed",
+            "old": {"status": status, "klarna_index": klarna_index}
+        }
+
+
+def write_changes(changes: Iterator[Dict[str, Any]], out: TextIO) -> Dict[str, int]:
+    """
+    Write changes as JSON lines
+
+    Returns:
+        Count per change type
+    """
+    counts = {"changed": 0, "added": 0, "removed": 0}
+    for change in changes:
+        counts[change["change"]] += 1
+        out.write(json.dumps(change, ensure_ascii=False) + "\n")
+    return counts
@@ -0,0 +1,308 @@
+"""
+SQLite-backed audit history
+
+Every result of every run is stored as one row keyed by (run_id, merchant_id,
+rule_id), with indexes for per-merchant history, per-rule status queries and
+time windows. Both report formats are accepted: `app.run` reports
+(`audit_*.json`) and `auditor.run` reports (`<merchant>/report.json`).
+
+Usage:
+    python -m app.report.history --db out/history.sqlite import out/audit_*.json
+    python -m app.report.history --db out/history.sqlite regressions --rule PDP_OSM --since 7d
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    merchant_id TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL,
+    klarna_index INTEGER,
+    evidence TEXT,
+    error TEXT,
+    cached INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, merchant_id, rule_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_merchant_rule_ts ON results (merchant_id, rule_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_rule_status_ts ON results (rule_id, status, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_ts ON results (timestamp);
+"""
+
+COLUMNS = ("run_id", "merchant_id", "rule_id", "timestamp", "status", "klarna_index", "evidence", "error", "cached")
+
+
+def normalize_status(record: Dict[str, Any]) -> str:
+    """
+    Map both report formats to PASS / FAIL / WARN / ERROR / SKIPPED
+
+    `app.run` records carry audit_status plus passed/failed; `auditor.run`
+    records already use PASS / FAIL / WARN.
+    """
+    if "check_id" in record:
+        return record["status"]
+    if record.get("audit_status") == "skipped":
+        return "SKIPPED"
+    if record.get("audit_status") == "failed":
+        return "ERROR"
+    return "PASS" if record.get("status") == "passed" else "FAIL"
+
+
+def report_rows(report: Dict[str, Any]) -> Iterator[tuple]:
+    """Rows of the results table for a parsed JSON report"""
+    if "merchants" in report:
+        run_id = report["audit_metadata"]["audit_id"]
+        for record in report["merchants"]:
+            yield (
+                run_id,
+                record["merchant_id"],
+                record["rule_id"],
+                record["audit_timestamp"],
+                normalize_status(record),
+                None,
+                json.dumps(record.get("evidence") or {}, ensure_ascii=False),
+                record.get("error"),
+                int(bool(record.get("cached")))
+            )
+    else:
+        run_id = f"{report['merchant']}:{report['run_id']}"
+        for record in report["results"]:
+            yield (
+                run_id,
+                report["merchant"],
+                record["check_id"],
+                record["timestamp"],
+                normalize_status(record),
+                record.get("klarna_index"),
+                json.dumps(record.get("evidence") or {}, ensure_ascii=False),
+                record.get("error_reason"),
+                int(bool(record.get("cached")))
+            )
+
+
+def report_run(report: Dict[str, Any]) -> tuple:
+    """(run_id, source, timestamp) of a parsed JSON report"""
+    if "merchants" in report:
+        meta = report["audit_metadata"]
+        return meta["audit_id"], "app", meta["timestamp"]
+    return f"{report['merchant']}:{report['run_id']}", "auditor", report["timestamp"]
+
+
+def parse_since(since: Optional[str]) -> Optional[str]:
+    """
+    Turn "7d" / "24h" / an ISO date into an ISO timestamp lower bound
+
+    Timestamps are stored as ISO strings, so range filters compare lexically.
+    """
+    if not since:
+        return None
+    match = re.fullmatch(r"(\d+)([dh])", since)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = timedelta(days=amount) if unit == "d" else timedelta(hours=amount)
+        return (datetime.now() - delta).isoformat()
+    return since
+
+
+class HistoryStore:
+    """Audit results of all runs in one indexed SQLite database"""
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) a history database
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def record_report(self, report: Dict[str, Any]) -> int:
+        """
+        Store all results of a parsed JSON report (re-importing a run replaces it)
+
+        Returns:
+            Number of results stored
+        """
+        rows = list(report_rows(report))
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?)", report_run(report))
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows
+            )
+        return len(rows)
+
+    def import_file(self, report_path: str) -> int:
+        """Store all results of a JSON report file"""
+        with open(report_path, 'r', encoding='utf-8') as f:
+            return self.record_report(json.load(f))
+
+    def latest(
+        self,
+        merchant_id: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """Most recent result per (merchant, rule), optionally filtered"""
+        where, params = self._filters(merchant_id=merchant_id, rule_id=rule_id)
+        # SQLite returns the other columns from the row holding max(timestamp)
+        rows = self.conn.execute(
+            f"SELECT merchant_id, rule_id, max(timestamp) AS timestamp, status, klarna_index, run_id, cached "
+            f"FROM results {where} GROUP BY merchant_id, rule_id ORDER BY merchant_id, rule_id",
+            params
+        ).fetchall()
+        return [r for r in rows if status is None or r["status"] == status]
+
+    def history(
+        self,
+        merchant_id: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """All results in time order, optionally filtered"""
+        where, params = self._filters(merchant_id=merchant_id, rule_id=rule_id, since=since)
+        return self.conn.execute(
+            f"SELECT merchant_id, rule_id, timestamp, status, klarna_index, run_id, cached "
+            f"FROM results {where} ORDER BY merchant_id, rule_id, timestamp",
+            params
+        ).fetchall()
+
+    def regressions(
+        self,
+        rule_id: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """
+        Results that went from PASS to anything else, optionally since a time
+
+        The previous status may be older than `since`; only the change itself
+        has to fall inside the window.
+        """
+        where, params = self._filters(rule_id=rule_id)
+        since_filter = "AND timestamp >= ?" if since else ""
+        return self.conn.execute(
+            f"""
+            SELECT merchant_id, rule_id, timestamp, previous_status, status, run_id FROM (
+                SELECT merchant_id, rule_id, timestamp, status, run_id,
+                       LAG(status) OVER (PARTITION BY merchant_id, rule_id ORDER BY timestamp) AS previous_status
+                FROM results {where}
+            )
+            WHERE previous_status = 'PASS' AND status != 'PASS' {since_filter}
+            ORDER BY timestamp, merchant_id, rule_id
+            """,
+            params + ([since] if since else [])
+        ).fetchall()
+
+    def trend(
+        self,
+        rule_id: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """Daily pass counts per rule"""
+        where, params = self._filters(rule_id=rule_id, since=since)
+        return self.conn.execute(
+            f"SELECT substr(timestamp, 1, 10) AS day, rule_id, "
+            f"sum(status = 'PASS') AS passed, count(*) AS total "
+            f"FROM results {where} GROUP BY day, rule_id ORDER BY day, rule_id",
+            params
+        ).fetchall()
+
+    @staticmethod
+    def _filters(
+        merchant_id: Optional[str] = None,
+        rule_id: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> tuple:
+        clauses, params = [], []
+        if merchant_id:
+            clauses.append("merchant_id = ?")
+            params.append(merchant_id)
+        if rule_id:
+            clauses.append("rule_id = ?")
+            params.append(rule_id)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _print_rows(rows: List[sqlite3.Row]) -> None:
+    if not rows:
+        print("(no results)")
+        return
+    print("\t".join(rows[0].keys()))
+    for row in rows:
+        print("\t".join("" if v is None else str(v) for v in row))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Query the audit history database')
+    parser.add_argument('--db', required=True, help='SQLite history database')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = sub.add_parser('import', help='Import JSON reports')
+    import_parser.add_argument('reports', nargs='+', help='Report files (app or auditor format)')
+
+    for name, help_text in [
+        ('latest', 'Most recent result per merchant and rule'),
+        ('history', 'All results in time order'),
+        ('regressions', 'Results that stopped passing'),
+        ('trend', 'Daily pass counts per rule'),
+    ]:
+        query_parser = sub.add_parser(name, help=help_text)
+        query_parser.add_argument('--rule', default=None, help='Rule or check ID (e.g. PDP_OSM)')
+        if name in ('latest', 'history'):
+            query_parser.add_argument('--merchant', default=None, help='Merchant ID')
+        if name == 'latest':
+            query_parser.add_argument('--status', default=None, help='PASS, FAIL, WARN, ERROR or SKIPPED')
+        else:
+            query_parser.add_argument('--since', default=None, help='Window start: 7d, 24h or an ISO date')
+
+    args = parser.parse_args(argv)
+
+    with HistoryStore(args.db) as store:
+        if args.command == 'import':
+            for report in args.reports:
+                count = store.import_file(report)
+                print(f"Imported {count} results from {report}")
+        elif args.command == 'latest':
+            _print_rows(store.latest(args.merchant, args.rule, args.status))
+        elif args.command == 'history':
+            _print_rows(store.history(args.merchant, args.rule, parse_since(args.since)))
+        elif args.command == 'regressions':
+            _print_rows(store.regressions(args.rule, parse_since(args.since)))
+        elif args.command == 'trend':
+            _print_rows(store.trend(args.rule, parse_since(args.since)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
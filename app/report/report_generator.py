@@ -5,7 +5,7 @@ import json
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -24,6 +24,10 @@ class AuditResult:
     screenshot_path: Optional[str]
     message: str
     error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # stage -> milliseconds
+    failure_kind: Optional[str] = None  # "transient_network" | "timeout" | "permanent" | "detector_bug"
+    attempts: int = 1
+    cached: bool = False  # reused from the result cache (page and detector unchanged)
 
 
 class ReportGenerator:
@@ -39,13 +43,22 @@ class ReportGenerator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate(self, results: List[AuditResult], filename: str = None) -> str:
+    def generate(
+        self,
+        results: List[AuditResult],
+        filename: str = None,
+        performance: Optional[Dict[str, Any]] = None,
+        columnar: Optional[str] = None
+    ) -> str:
         """
         Generate JSON report from audit results
         
         Args:
             results: List of audit results
             filename: Optional filename (default: audit_YYYYMMDD_HHMMSS.json)
+            performance: Optional run metrics (RPC counts, event-loop lag) added to the summary
+            columnar: Also write a "parquet" or "arrow" file next to the JSON
+                (requires pyarrow; the summary is then computed over its columns)
             
         Returns:
             Path to generated report file
@@ -56,6 +69,21 @@ class ReportGenerator:
 
         report_path = self.output_dir / filename
 
+        columnar_path = None
+        if columnar:
+            # pyarrow is slow to import; only load it when a columnar file is requested
+            from app.report.columnar import audit_results_table, audit_summary, write_table
+            table = audit_results_table(results)
+            columnar_path = write_table(table, str(report_path), columnar)
+            summary = audit_summary(table)
+        else:
+            summary = {
+                "total_merchants_audited": len([r for r in results if r.audit_status == "completed"]),
+                "total_merchants_passed": len([r for r in results if r.passed]),
+                "total_merchants_failed": len([r for r in results if not r.passed and r.audit_status == "completed"]),
+                "total_merchants_skipped": len([r for r in results if r.audit_status == "skipped"])
+            }
+
         # Create report structure
         report = {
             "audit_metadata": {
@@ -64,14 +92,13 @@ class ReportGenerator:
                 "version": "1.0.0",
                 "total_merchants": len(results)
             },
-            "summary": {
-                "total_merchants_audited": len([r for r in results if r.audit_status == "completed"]),
-                "total_merchants_passed": len([r for r in results if r.passed]),
-                "total_merchants_failed": len([r for r in results if not r.passed and r.audit_status == "completed"]),
-                "total_merchants_skipped": len([r for r in results if r.audit_status == "skipped"])
-            },
+            "summary": summary,
             "merchants": [self._format_result(result) for result in results]
         }
+        if performance:
+            report["summary"]["performance"] = performance
+        if columnar_path:
+            report["audit_metadata"]["columnar_file"] = Path(columnar_path).name
 
         # Write JSON file
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -100,5 +127,9 @@ class ReportGenerator:
                 "timestamp": result.audit_timestamp
             },
             "message": result.message,
-            "error": result.error
+            "error": result.error,
+            "failure_kind": result.failure_kind,
+            "attempts": result.attempts,
+            "cached": result.cached,
+            "timings_ms": result.timings
         }
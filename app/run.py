@@ -3,13 +3,28 @@ CLI entry point for the auditor
 """
 import argparse
 import asyncio
+import json
 import logging
 import sys
+from datetime import datetime
 from pathlib import Path
 
 from app.data.merchant_loader import MerchantLoader
+from app.data.preflight import preflight
 from app.core.auditor import Auditor
+from app.core.host_limiter import HostLimiter
+from app.core.result_cache import ResultCache
+from app.detectors import DETECTORS
+from app.report.dashboard import build_dashboard
+from app.report.history import HistoryStore
 from app.report.report_generator import ReportGenerator
+from app.utils.memory import MemoryWatermark
+from app.utils.metrics import RpcCounter, EventLoopLagMonitor
+from app.utils.profiling import MerchantProfiler
+from app.utils.timeouts import AdaptiveTimeouts, LatencyHistory
+
+# Merchants with the most RPC calls listed in the printed summary
+SUMMARY_TOP_MERCHANTS = 10
 
 
 def setup_logging():
@@ -56,6 +71,129 @@ async def main():
         default=2,
         help='Maximum number of retries for failed audits (default: 2)'
     )
+    parser.add_argument(
+        '--preflight',
+        action='store_true',
+        default=False,
+        help='Validate and dedupe registry rows and probe every base URL over HTTP before launching browsers; '
+             'unreachable merchants are reported as skipped'
+    )
+    parser.add_argument(
+        '--preflight-only',
+        action='store_true',
+        default=False,
+        help='Run the preflight, write preflight_<timestamp>.json and exit without auditing'
+    )
+    parser.add_argument(
+        '--preflight-concurrency',
+        type=int,
+        default=16,
+        help='Reachability probes in flight at the same time (default: 16)'
+    )
+    parser.add_argument(
+        '--latency-history',
+        default=None,
+        help='JSON file with per-domain latency history; enables adaptive timeouts (--timeout is the fallback)'
+    )
+    parser.add_argument(
+        '--columnar',
+        choices=['parquet', 'arrow'],
+        default=None,
+        help='Also write results as Parquet or Arrow IPC for analytics (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--dashboard',
+        action='store_true',
+        default=False,
+        help='Also build a static HTML dashboard in <out>/dashboard'
+    )
+    parser.add_argument(
+        '--history-db',
+        default=None,
+        help='SQLite audit history; results of this run are added to it (query with python -m app.report.history)'
+    )
+    parser.add_argument(
+        '--result-cache',
+        default=None,
+        help='JSON result cache; merchants whose page and detector are unchanged reuse their previous result'
+    )
+    parser.add_argument(
+        '--detectors',
+        default=None,
+        help=f'Comma-separated detector rule IDs to run (default: all; available: {", ".join(DETECTORS.ids(include_external=False))})'
+    )
+    parser.add_argument(
+        '--rules-dir',
+        default=None,
+        help='Directory of YAML rules (e.g. configs/rules); homepage rules run alongside the built-in detectors '
+             'in the same page load and replace built-in detectors with the same rule ID'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of merchants audited in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--per-host-concurrency',
+        type=int,
+        default=2,
+        help='Maximum concurrent navigations to the same host (default: 2)'
+    )
+    parser.add_argument(
+        '--per-host-rate',
+        type=float,
+        default=1.0,
+        help='Maximum navigations per second to the same host (default: 1.0)'
+    )
+    parser.add_argument(
+        '--circuit-threshold',
+        type=int,
+        default=3,
+        help='Consecutive navigation timeouts before a host is fast-failed (default: 3)'
+    )
+    parser.add_argument(
+        '--circuit-cooldown',
+        type=float,
+        default=120.0,
+        help='Seconds a host is fast-failed after its circuit opens (default: 120)'
+    )
+    parser.add_argument(
+        '--heap-watermark-mb',
+        type=float,
+        default=256.0,
+        help='Log merchants whose JS heap exceeds this many MB after detection (default: 256)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        default=False,
+        help='Profile selected merchants with cProfile (.pstats saved next to the report); '
+             'each profiled merchant runs alone because cProfile records the whole thread'
+    )
+    parser.add_argument(
+        '--profile-sample-rate',
+        type=float,
+        default=1.0,
+        help='Fraction of merchants to profile (default: 1.0)'
+    )
+    parser.add_argument(
+        '--profile-merchants',
+        default=None,
+        help='Comma-separated merchant IDs to profile (overrides --profile-sample-rate)'
+    )
+    parser.add_argument(
+        '--profile-trace',
+        action='store_true',
+        default=False,
+        help='Also record Playwright traces with snapshots for profiled merchants'
+    )
+    parser.add_argument(
+        '--profile-trace-threshold',
+        type=int,
+        default=60000,
+        help='Keep a trace only if the merchant takes longer than this many ms or fails (default: 60000)'
+    )
 
     args = parser.parse_args()
 
@@ -69,6 +207,13 @@ async def main():
         logger.error(f"Input file not found: {args.input}")
         sys.exit(1)
 
+    # Validate the detector selection before loading anything heavy
+    try:
+        DETECTORS.select(args.detectors)
+    except ValueError as e:
+        logger.error(f"Invalid --detectors: {e}")
+        sys.exit(1)
+
     # Create output directory
     output_dir = Path(args.out)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -78,25 +223,125 @@ async def main():
     try:
         # Load merchants
         logger.info(f"Loading merchants from {args.input}")
-        merchants = MerchantLoader.load(str(input_path))
+        preflight_report = None
+        if args.preflight or args.preflight_only:
+            preflight_report = await preflight(
+                str(input_path), concurrency=args.preflight_concurrency, timeout=min(args.timeout / 1000, 15.0)
+            )
+            merchants = preflight_report.merchants
+            preflight_path = output_dir / f"preflight_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            with open(preflight_path, 'w', encoding='utf-8') as f:
+                json.dump(preflight_report.to_dict(), f, indent=2, ensure_ascii=False)
+            logger.info(
+                f"Preflight: {len(merchants)} to audit, {len(preflight_report.skipped)} unreachable, "
+                f"{sum(1 for i in preflight_report.issues if i.fatal)} invalid rows ({preflight_path})"
+            )
+            if args.preflight_only:
+                return
+        else:
+            merchants = MerchantLoader.load(str(input_path))
         logger.info(f"Loaded {len(merchants)} merchants")
 
+        # Initialize instrumentation
+        rpc_counter = RpcCounter().install()
+        lag_monitor = EventLoopLagMonitor()
+
+        profiler = None
+        if args.profile:
+            profiler = MerchantProfiler(
+                str(output_dir),
+                sample_rate=args.profile_sample_rate,
+                merchant_ids=[m.strip() for m in args.profile_merchants.split(',') if m.strip()]
+                if args.profile_merchants else None,
+                trace=args.profile_trace,
+                trace_threshold_ms=args.profile_trace_threshold
+            )
+
+        timeouts = None
+        if args.latency_history:
+            timeouts = AdaptiveTimeouts(LatencyHistory(args.latency_history))
+
+        limiter = HostLimiter(
+            max_concurrent=args.per_host_concurrency,
+            rate=args.per_host_rate,
+            failure_threshold=args.circuit_threshold,
+            cooldown=args.circuit_cooldown
+        )
+
+        memory = MemoryWatermark(args.heap_watermark_mb)
+        cache = ResultCache(args.result_cache) if args.result_cache else None
+
+        # Only the selected detector modules are imported
+        detectors = DETECTORS.instantiate(args.detectors)
+        if args.rules_dir:
+            from app.core.rule_engine import RuleEngine, RuleSetDetector
+            from app.data.rule_loader import RuleLoader
+            rule_set = RuleSetDetector(RuleEngine(RuleLoader.load_from_directory(args.rules_dir)), "homepage")
+            declared = {rule_id for rule_id, _ in rule_set.rules}
+            detectors = [d for d in detectors if d.RULE_ID not in declared] + [rule_set]
+            logger.info(f"Loaded {len(rule_set.rules)} homepage rules from {args.rules_dir}")
+
         # Initialize auditor
         auditor = Auditor(
             headless=args.headless,
             timeout=args.timeout,
-            max_retries=args.max_retries
+            max_retries=args.max_retries,
+            rpc_counter=rpc_counter,
+            profiler=profiler,
+            timeouts=timeouts,
+            limiter=limiter,
+            memory=memory,
+            cache=cache,
+            detectors=detectors
         )
 
         # Run audits
         logger.info("Starting audits...")
-        results = await auditor.audit_all(merchants, str(screenshot_dir))
+        lag_monitor.start()
+        try:
+            results = await auditor.audit_all(
+                merchants, str(screenshot_dir), concurrency=args.concurrency
+            )
+            if preflight_report:
+                # Unreachable merchants never took a browser slot; report them in registry order
+                for merchant, probe in preflight_report.skipped:
+                    results.extend(auditor.skipped_results(merchant, f"preflight: {probe.reason}"))
+                order = {m.merchant_id: i for i, m in enumerate(preflight_report.registry)}
+                results.sort(key=lambda r: order.get(r.merchant_id, len(order)))
+        finally:
+            await lag_monitor.stop()
+            rpc_counter.uninstall()
+            if timeouts:
+                timeouts.save()
+            if cache:
+                cache.save()
+
+        performance = {
+            "rpc": rpc_counter.summary(),
+            "event_loop_lag": lag_monitor.summary(),
+            "open_circuits": limiter.summary(),
+            "memory": memory.summary()
+        }
+        if cache:
+            performance["result_cache"] = cache.summary()
+        if preflight_report:
+            performance["preflight"] = {
+                "skipped_unreachable": len(preflight_report.skipped),
+                "invalid_rows": sum(1 for i in preflight_report.issues if i.fatal)
+            }
 
         # Generate report
         logger.info("Generating report...")
         report_generator = ReportGenerator(str(output_dir))
-        report_path = report_generator.generate(results)
+        report_path = report_generator.generate(results, performance=performance, columnar=args.columnar)
         logger.info(f"Report saved to: {report_path}")
+        if args.dashboard:
+            dashboard_path = build_dashboard([report_path], str(output_dir / "dashboard"))
+            logger.info(f"Dashboard saved to: {dashboard_path}")
+        if args.history_db:
+            with HistoryStore(args.history_db) as history:
+                history.import_file(report_path)
+            logger.info(f"Results added to history: {args.history_db}")
 
         # Print summary
         passed = sum(1 for r in results if r.passed)
@@ -106,10 +351,22 @@ async def main():
         print("\n" + "="*60)
         print("Audit Summary")
         print("="*60)
-        print(f"Total merchants: {len(merchants)}")
+        print(f"Total merchants: {len({r.merchant_id for r in results})}")
+        print(f"Rules per merchant: {len(auditor.rules)}")
         print(f"Passed: {passed}")
         print(f"Failed: {failed}")
         print(f"Skipped: {skipped}")
+        print(f"Playwright RPC calls: {performance['rpc']['total_calls']}")
+        # Full per-merchant counts are in the report (performance.rpc.by_merchant)
+        by_merchant = performance['rpc']['by_merchant']
+        top = sorted(by_merchant.items(), key=lambda item: item[1], reverse=True)[:SUMMARY_TOP_MERCHANTS]
+        for merchant_id, calls in top:
+            print(f"  {merchant_id}: {calls}")
+        if len(by_merchant) > len(top):
+            print(f"  ... {len(by_merchant) - len(top)} more merchants in the report")
+        lag = performance['event_loop_lag']
+        print(f"Event-loop lag: mean {lag['mean_ms']} ms, p95 {lag['p95_ms']} ms, max {lag['max_ms']} ms")
+        print(f"Peak JS heap: {performance['memory']['peak_mb']} MB")
         print(f"Report: {report_path}")
         print("="*60)
 
@@ -0,0 +1,92 @@
+"""
+Child frame filtering and concurrent frame scanning
+"""
+from __future__ import annotations
+import asyncio
+import re
+from typing import TYPE_CHECKING, Awaitable, Callable, Collection, List, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+from app.utils.urls import split_host
+
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page
+
+T = TypeVar('T')
+
+
+# Third-party frames that can carry Klarna content (OSM, KCO, badges)
+KLARNA_FRAME_DOMAINS = {'klarna.com', 'klarna.net', 'klarnaservices.com', 'klarnacdn.net'}
+
+# First-party frames that never do: captchas, ads, chat, video and tag managers
+IGNORED_FRAME_PATTERN = re.compile(
+    r'recaptcha|captcha|doubleclick|googletagmanager|/ads?/|livechat|chat-widget|intercom|zendesk|hotjar|youtube|vimeo',
+    re.IGNORECASE
+)
+
+# Shared deadline (seconds) for scanning all child frames of a page
+FRAME_SCAN_TIMEOUT = 3.0
+
+
+def is_klarna_frame(frame_url: str) -> bool:
+    """Whether a frame is served by Klarna (all of its content is Klarna's)"""
+    host = urlsplit(frame_url or '').hostname
+    return bool(host) and split_host(host)[0] in KLARNA_FRAME_DOMAINS
+
+
+def is_scannable_frame(frame_url: str, page_url: str, extra_domains: Collection[str] = ()) -> bool:
+    """
+    Whether a child frame may hold content the checks look for
+
+    Klarna frames, frames of extra_domains (registrable domains, e.g. the
+    payment providers a check looks for) and first-party frames (same
+    registrable domain as the page) are scanned; ad, chat, analytics and
+    blank frames are not. The registrable domain comes from split_host,
+    whose built-in suffix list is partial: without tldextract, frames of
+    another site under an unlisted multi-label suffix (e.g. shop.com.cn
+    and other.com.cn) count as first-party.
+    """
+    parts = urlsplit(frame_url or '')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return False
+    registrable = split_host(parts.hostname)[0]
+    if registrable in KLARNA_FRAME_DOMAINS or registrable in extra_domains:
+        return True
+    if IGNORED_FRAME_PATTERN.search(frame_url):
+        return False
+    page_host = urlsplit(page_url or '').hostname
+    return bool(page_host) and registrable == split_host(page_host)[0]
+
+
+async def scan_frames(
+    page: Page,
+    scan: Callable[[Frame], Awaitable[T]],
+    timeout: float = FRAME_SCAN_TIMEOUT,
+    extra_domains: Collection[str] = ()
+) -> List[Tuple[Frame, T]]:
+    """
+    Run scan on the scannable child frames concurrently, under one deadline
+    (extra_domains: see is_scannable_frame)
+
+    Scans still running at the deadline are cancelled and scans that raise
+    are left out, so a page full of slow third-party frames costs at most
+    one timeout.
+
+    Returns:
+        [(frame, result)] in page.frames order
+    """
+    frames = [
+        frame for frame in page.frames
+        if frame is not page.main_frame and is_scannable_frame(frame.url, page.url, extra_domains)
+    ]
+    if not frames:
+        return []
+    tasks = [asyncio.ensure_future(scan(frame)) for frame in frames]
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return [
+        (frame, task.result()) for frame, task in zip(frames, tasks)
+        if task in done and task.exception() is None
+    ]
@@ -0,0 +1,60 @@
+"""
+Scoped disposal of Playwright JS/element handles
+"""
+from typing import Any, List
+
+
+class HandleArena:
+    """
+    Collect handles and dispose them together
+
+    Every ElementHandle/JSHandle pins its DOM node in the renderer until it is
+    disposed or the page goes away, so long-lived pages leak memory through
+    handles that are simply dropped. Handles tracked by an arena are disposed
+    when the arena is disposed (or its `async with` block exits).
+
+        async with HandleArena() as arena:
+            images = arena.track(await page.query_selector_all('img'))
+    """
+
+    def __init__(self):
+        self._handles: List[Any] = []
+
+    def track(self, handle):
+        """Track a handle (or a list of handles, or None) and return it unchanged"""
+        if isinstance(handle, list):
+            self._handles.extend(h for h in handle if h is not None)
+        elif handle is not None:
+            self._handles.append(handle)
+        return handle
+
+    def release(self, handle) -> None:
+        """Stop tracking a handle whose ownership moves to the caller"""
+        self._handles = [h for h in self._handles if h is not handle]
+
+    async def dispose(self) -> None:
+        """Dispose all tracked handles, ignoring handles of closed pages"""
+        handles, self._handles = self._handles, []
+        for handle in reversed(handles):
+            try:
+                await handle.dispose()
+            except Exception:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    async def __aenter__(self) -> "HandleArena":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.dispose()
+
+
+async def dispose_quietly(handle) -> None:
+    """Dispose a single handle if there is one"""
+    if handle is not None:
+        try:
+            await handle.dispose()
+        except Exception:
+            pass
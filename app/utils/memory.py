@@ -0,0 +1,70 @@
+"""
+Renderer memory watermarks
+"""
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Chromium-only; heap sizes are bucketed unless --enable-precise-memory-info is set
+JS_HEAP_SCRIPT = "() => (performance.memory ? performance.memory.usedJSHeapSize : null)"
+
+
+async def js_heap_mb(page) -> Optional[float]:
+    """Used JS heap of a page in MB, or None if unavailable"""
+    try:
+        used = await page.evaluate(JS_HEAP_SCRIPT)
+    except Exception:
+        return None
+    return round(used / (1024 * 1024), 1) if used else None
+
+
+class MemoryWatermark:
+    """
+    Track JS heap usage of pages against a high-water mark
+
+    Callers sample a page between units of work and recycle the page (or
+    context) when `check` reports the watermark was crossed.
+    """
+
+    def __init__(self, limit_mb: float = 256.0):
+        """
+        Initialize watermark
+
+        Args:
+            limit_mb: JS heap in MB above which a page should be recycled
+        """
+        self.limit_mb = limit_mb
+        self.samples: Dict[str, float] = {}
+        self.peak_mb = 0.0
+        self.recycles = 0
+
+    async def check(self, page, label: str) -> bool:
+        """
+        Sample a page's heap
+
+        Args:
+            page: Playwright page
+            label: Name the sample is recorded under (merchant or check ID)
+
+        Returns:
+            True if the heap is above the watermark
+        """
+        used = await js_heap_mb(page)
+        if used is None:
+            return False
+        self.samples[label] = max(used, self.samples.get(label, 0.0))
+        self.peak_mb = max(self.peak_mb, used)
+        if used > self.limit_mb:
+            logger.info(f"JS heap {used} MB after {label} exceeds watermark {self.limit_mb} MB")
+            return True
+        return False
+
+    def summary(self) -> Dict[str, object]:
+        """Peak heap, recycles and per-label peaks"""
+        return {
+            "limit_mb": self.limit_mb,
+            "peak_mb": self.peak_mb,
+            "recycles": self.recycles,
+            "by_label": dict(self.samples)
+        }
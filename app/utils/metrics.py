@@ -0,0 +1,183 @@
+"""
+Runtime instrumentation: Playwright RPC round-trip counter and event-loop lag monitor
+"""
+import asyncio
+import contextvars
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+
+# (merchant, check) scope of the protocol calls issued by the current task
+_current_scope: contextvars.ContextVar = contextvars.ContextVar(
+    "rpc_scope", default=(None, None)
+)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        values: Samples (need not be sorted)
+        q: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        Percentile value, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class RpcCounter:
+    """
+    Count Playwright protocol calls per merchant and per check
+
+    Every protocol message sent to the Playwright driver passes through
+    ``Connection._send_message_to_server``; ``install()`` wraps that method so
+    each call is attributed to the scope active in the calling task.
+    """
+
+    _active: Optional["RpcCounter"] = None
+    _original_send = None
+
+    def __init__(self):
+        """Initialize counter"""
+        # (merchant, check) -> Counter(method -> calls)
+        self.counts: Dict[Tuple[Optional[str], Optional[str]], Counter] = defaultdict(Counter)
+
+    def install(self) -> "RpcCounter":
+        """Start counting protocol calls issued by Playwright"""
+        from playwright._impl._connection import Connection
+
+        if RpcCounter._original_send is None:
+            original = Connection._send_message_to_server
+            RpcCounter._original_send = original
+
+            def counting_send(connection, object, method, *args, **kwargs):
+                counter = RpcCounter._active
+                if counter is not None:
+                    counter.record(method)
+                return original(connection, object, method, *args, **kwargs)
+
+            Connection._send_message_to_server = counting_send
+
+        RpcCounter._active = self
+        return self
+
+    def uninstall(self) -> None:
+        """Stop counting and restore the original Playwright method"""
+        if RpcCounter._original_send is not None:
+            from playwright._impl._connection import Connection
+            Connection._send_message_to_server = RpcCounter._original_send
+            RpcCounter._original_send = None
+        if RpcCounter._active is self:
+            RpcCounter._active = None
+
+    @contextmanager
+    def scope(self, merchant: Optional[str] = None, check: Optional[str] = None):
+        """
+        Attribute protocol calls made inside the block to a merchant/check
+
+        Args:
+            merchant: Merchant identifier (inherits the enclosing scope if None)
+            check: Check or rule identifier (inherits the enclosing scope if None)
+        """
+        outer_merchant, outer_check = _current_scope.get()
+        token = _current_scope.set((merchant or outer_merchant, check or outer_check))
+        try:
+            yield self
+        finally:
+            _current_scope.reset(token)
+
+    def record(self, method: str) -> None:
+        """Record one protocol call in the current scope"""
+        self.counts[_current_scope.get()][method] += 1
+
+    def total(self, merchant: Optional[str] = None, check: Optional[str] = None) -> int:
+        """Total calls, optionally filtered by merchant and/or check"""
+        return sum(
+            sum(methods.values())
+            for (m, c), methods in self.counts.items()
+            if (merchant is None or m == merchant) and (check is None or c == check)
+        )
+
+    def summary(self, top_methods: int = 10) -> Dict[str, Any]:
+        """
+        Build summary of protocol call counts
+
+        Args:
+            top_methods: Number of most frequent protocol methods to include
+
+        Returns:
+            Dictionary with totals per merchant, per check and per method
+        """
+        by_merchant: Counter = Counter()
+        by_check: Counter = Counter()
+        by_method: Counter = Counter()
+        for (merchant, check), methods in self.counts.items():
+            calls = sum(methods.values())
+            by_merchant[merchant or "unscoped"] += calls
+            by_check[check or "unscoped"] += calls
+            by_method.update(methods)
+
+        return {
+            "total_calls": sum(by_method.values()),
+            "by_merchant": dict(by_merchant),
+            "by_check": dict(by_check),
+            "top_methods": dict(by_method.most_common(top_methods))
+        }
+
+
+class EventLoopLagMonitor:
+    """Sample asyncio event-loop lag (how late a scheduled wake-up fires)"""
+
+    def __init__(self, interval: float = 0.1):
+        """
+        Initialize monitor
+
+        Args:
+            interval: Sampling interval in seconds
+        """
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Sampling loop"""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            self.samples.append(max(0.0, lag) * 1000)
+
+    def summary(self) -> Dict[str, Any]:
+        """Build lag summary in milliseconds"""
+        if not self.samples:
+            return {"samples": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        return {
+            "samples": len(self.samples),
+            "mean_ms": round(sum(self.samples) / len(self.samples), 2),
+            "p95_ms": round(percentile(self.samples, 0.95), 2),
+            "max_ms": round(max(self.samples), 2)
+        }
@@ -0,0 +1,109 @@
+"""
+Lazily imported plugin registry for checks and detectors
+
+Plugins are declared by id in a manifest of "module:attribute" strings and
+imported only when selected, so listing or validating plugins (and starting a
+CLI that only needs a few of them) does not import every plugin module or
+the browser libraries they depend on. Third-party packages can add plugins
+through an entry point group; entry points are only scanned when an id is
+not in the manifest.
+"""
+import importlib
+from typing import Any, Dict, List, Optional
+
+
+def load_object(spec: str) -> Any:
+    """
+    Import the object named by a "module:attribute" string
+
+    Raises:
+        ValueError: If the spec is malformed
+        ImportError: If the module or attribute cannot be imported
+    """
+    module_name, sep, attribute = spec.partition(":")
+    if not sep or not module_name or not attribute:
+        raise ValueError(f"Plugin spec must be 'module:attribute', got {spec!r}")
+    module = importlib.import_module(module_name)
+    try:
+        return getattr(module, attribute)
+    except AttributeError:
+        raise ImportError(f"{module_name} has no attribute {attribute}")
+
+
+class PluginRegistry:
+    """Plugins by id, imported on first use"""
+
+    def __init__(self, manifest: Dict[str, str], group: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            manifest: id -> "module:attribute", in default run order
+            group: Optional entry point group for plugins of other packages
+        """
+        self.manifest = dict(manifest)
+        self.group = group
+        self._external: Optional[Dict[str, str]] = None
+        self._loaded: Dict[str, Any] = {}
+
+    def _external_specs(self) -> Dict[str, str]:
+        if self._external is None:
+            self._external = {}
+            if self.group:
+                # importlib.metadata is slow to import; only needed for unknown ids
+                from importlib.metadata import entry_points
+                for ep in entry_points(group=self.group):
+                    self._external.setdefault(ep.name, ep.value)
+        return self._external
+
+    def ids(self, include_external: bool = True) -> List[str]:
+        """Known plugin ids, manifest first"""
+        ids = list(self.manifest)
+        if include_external:
+            ids += [i for i in self._external_specs() if i not in self.manifest]
+        return ids
+
+    def spec(self, plugin_id: str) -> str:
+        """
+        "module:attribute" of a plugin
+
+        Raises:
+            KeyError: If the id is unknown
+        """
+        if plugin_id in self.manifest:
+            return self.manifest[plugin_id]
+        if plugin_id in self._external_specs():
+            return self._external[plugin_id]
+        raise KeyError(plugin_id)
+
+    def load(self, plugin_id: str) -> Any:
+        """Import and return a plugin (class or factory)"""
+        if plugin_id not in self._loaded:
+            self._loaded[plugin_id] = load_object(self.spec(plugin_id))
+        return self._loaded[plugin_id]
+
+    def select(self, ids: Optional[str] = None) -> List[str]:
+        """
+        Parse a comma-separated id list (None or empty selects the manifest)
+
+        Raises:
+            ValueError: If an id is unknown
+        """
+        if not ids:
+            return list(self.manifest)
+        selected = [i.strip() for i in ids.split(",") if i.strip()]
+        unknown = []
+        for plugin_id in selected:
+            try:
+                self.spec(plugin_id)
+            except KeyError:
+                unknown.append(plugin_id)
+        if unknown:
+            raise ValueError(
+                f"Unknown id(s): {', '.join(unknown)} (available: {', '.join(self.ids())})"
+            )
+        return selected
+
+    def instantiate(self, ids: Optional[str] = None) -> List[Any]:
+        """Instances of the selected plugins, in selection order"""
+        return [self.load(plugin_id)() for plugin_id in self.select(ids)]
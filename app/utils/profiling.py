@@ -0,0 +1,240 @@
+"""
+Opt-in per-merchant profiling: cProfile statistics and Playwright tracing
+"""
+import asyncio
+import cProfile
+import logging
+import time
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExclusiveGate:
+    """
+    Let audits share the event loop, except exclusive ones, which run alone
+
+    An exclusive holder waits for the shared holders to drain and keeps new ones
+    out until it is done; waiting exclusive holders go first, so they are not starved.
+    """
+
+    def __init__(self):
+        self._changed = asyncio.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    @asynccontextmanager
+    async def hold(self, exclusive: bool = False):
+        """
+        Hold the gate for the duration of the block
+
+        Args:
+            exclusive: Run alone instead of alongside other shared holders
+        """
+        async with self._changed:
+            if exclusive:
+                self._exclusive_waiting += 1
+                try:
+                    await self._changed.wait_for(lambda: not self._exclusive and not self._shared)
+                finally:
+                    self._exclusive_waiting -= 1
+                    self._changed.notify_all()
+                self._exclusive = True
+            else:
+                await self._changed.wait_for(lambda: not self._exclusive and not self._exclusive_waiting)
+                self._shared += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                if exclusive:
+                    self._exclusive = False
+                else:
+                    self._shared -= 1
+                self._changed.notify_all()
+
+
+@dataclass
+class ProfileSession:
+    """Profiling state for one merchant audit"""
+    merchant_id: str
+    started: float
+    profile: Optional[cProfile.Profile] = None
+    context: Any = None  # BrowserContext with tracing started, if any
+    artifacts: Dict[str, str] = field(default_factory=dict)
+
+
+class MerchantProfiler:
+    """Wrap selected merchant audits in cProfile and, optionally, Playwright tracing"""
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 1.0,
+        merchant_ids: Optional[Iterable[str]] = None,
+        trace: bool = False,
+        trace_threshold_ms: int = 60000
+    ):
+        """
+        Initialize profiler
+
+        Args:
+            output_dir: Directory for .pstats and trace files (next to the report)
+            sample_rate: Fraction of merchants to profile (ignored if merchant_ids is set)
+            merchant_ids: Explicit merchant IDs to profile
+            trace: Record Playwright traces with snapshots for profiled merchants
+            trace_threshold_ms: Keep a trace only if the audit takes longer than this, or fails
+        """
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.merchant_ids = set(merchant_ids) if merchant_ids else None
+        self.trace = trace
+        self.trace_threshold_ms = trace_threshold_ms
+        self._cprofile_busy = False
+        self._gate = ExclusiveGate()
+
+    def slot(self, merchant_id: str):
+        """
+        Hold an audit slot for a merchant
+
+        cProfile records everything running on the thread, so a profiled merchant
+        is audited alone; other merchants keep running side by side.
+
+        Args:
+            merchant_id: Merchant about to be audited
+
+        Returns:
+            Async context manager to hold for the whole audit
+        """
+        return self._gate.hold(exclusive=self.is_selected(merchant_id))
+
+    def is_selected(self, merchant_id: str) -> bool:
+        """
+        Decide whether a merchant is profiled
+
+        Sampling hashes the merchant ID, so the same merchants are selected on every run.
+        """
+        if self.merchant_ids is not None:
+            return merchant_id in self.merchant_ids
+        if self.sample_rate >= 1.0:
+            return True
+        bucket = zlib.crc32(merchant_id.encode('utf-8')) % 10000
+        return bucket < self.sample_rate * 10000
+
+    async def start(self, merchant_id: str, context: Any = None) -> Optional[ProfileSession]:
+        """
+        Start profiling a merchant audit
+
+        Args:
+            merchant_id: Merchant being audited
+            context: Playwright BrowserContext used for the audit (needed for tracing)
+
+        Returns:
+            ProfileSession, or None if the merchant is not selected
+        """
+        if not self.is_selected(merchant_id):
+            return None
+
+        session = ProfileSession(merchant_id=merchant_id, started=time.perf_counter())
+
+        await self._start_tracing(session, context)
+
+        # cProfile hooks the whole thread, so only one session may own it at a time
+        if self._cprofile_busy:
+            logger.warning(f"cProfile already active, skipping CPU profile for {merchant_id}")
+        else:
+            self._cprofile_busy = True
+            session.profile = cProfile.Profile()
+            session.profile.enable()
+
+        return session
+
+    async def save_attempt_trace(self, session: Optional[ProfileSession], attempt: int) -> None:
+        """
+        Stop tracing for an attempt whose browser is about to be restarted
+
+        The trace is always kept, since a restart means the attempt failed.
+        Call before the old browser is closed, then resume_tracing() on the new one.
+
+        Args:
+            session: Session returned by start() (None is a no-op)
+            attempt: Number of the abandoned attempt, used in the artifact name
+        """
+        if session is not None:
+            await self._stop_tracing(session, f"trace_attempt{attempt}", keep=True)
+
+    async def resume_tracing(self, session: Optional[ProfileSession], context: Any) -> None:
+        """
+        Continue tracing a session on the context of a restarted browser
+
+        Args:
+            session: Session returned by start() (None is a no-op)
+            context: BrowserContext of the new browser
+        """
+        if session is not None:
+            await self._start_tracing(session, context)
+
+    async def _start_tracing(self, session: ProfileSession, context: Any) -> None:
+        """Start tracing on a context if tracing is enabled"""
+        if not self.trace or context is None:
+            return
+        try:
+            await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+            session.context = context
+        except Exception as e:
+            logger.warning(f"Could not start tracing for {session.merchant_id}: {e}")
+
+    async def _stop_tracing(self, session: ProfileSession, artifact: str, keep: bool) -> None:
+        """Stop tracing on the session's context, saving the trace as `artifact` if keep"""
+        context, session.context = session.context, None
+        if context is None:
+            return
+        try:
+            if keep:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                trace_path = self.output_dir / f"{artifact}_{session.merchant_id}_{timestamp}.zip"
+                await context.tracing.stop(path=str(trace_path))
+                session.artifacts[artifact] = str(trace_path)
+            else:
+                await context.tracing.stop()
+        except Exception as e:
+            logger.warning(f"Could not stop tracing for {session.merchant_id}: {e}")
+
+    async def finish(self, session: Optional[ProfileSession], failed: bool = False) -> Dict[str, str]:
+        """
+        Stop profiling and persist artifacts
+
+        Args:
+            session: Session returned by start() (None is a no-op)
+            failed: Whether the audit failed (a failed audit always keeps its trace)
+
+        Returns:
+            Mapping of artifact type ("pstats", "trace") to saved file path
+        """
+        if session is None:
+            return {}
+
+        elapsed_ms = (time.perf_counter() - session.started) * 1000
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if session.profile is not None:
+            session.profile.disable()
+            self._cprofile_busy = False
+            pstats_path = self.output_dir / f"profile_{session.merchant_id}_{timestamp}.pstats"
+            session.profile.dump_stats(str(pstats_path))
+            session.artifacts["pstats"] = str(pstats_path)
+
+        await self._stop_tracing(session, "trace", keep=failed or elapsed_ms > self.trace_threshold_ms)
+
+        for kind, path in session.artifacts.items():
+            logger.info(f"Saved {kind} for {session.merchant_id} ({elapsed_ms:.0f} ms): {path}")
+
+        return session.artifacts
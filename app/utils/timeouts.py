@@ -0,0 +1,166 @@
+"""
+Adaptive per-domain timeouts learned from historical latency
+"""
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from app.utils.metrics import percentile
+from app.utils.urls import host_key
+
+logger = logging.getLogger(__name__)
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """Whether an exception is a timeout (builtin, asyncio or Playwright TimeoutError)"""
+    return isinstance(exc, TimeoutError) or type(exc).__name__ == "TimeoutError"
+
+
+class LatencyHistory:
+    """Rolling latency samples per (domain, step), optionally persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = None, max_samples: int = 50):
+        """
+        Initialize history
+
+        Args:
+            path: JSON file to load from and save to (None keeps history in memory)
+            max_samples: Samples kept per (domain, step); older samples are dropped
+        """
+        self.path = Path(path) if path else None
+        self.max_samples = max_samples
+        self._samples: Dict[str, Dict[str, Deque[float]]] = defaultdict(dict)
+        if self.path and self.path.exists():
+            self.load()
+
+    def load(self) -> None:
+        """Load history from JSON file"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for domain, steps in data.items():
+                for step, samples in steps.items():
+                    self._samples[domain][step] = deque(samples, maxlen=self.max_samples)
+        except Exception as e:
+            logger.warning(f"Failed to load latency history from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Save history to JSON file"""
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            domain: {step: list(samples) for step, samples in steps.items()}
+            for domain, steps in self._samples.items()
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+
+    def record(self, domain: str, step: str, latency_ms: float) -> None:
+        """Record one step latency (or, for a timed-out step, the timeout as a lower bound)"""
+        samples = self._samples[domain].get(step)
+        if samples is None:
+            samples = self._samples[domain][step] = deque(maxlen=self.max_samples)
+        samples.append(round(latency_ms, 1))
+
+    def samples(self, domain: str, step: str) -> List[float]:
+        """Recorded latencies for a (domain, step)"""
+        return list(self._samples.get(domain, {}).get(step, ()))
+
+
+class AdaptiveTimeouts:
+    """
+    Derive step timeouts from a domain's latency history
+
+    timeout = clamp(percentile(samples) * factor, min_ms, max_ms), or the
+    caller's default while the domain has fewer than min_samples samples.
+
+    A step that times out is recorded as a censored sample at its timeout
+    (the true latency was at least that long). Without it only steps that
+    beat the learned timeout would be recorded, so a domain that got slower
+    could never win a longer timeout back, and a domain that always timed
+    out would never get history.
+    """
+
+    def __init__(
+        self,
+        history: LatencyHistory,
+        quantile: float = 0.99,
+        factor: float = 3.0,
+        min_ms: int = 1000,
+        max_ms: int = 60000,
+        min_samples: int = 5
+    ):
+        """
+        Initialize adaptive timeouts
+
+        Args:
+            history: Latency history to learn from and record into
+            quantile: Latency quantile the timeout is based on (0.99 for p99)
+            factor: Safety factor applied to the quantile
+            min_ms: Lower clamp in milliseconds
+            max_ms: Upper clamp in milliseconds
+            min_samples: Samples required before the default is replaced
+        """
+        self.history = history
+        self.quantile = quantile
+        self.factor = factor
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.min_samples = min_samples
+
+    def timeout(self, url: str, step: str, default: int) -> int:
+        """
+        Timeout for a step on the domain of `url`
+
+        Args:
+            url: Any URL on the merchant's domain
+            step: Step name (e.g. "goto", "load_state", "add_to_cart_selector")
+            default: Timeout in milliseconds used for domains without enough history
+
+        Returns:
+            Timeout in milliseconds
+        """
+        samples = self.history.samples(host_key(url), step)
+        if len(samples) < self.min_samples:
+            return default
+        learned = percentile(samples, self.quantile) * self.factor
+        return int(min(self.max_ms, max(self.min_ms, learned)))
+
+    def record(self, url: str, step: str, latency_ms: float) -> None:
+        """Record a successful step latency for the domain of `url`"""
+        self.history.record(host_key(url), step, latency_ms)
+
+    def record_timeout(self, url: str, step: str, timeout_ms: float) -> None:
+        """Record a step that timed out after timeout_ms as a censored sample"""
+        self.history.record(host_key(url), step, timeout_ms)
+
+    @contextmanager
+    def measure(self, url: str, step: str, timeout_ms: Optional[float] = None):
+        """
+        Record the block's latency if it completes without raising
+
+        Args:
+            url: Any URL on the merchant's domain
+            step: Step name
+            timeout_ms: Timeout the block ran with; if given, a block that
+                times out is recorded as a censored sample at this value.
+                Leave it out for probes whose timeout usually means "not
+                there" (optional selectors), which say nothing about latency.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if timeout_ms is not None and is_timeout(e):
+                self.record_timeout(url, step, timeout_ms)
+            raise
+        self.record(url, step, (time.perf_counter() - started) * 1000)
+
+    def save(self) -> None:
+        """Persist the latency history"""
+        self.history.save()
@@ -0,0 +1,67 @@
+"""
+URL helpers
+"""
+from functools import lru_cache
+from typing import Tuple
+from urllib.parse import urlparse
+
+
+def host_key(url: str) -> str:
+    """
+    Normalized host of a URL, used to key per-domain state
+
+    Lower-cases the hostname and drops a leading "www." so that
+    https://www.shop.dk/cart and http://shop.dk share the same key.
+    """
+    host = (urlparse(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+# Multi-label public suffixes; those under a generic TLD (de.com, uk.com, ...)
+# are sold as generic domains and say nothing about the market. This is a
+# hand-picked subset of the Public Suffix List covering the markets we audit;
+# install tldextract to use the full list (see split_host).
+PUBLIC_SUFFIXES = {
+    'co.uk', 'org.uk', 'me.uk', 'ac.uk', 'com.au', 'net.au', 'org.au', 'co.nz', 'net.nz',
+    'com.mx', 'com.pt', 'com.pl', 'com.gr', 'co.at', 'or.at', 'gv.at', 'com.es', 'com.tr',
+    'co.jp', 'ne.jp', 'or.jp', 'com.br', 'net.br', 'co.za', 'co.in', 'com.sg', 'com.hk', 'co.kr',
+    'de.com', 'uk.com', 'us.com', 'eu.com', 'gb.com', 'no.com', 'se.net', 'uk.net', 'gb.net',
+}
+
+
+@lru_cache(maxsize=1)
+def _psl_extractor():
+    """A tldextract extractor over its bundled Public Suffix List, or None if not installed"""
+    try:
+        import tldextract
+    except ImportError:
+        return None
+    # Bundled snapshot only: no network fetch and no cache directory. Private
+    # suffixes (de.com, myshopify.com, ...) count, as they do in PUBLIC_SUFFIXES.
+    return tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, include_psl_private_domains=True)
+
+
+@lru_cache(maxsize=4096)
+def split_host(host: str) -> Tuple[str, str]:
+    """
+    Split a hostname into (registrable domain, public suffix)
+
+    shop.co.uk -> ("shop.co.uk", "co.uk"), www.shop.dk -> ("shop.dk", "dk")
+
+    Uses the full Public Suffix List when tldextract is installed. Otherwise
+    only the suffixes in PUBLIC_SUFFIXES are known; under any other
+    multi-label suffix the registrable domain comes out one label short
+    (shop.com.cn -> "com.cn"), so two unrelated shops there look alike.
+    """
+    host = host.lower().rstrip('.')
+    extractor = _psl_extractor()
+    if extractor is not None:
+        parts = extractor(host)
+        if parts.domain and parts.suffix:
+            return f"{parts.domain}.{parts.suffix}", parts.suffix
+    labels = host.split('.')
+    suffix_len = 2 if len(labels) > 2 and '.'.join(labels[-2:]) in PUBLIC_SUFFIXES else 1
+    suffix = '.'.join(labels[-suffix_len:])
+    return '.'.join(labels[-suffix_len - 1:]), suffix
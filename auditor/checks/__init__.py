@@ -1,3 +1,14 @@
 """
 Check modules for Phase 0 audit
+
+Checks are registered by CHECK_ID and imported only when selected.
 """
+from app.utils.plugins import PluginRegistry
+
+# CHECK_ID -> "module:class", in run order
+CHECKS = PluginRegistry({
+    "FOOTER_KLARNA_LOGO": "auditor.checks.footer_klarna_logo:FooterKlarnaLogoCheck",
+    "PDP_OSM": "auditor.checks.pdp_osm:PDPOSMCheck",
+    "CART_KLARNA": "auditor.checks.cart_klarna:CartKlarnaCheck",
+    "CHECKOUT_PAYMENT_POSITION": "auditor.checks.checkout_payment:CheckoutPaymentCheck",
+}, group="klarna_auditor.checks")
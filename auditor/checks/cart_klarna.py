@@ -1,12 +1,18 @@
 """
 Check 3: CART_KLARNA
 """
+from __future__ import annotations
 from datetime import datetime
-from typing import Tuple, Optional
-from playwright.async_api import Page, ElementHandle
+from typing import TYPE_CHECKING, Tuple, Optional
 from auditor.navigator import Navigator
 from auditor.screenshot import ScreenshotManager
 from auditor.report import CheckResult, Evidence
+from auditor.text_search import find_keywords
+from auditor.utils import has_element
+from app.utils.handles import dispose_quietly
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, ElementHandle
 
 
 class CartKlarnaCheck:
@@ -78,22 +84,15 @@ class CartKlarnaCheck:
             
             cart_empty = False
             for indicator in empty_indicators:
-                try:
-                    if await page.query_selector(indicator):
-                        cart_empty = True
-                        break
-                except Exception:
-                    continue
+                if await has_element(page, indicator):
+                    cart_empty = True
+                    break
             
             # Also check page text
-            try:
-                page_text = await page.text_content()
-                if page_text:
-                    page_text_lower = page_text.lower()
-                    if 'kurven er tom' in page_text_lower or 'cart is empty' in page_text_lower or 'din kurv er tom' in page_text_lower:
-                        cart_empty = True
-            except Exception:
-                pass
+            if not cart_empty:
+                cart_empty = bool(await find_keywords(
+                    page, ['kurven er tom', 'cart is empty', 'din kurv er tom'], limit=1
+                ))
             
             if cart_empty:
                 screenshot_path = await screenshot_manager.capture_cart(page)
@@ -112,7 +111,10 @@ class CartKlarnaCheck:
             cart_summary = await self.find_cart_summary_area(page)
             
             # 6. Capture screenshot
-            screenshot_path = await screenshot_manager.capture_cart(page, cart_summary)
+            try:
+                screenshot_path = await screenshot_manager.capture_cart(page, cart_summary)
+            finally:
+                await dispose_quietly(cart_summary)
             
             # 7. Build evidence
             evidence = Evidence(
@@ -147,24 +149,15 @@ class CartKlarnaCheck:
     
     async def detect_klarna_in_cart(self, page: Page) -> Tuple[bool, Optional[str]]:
         """Detect Klarna keyword in cart page"""
-        try:
-            page_text = await page.text_content()
-            page_text_lower = page_text.lower() if page_text else ""
-            
-            if 'klarna' in page_text_lower:
-                # Find the context around "klarna"
-                index = page_text_lower.find('klarna')
-                start = max(0, index - 50)
-                end = min(len(page_text), index + 50)
-                context = page_text[start:end].strip()
-                return True, context
-        except Exception:
-            pass
+        # Context around the first "klarna" in the page text
+        hits = await find_keywords(page, ['klarna'], limit=1)
+        if hits:
+            return True, hits[0].snippet
         
         return False, None
     
     async def find_cart_summary_area(self, page: Page) -> Optional[ElementHandle]:
-        """Find cart summary area for screenshot"""
+        """Find cart summary area for screenshot (the caller disposes the handle)"""
         cart_selectors = [
             '[class*="cart-summary"]',
             '[class*="cart-total"]',
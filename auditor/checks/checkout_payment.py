@@ -1,14 +1,19 @@
 """
 Check 4: CHECKOUT_PAYMENT_POSITION
 """
+from __future__ import annotations
 from datetime import datetime
-from typing import Tuple, List, Optional
-from playwright.async_api import Page, ElementHandle
+from typing import TYPE_CHECKING, List, Optional
 from auditor.navigator import Navigator
 from auditor.screenshot import ScreenshotManager
 from auditor.report import CheckResult, Evidence
 from auditor.data.address_manager import AddressManager
-from auditor.utils import detect_country_from_url
+from auditor.forms import fill_forms, has_address_form, scan_forms
+from auditor.payment_methods import snapshot_payment_methods
+from auditor.utils import country_from_locale, detect_country_from_url
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 
 class CheckoutPaymentCheck:
@@ -59,7 +64,9 @@ class CheckoutPaymentCheck:
             
             # 3. Wait for payment methods
             ready = await self.wait_for_payment_methods(page, navigator)
-            if not ready:
+            # 4. Collect payment methods from every frame in one snapshot
+            snapshot = await snapshot_payment_methods(page)
+            if not ready and not snapshot.options:
                 screenshot_path = await screenshot_manager.capture_checkout_payment(page)
                 print(f"[{self.CHECK_ID}] FAIL - Payment methods not loaded")
                 print(f"[{self.CHECK_ID}] Screenshot: {screenshot_path}")
@@ -72,16 +79,13 @@ class CheckoutPaymentCheck:
                     payment_methods=[],
                     klarna_index=None
                 )
-            
-            # 4. Collect payment methods
-            payment_methods = await self.collect_payment_methods(page)
+            payment_methods = snapshot.labels
             
             # 5. Find Klarna position
             klarna_index = await self.find_klarna_position(payment_methods)
             
-            # 6. Capture screenshot
-            payment_element = await self.find_payment_methods_element(page)
-            screenshot_path = await screenshot_manager.capture_checkout_payment(page, payment_element)
+            # 6. Capture screenshot of the options' bounding box
+            screenshot_path = await screenshot_manager.capture_checkout_payment(page, clip=snapshot.clip())
             
             # 7. Build evidence
             matched_text = f"Payment method at position {klarna_index}" if klarna_index else None
@@ -124,75 +128,30 @@ class CheckoutPaymentCheck:
     
     async def fill_test_address_if_needed(self, page: Page, base_url: str) -> bool:
         """Fill test address if address form is present"""
-        # Check if address form exists
-        address_indicators = [
-            'input[name*="address"]',
-            'input[name*="street"]',
-            'input[name*="postal"]',
-            'input[name*="zip"]',
-            'input[name*="city"]'
-        ]
-        
-        has_address_form = False
-        for indicator in address_indicators:
-            try:
-                if await page.query_selector(indicator):
-                    has_address_form = True
-                    break
-            except Exception:
-                continue
-        
-        if not has_address_form:
+        # One scan per frame finds every control, including checkout iframes
+        scans = await scan_forms(page)
+        if not has_address_form(scans):
             return True  # No address form needed
         
         # Get address from address manager
         try:
-            country_code = detect_country_from_url(base_url) or "DK"
-            address_manager = AddressManager()
-            address = address_manager.get_address(country_code)
+            country_code = detect_country_from_url(base_url)
+            if not country_code:
+                # Generic TLD: fall back to the page's language tag, then the browser locale
+                main = next((scan for frame, scan in scans if frame is page.main_frame), None)
+                if main is None:
+                    main = await page.evaluate("() => ({lang: document.documentElement.lang, locale: navigator.language})")
+                locales = [main["lang"], main["locale"]]
+                country_code = next(filter(None, map(country_from_locale, locales)), None) or "DK"
+            address = AddressManager.shared().get_address(country_code)
             
             if not address:
                 print(f"[{self.CHECK_ID}] Warning: No test address found for {country_code}")
                 return False
             
-            # Fill address fields
-            field_mappings = {
-                'first_name': ['firstname', 'first_name', 'fname'],
-                'last_name': ['lastname', 'last_name', 'lname'],
-                'email': ['email', 'e-mail'],
-                'phone': ['phone', 'telephone', 'tel'],
-                'street': ['street', 'address1', 'address_line1'],
-                'postal_code': ['postal', 'postcode', 'zip', 'zipcode'],
-                'city': ['city'],
-                'region': ['region', 'state', 'province']
-            }
-            
-            filled = False
-            for attr, field_names in field_mappings.items():
-                value = getattr(address, attr, None)
-                if not value:
-                    continue
-                
-                for field_name in field_names:
-                    selectors = [
-                        f'input[name="{field_name}"]',
-                        f'input[name*="{field_name}"]',
-                        f'input[id*="{field_name}"]'
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            element = await page.query_selector(selector)
-                            if element:
-                                await element.fill(str(value))
-                                filled = True
-                                break
-                        except Exception:
-                            continue
-                    if filled:
-                        break
-            
+            filled = await fill_forms(scans, vars(address))
             if filled:
+                print(f"[{self.CHECK_ID}] Filled address fields: {filled}")
                 await page.wait_for_timeout(300)  # Minimal wait for form validation
             
             return True
@@ -205,85 +164,26 @@ class CheckoutPaymentCheck:
         """Wait for payment methods to be visible"""
         # Wait for DOM content loaded (faster)
         try:
-            await page.wait_for_load_state('domcontentloaded', timeout=5000)
+            timeout = navigator.timeout_for('load_state', 5000)
+            with navigator.measure('load_state', timeout_ms=timeout):
+                await page.wait_for_load_state('domcontentloaded', timeout=timeout)
         except Exception:
             pass
         
-        # Try payment selectors (reduced timeout)
-        for selector in self.PAYMENT_SELECTORS:
-            try:
-                await page.wait_for_selector(selector, timeout=3000, state='visible')
-                return True
-            except Exception:
-                continue
-        
-        return False
-    
-    async def find_payment_methods_element(self, page: Page) -> Optional[ElementHandle]:
-        """Find payment methods container element"""
-        for selector in self.PAYMENT_SELECTORS:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    # Try to find parent container
-                    parent = await element.evaluate_handle('el => el.closest(".payment-options, .payment-methods, [class*=\"payment\"]")')
-                    if parent:
-                        return parent.as_element()
-                    return element
-            except Exception:
-                continue
-        
-        return None
+        # One wait for any payment selector (reduced timeout)
+        try:
+            with navigator.measure('payment_selector'):
+                await page.locator(", ".join(self.PAYMENT_SELECTORS)).first.wait_for(
+                    state='visible',
+                    timeout=navigator.timeout_for('payment_selector', 3000)
+                )
+            return True
+        except Exception:
+            return False
     
     async def collect_payment_methods(self, page: Page) -> List[str]:
-        """Collect all visible payment method labels"""
-        payment_methods = []
-        
-        # Try different strategies to find payment methods
-        strategies = [
-            # Strategy 1: Radio buttons with labels
-            lambda: page.query_selector_all('input[type="radio"][name*="payment"] + label'),
-            # Strategy 2: Labels with for attributes
-            lambda: page.query_selector_all('label[for*="payment"]'),
-            # Strategy 3: Elements with payment class
-            lambda: page.query_selector_all('[class*="payment-method"]'),
-            # Strategy 4: Payment option containers
-            lambda: page.query_selector_all('[class*="payment-option"]'),
-        ]
-        
-        for strategy in strategies:
-            try:
-                elements = await strategy()
-                if elements:
-                    for element in elements:
-                        try:
-                            text = await element.inner_text()
-                            text = text.strip()
-                            if text and text not in payment_methods:
-                                payment_methods.append(text)
-                        except Exception:
-                            continue
-                    
-                    if payment_methods:
-                        break
-            except Exception:
-                continue
-        
-        # Fallback: search for payment-related text
-        if not payment_methods:
-            try:
-                page_text = await page.text_content()
-                # Look for common payment method patterns
-                import re
-                # This is a simple fallback - could be improved
-                payment_keywords = ['credit card', 'klarna', 'paypal', 'visa', 'mastercard']
-                for keyword in payment_keywords:
-                    if keyword.lower() in page_text.lower():
-                        payment_methods.append(keyword.title())
-            except Exception:
-                pass
-        
-        return payment_methods
+        """Collect all visible payment method labels, in visual order across frames"""
+        return (await snapshot_payment_methods(page)).labels
     
     async def find_klarna_position(self, payment_methods: List[str]) -> Optional[int]:
         """
@@ -1,13 +1,30 @@
 """
 Check 1: FOOTER_KLARNA_LOGO
 """
+from __future__ import annotations
 from datetime import datetime
-from typing import Tuple, Optional
-from playwright.async_api import Page, ElementHandle
+from typing import TYPE_CHECKING, Tuple, Optional
 from auditor.navigator import Navigator
 from auditor.screenshot import ScreenshotManager
 from auditor.report import CheckResult, Evidence
 from auditor.utils import find_element_in_frames, get_element_snippet_and_path
+from app.utils.handles import HandleArena, dispose_quietly
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, ElementHandle
+    from auditor.evidence_store import EvidenceStore
+
+
+# True if "klarna" occurs in the HTML before the first "footer" (anywhere if there is none)
+KLARNA_BEFORE_FOOTER_SCRIPT = """
+() => {
+    const html = document.documentElement ? document.documentElement.outerHTML : '';
+    const klarna = html.search(/klarna/i);
+    if (klarna < 0) return false;
+    const footer = html.search(/footer/i);
+    return footer < 0 || klarna < footer;
+}
+"""
 
 
 class FooterKlarnaLogoCheck:
@@ -43,20 +60,24 @@ class FooterKlarnaLogoCheck:
                 timeout=10000
             )
             
-            # 3. Find footer element
-            footer = await self.find_footer_element(page)
-            
-            # 4. Detect Klarna in footer
-            found, matched_selector, matched_text = await self.detect_klarna_in_footer(page, footer)
-            
-            # 5. Capture screenshot
-            screenshot_path = await screenshot_manager.capture_footer(page, footer)
+            async with HandleArena() as arena:
+                # 3. Find footer element
+                footer = arena.track(await self.find_footer_element(page))
+                
+                # 4. Detect Klarna in footer
+                found, matched_selector, matched_text, snippet_ref = await self.detect_klarna_in_footer(
+                    page, footer, screenshot_manager.evidence
+                )
+                
+                # 5. Capture screenshot
+                screenshot_path = await screenshot_manager.capture_footer(page, footer)
             
             # 6. Build evidence
             evidence = Evidence(
                 screenshot_path=screenshot_path,
                 matched_selector=matched_selector,
-                matched_text=matched_text
+                matched_text=matched_text,
+                snippet_ref=snippet_ref
             )
             
             status = "PASS" if found else "FAIL"
@@ -98,9 +119,10 @@ class FooterKlarnaLogoCheck:
     async def detect_klarna_in_footer(
         self,
         page: Page,
-        footer: Optional[ElementHandle]
-    ) -> Tuple[bool, Optional[str], Optional[str]]:
-        """Detect Klarna logo in footer"""
+        footer: Optional[ElementHandle],
+        store: Optional[EvidenceStore] = None
+    ) -> Tuple[bool, Optional[str], Optional[str], Optional[str]]:
+        """Detect Klarna logo in footer: (found, selector path, text, snippet_ref)"""
         # Check images in footer
         img_selectors = [
             'footer img[src*="klarna" i]',
@@ -114,8 +136,11 @@ class FooterKlarnaLogoCheck:
                 img, frame = await find_element_in_frames(page, selector)
                 if img:
                     # Get element info
-                    info = await get_element_snippet_and_path(page, img)
-                    return True, info['path'], None
+                    try:
+                        info = await get_element_snippet_and_path(page, img, store)
+                    finally:
+                        await dispose_quietly(img)
+                    return True, info['path'], None, info['snippet_ref']
             except Exception:
                 continue
         
@@ -125,20 +150,15 @@ class FooterKlarnaLogoCheck:
                 footer_text = await footer.inner_text()
                 footer_text_lower = footer_text.lower()
                 if 'klarna' in footer_text_lower:
-                    return True, None, "Klarna found in footer text"
+                    return True, None, "Klarna found in footer text", None
             except Exception:
                 pass
         
-        # Check page source
+        # Check page source (searched in the page; the HTML is never copied into Python)
         try:
-            page_source = await page.content()
-            page_source_lower = page_source.lower()
-            if 'klarna' in page_source_lower:
-                # Try to find the specific location
-                footer_section = page_source_lower.split('footer')[0] if 'footer' in page_source_lower else page_source_lower
-                if 'klarna' in footer_section:
-                    return True, None, "Klarna found in page source"
+            if await page.evaluate(KLARNA_BEFORE_FOOTER_SCRIPT):
+                return True, None, "Klarna found in page source", None
         except Exception:
             pass
         
-        return False, None, None
+        return False, None, None, None
@@ -1,14 +1,17 @@
 """
 Check 2: PDP_OSM
 """
-import asyncio
+from __future__ import annotations
 from datetime import datetime
-from typing import Tuple, List
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, Tuple, List
 from auditor.navigator import Navigator
 from auditor.screenshot import ScreenshotManager
 from auditor.report import CheckResult, Evidence
-from auditor.utils import find_element_in_frames
+from auditor.text_search import find_keywords
+from auditor.utils import is_klarna_frame, scan_frames
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 
 class PDPOSMCheck:
@@ -16,6 +19,8 @@ class PDPOSMCheck:
     
     CHECK_ID = "PDP_OSM"
     KEYWORDS = ["Klarna", "Del op", "Pay in 3", "Kort", "Klarna Pay", "Klarna logo"]
+    # Klarna/OSM widgets; generic keywords ("Kort", "Del op") only count inside them
+    OSM_CONTAINER_SELECTOR = '[class*="klarna"], [id*="klarna"], [data-klarna], klarna-placement, [class*="osm"], [id*="osm"]'
     
     async def execute(
         self,
@@ -41,7 +46,9 @@ class PDPOSMCheck:
             
             # 2. Wait for page to load (minimal wait, don't wait for specific elements)
             try:
-                await page.wait_for_load_state('domcontentloaded', timeout=5000)
+                timeout = navigator.timeout_for('load_state', 5000)
+                with navigator.measure('load_state', timeout_ms=timeout):
+                    await page.wait_for_load_state('domcontentloaded', timeout=timeout)
             except Exception:
                 pass
             
@@ -89,7 +96,9 @@ class PDPOSMCheck:
         """Wait for PDP to be ready (price and buy button visible)"""
         # Wait for DOM content loaded (faster)
         try:
-            await page.wait_for_load_state('domcontentloaded', timeout=5000)
+            timeout = navigator.timeout_for('load_state', 5000)
+            with navigator.measure('load_state', timeout_ms=timeout):
+                await page.wait_for_load_state('domcontentloaded', timeout=timeout)
         except Exception:
             pass
         
@@ -119,10 +128,12 @@ class PDPOSMCheck:
         ]
         
         # Check for price (reduced timeout)
+        selector_timeout = navigator.timeout_for('ready_selector', 3000)
         price_found = False
         for selector in price_selectors:
             try:
-                await page.wait_for_selector(selector, timeout=3000, state='visible')
+                with navigator.measure('ready_selector'):
+                    await page.locator(selector).first.wait_for(state='visible', timeout=selector_timeout)
                 price_found = True
                 break
             except Exception:
@@ -132,7 +143,8 @@ class PDPOSMCheck:
         button_found = False
         for selector in buy_button_selectors:
             try:
-                await page.wait_for_selector(selector, timeout=3000, state='visible')
+                with navigator.measure('ready_selector'):
+                    await page.locator(selector).first.wait_for(state='visible', timeout=selector_timeout)
                 button_found = True
                 break
             except Exception:
@@ -140,83 +152,37 @@ class PDPOSMCheck:
         
         # Fallback: keyword search in page
         if not (price_found and button_found):
-            try:
-                page_text = await page.text_content()
-                page_text_lower = page_text.lower() if page_text else ""
-                if '1.999' in page_text or 'kr' in page_text_lower or 'pris' in page_text_lower:
-                    price_found = True
-                if 'læg i kurv' in page_text_lower or 'forudbestil' in page_text_lower or 'køb' in page_text_lower:
-                    button_found = True
-            except Exception:
-                pass
+            price_keywords = ['1.999', 'kr', 'pris']
+            button_keywords = ['læg i kurv', 'forudbestil', 'køb']
+            found = {hit.keyword for hit in await find_keywords(page, price_keywords + button_keywords)}
+            price_found = price_found or bool(found.intersection(price_keywords))
+            button_found = button_found or bool(found.intersection(button_keywords))
         
         return price_found or button_found  # At least one should be found
     
     async def detect_osm_keywords(self, page: Page) -> Tuple[bool, List[str]]:
         """Detect OSM keywords in page content (check main frame and iframes)"""
-        matched_keywords = []
-        
         # Minimal wait for OSM to load
         await page.wait_for_timeout(500)
         
-        # Check main frame
-        try:
-            page_text = await page.text_content()
-            page_text_lower = page_text.lower() if page_text else ""
-            
-            for keyword in self.KEYWORDS:
-                if keyword.lower() in page_text_lower:
-                    matched_keywords.append(keyword)
-        except Exception:
-            pass
-        
-        # Check iframes (OSM is often in iframes)
-        for frame in page.frames:
-            if frame != page.main_frame:
-                try:
-                    frame_text = await frame.text_content()
-                    frame_text_lower = frame_text.lower() if frame_text else ""
-                    
-                    for keyword in self.KEYWORDS:
-                        if keyword.lower() in frame_text_lower and keyword not in matched_keywords:
-                            matched_keywords.append(keyword)
-                except Exception:
-                    continue
-        
-        # Also check for Klarna widget/OSM specific selectors
-        klarna_selectors = [
-            '[class*="klarna"]',
-            '[id*="klarna"]',
-            '[data-klarna]',
-            'iframe[src*="klarna"]',
-            '[class*="osm"]',
-            '[id*="osm"]'
-        ]
+        # Check main frame: Klarna/OSM containers only (their open shadow roots included);
+        # each search stops once every keyword it was given has been found
+        found = {
+            hit.keyword for hit in await find_keywords(
+                page, self.KEYWORDS, limit=len(self.KEYWORDS), selector=self.OSM_CONTAINER_SELECTOR
+            )
+        }
         
-        for selector in klarna_selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    # Check iframe content if it's an iframe
-                    if await element.evaluate('el => el.tagName.toLowerCase()') == 'iframe':
-                        try:
-                            frame = await element.content_frame()
-                            if frame:
-                                frame_text = await frame.text_content()
-                                frame_text_lower = frame_text.lower() if frame_text else ""
-                                for keyword in self.KEYWORDS:
-                                    if keyword.lower() in frame_text_lower and keyword not in matched_keywords:
-                                        matched_keywords.append(keyword)
-                        except Exception:
-                            pass
-                    else:
-                        # Regular element, check its text
-                        element_text = await element.inner_text()
-                        element_text_lower = element_text.lower() if element_text else ""
-                        for keyword in self.KEYWORDS:
-                            if keyword.lower() in element_text_lower and keyword not in matched_keywords:
-                                matched_keywords.append(keyword)
-            except Exception:
-                continue
+        # Check iframes (OSM is often in iframes): Klarna and first-party frames only,
+        # all at once under one deadline so ad and chat frames cannot stall the check.
+        # A Klarna frame is all Klarna content; first-party frames are searched like the page.
+        remaining = [keyword for keyword in self.KEYWORDS if keyword not in found]
+        if remaining:
+            def search(frame):
+                selector = None if is_klarna_frame(frame.url) else self.OSM_CONTAINER_SELECTOR
+                return find_keywords(frame, remaining, limit=len(remaining), selector=selector)
+            for _, hits in await scan_frames(page, search):
+                found.update(hit.keyword for hit in hits)
+        matched_keywords = [keyword for keyword in self.KEYWORDS if keyword in found]
         
         return len(matched_keywords) > 0, matched_keywords
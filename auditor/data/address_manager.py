@@ -2,6 +2,7 @@
 Address manager for test addresses
 """
 import json
+import threading
 from pathlib import Path
 from typing import Dict, Optional, List
 from dataclasses import dataclass
@@ -22,13 +23,33 @@ class TestAddress:
 
 
 class AddressManager:
-    """Manage test addresses for different countries"""
+    """
+    Manage test addresses for different countries
+    
+    A country maps to one address or a list of addresses; get_address
+    rotates through the list so concurrent checkouts use different ones.
+    Use AddressManager.shared() to load the file once per process.
+    """
+    
+    _shared: Dict[str, "AddressManager"] = {}
+    _shared_lock = threading.Lock()
     
     def __init__(self, addresses_file: str = "data/addresses/addresses.json"):
         self.addresses_file = Path(addresses_file)
-        self.addresses: Dict[str, TestAddress] = {}
+        self.addresses: Dict[str, List[TestAddress]] = {}
+        self._next: Dict[str, int] = {}
+        self._lock = threading.Lock()
         self.load()
     
+    @classmethod
+    def shared(cls, addresses_file: str = "data/addresses/addresses.json") -> "AddressManager":
+        """Process-wide manager for an addresses file, loaded on first use"""
+        key = str(Path(addresses_file).resolve())
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(addresses_file)
+            return cls._shared[key]
+    
     def load(self) -> None:
         """Load addresses from JSON file"""
         if not self.addresses_file.exists():
@@ -39,7 +60,8 @@ class AddressManager:
             with open(self.addresses_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 for country_code, addr_data in data.items():
-                    self.addresses[country_code.upper()] = TestAddress(**addr_data)
+                    entries = addr_data if isinstance(addr_data, list) else [addr_data]
+                    self.addresses[country_code.upper()] = [TestAddress(**entry) for entry in entries]
         except Exception as e:
             print(f"Warning: Failed to load addresses: {e}")
             self._create_default_file()
@@ -65,5 +87,16 @@ class AddressManager:
         self.load()
     
     def get_address(self, country_code: str) -> Optional[TestAddress]:
-        """Get address for a country"""
-        return self.addresses.get(country_code.upper())
+        """Get the next address for a country (round-robin over its addresses)"""
+        country_code = country_code.upper()
+        entries = self.addresses.get(country_code)
+        if not entries:
+            return None
+        with self._lock:
+            index = self._next.get(country_code, 0)
+            self._next[country_code] = index + 1
+        return entries[index % len(entries)]
+    
+    def get_addresses(self, country_code: str) -> List[TestAddress]:
+        """All addresses for a country"""
+        return list(self.addresses.get(country_code.upper(), []))
@@ -0,0 +1,76 @@
+"""
+Content-addressed store for DOM evidence snippets
+
+Snippets are compressed (zstd when the zstandard package is installed,
+gzip otherwise) and written once under their SHA-256, so reports carry a
+short reference instead of the HTML and identical snippets across checks
+and runs are stored once:
+
+    {root}/{hash[:2]}/{hash}.html.zst   (or .html.gz)
+"""
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+
+def _zstd():
+    """The zstandard module, or None if it is not installed"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class EvidenceStore:
+    """Compressed snippets keyed by hash"""
+
+    EXTENSIONS = (".html.zst", ".html.gz")
+
+    def __init__(self, root: str, codec: Optional[str] = None):
+        """
+        Initialize store (the directory is created on first write)
+
+        codec: "zstd" or "gzip"; default zstd if available
+        """
+        self.root = Path(root)
+        if codec is None:
+            codec = "zstd" if _zstd() else "gzip"
+        if codec not in ("zstd", "gzip"):
+            raise ValueError(f"Unknown codec: {codec}")
+        if codec == "zstd" and not _zstd():
+            raise ValueError("zstd codec requires the zstandard package")
+        self.codec = codec
+
+    def _path(self, ref: str, extension: str) -> Path:
+        return self.root / ref[:2] / f"{ref}{extension}"
+
+    def put(self, text: str) -> str:
+        """Store a snippet and return its reference (SHA-256 hex of the UTF-8 text)"""
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        if any(self._path(ref, extension).exists() for extension in self.EXTENSIONS):
+            return ref
+        if self.codec == "zstd":
+            path, payload = self._path(ref, ".html.zst"), _zstd().ZstdCompressor(level=10).compress(data)
+        else:
+            path, payload = self._path(ref, ".html.gz"), gzip.compress(data, compresslevel=6, mtime=0)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(path)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Snippet for a reference, or None if it is not in the store"""
+        zst = self._path(ref, ".html.zst")
+        if zst.exists():
+            codec = _zstd()
+            if codec is None:
+                raise RuntimeError(f"{zst} is zstd-compressed; install zstandard to read it")
+            return codec.ZstdDecompressor().decompress(zst.read_bytes()).decode("utf-8")
+        gz = self._path(ref, ".html.gz")
+        if gz.exists():
+            return gzip.decompress(gz.read_bytes()).decode("utf-8")
+        return None
@@ -0,0 +1,215 @@
+"""
+Failure-only flight recorder for checks
+
+While a check runs, a Playwright trace chunk is recorded and the page's
+screencast frames are kept in a fixed-size in-memory ring buffer. When the
+check finishes, both are written to disk only if it FAILed or took longer
+than the latency budget; otherwise the chunk is discarded and the buffer is
+dropped, so a passing check costs no artifact I/O.
+
+Screencast frames come from the Chrome DevTools Protocol and are only
+available with Chromium; on other browsers only the trace is kept.
+"""
+from __future__ import annotations
+import asyncio
+import base64
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, CDPSession, Page
+
+
+class FlightRecorder:
+    """Rolling trace and screencast buffer for the current check"""
+
+    def __init__(
+        self,
+        out_dir: str,
+        budget_ms: float = 30000,
+        max_frames: int = 150,
+        screencast: bool = True
+    ):
+        """
+        Initialize recorder
+
+        Args:
+            out_dir: Directory for kept artifacts
+            budget_ms: Keep artifacts of checks slower than this, even if they pass
+            max_frames: Screencast frames kept (the most recent ones)
+            screencast: Also buffer CDP screencast frames (Chromium only)
+        """
+        self.out_dir = Path(out_dir)
+        self.budget_ms = budget_ms
+        self.screencast = screencast
+        self.frames: Deque[Tuple[float, str]] = deque(maxlen=max_frames)  # (seconds since start, base64 JPEG)
+        self.context: Optional[BrowserContext] = None
+        self.check_id: Optional[str] = None
+        self.kept = 0
+        self.discarded = 0
+        self._tracing = False
+        self._cdp: Optional[CDPSession] = None
+        self._started = 0.0
+        self._pending_acks: set = set()
+
+    async def attach(self, context: BrowserContext) -> None:
+        """
+        Start tracing on a context (once per run; each check records one chunk)
+
+        Args:
+            context: Browser context the checks run in
+        """
+        self.context = context
+        try:
+            await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+            self._tracing = True
+        except Exception as e:
+            print(f"Warning: Flight recorder could not start tracing: {str(e)}")
+
+    async def detach(self) -> None:
+        """Stop tracing on the context"""
+        if self._tracing and self.context is not None:
+            try:
+                await self.context.tracing.stop()
+            except Exception:
+                pass
+        self._tracing = False
+
+    async def start(self, page: Page, check_id: str) -> None:
+        """
+        Begin recording a check
+
+        Args:
+            page: Page the check runs on (screencast source)
+            check_id: Check being recorded, used in artifact names
+        """
+        self.check_id = check_id
+        self.frames.clear()
+        self._started = time.perf_counter()
+        if self._tracing:
+            try:
+                await self.context.tracing.start_chunk(title=check_id)
+            except Exception as e:
+                print(f"[{check_id}] Warning: Flight recorder trace chunk not started: {str(e)}")
+        if self.screencast and self.context is not None:
+            await self._start_screencast(page)
+
+    async def _start_screencast(self, page: Page) -> None:
+        try:
+            self._cdp = await self.context.new_cdp_session(page)
+            self._cdp.on("Page.screencastFrame", self._on_frame)
+            await self._cdp.send("Page.startScreencast", {
+                "format": "jpeg", "quality": 60, "maxWidth": 960, "maxHeight": 540, "everyNthFrame": 2
+            })
+        except Exception:
+            # Not Chromium, or the page is gone: keep the trace only
+            self._cdp = None
+
+    def _on_frame(self, params: Dict[str, Any]) -> None:
+        """Buffer a screencast frame; Chromium sends the next one only after the ack"""
+        self.frames.append((round(time.perf_counter() - self._started, 3), params["data"]))
+        if self._cdp is not None:
+            ack = asyncio.ensure_future(self._cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}))
+            self._pending_acks.add(ack)
+            ack.add_done_callback(self._ack_done)
+
+    def _ack_done(self, ack: asyncio.Future) -> None:
+        self._pending_acks.discard(ack)
+        if not ack.cancelled():
+            ack.exception()  # acks racing a closed session are expected
+
+    async def _stop_screencast(self) -> None:
+        cdp, self._cdp = self._cdp, None
+        if cdp is None:
+            return
+        try:
+            await cdp.send("Page.stopScreencast")
+            await cdp.detach()
+        except Exception:
+            pass
+        if self._pending_acks:
+            await asyncio.gather(*self._pending_acks, return_exceptions=True)
+
+    def should_keep(self, status: str, duration_ms: float) -> bool:
+        """
+        Whether a check's artifacts are kept
+
+        Args:
+            status: Check status ("PASS", "FAIL", "WARN")
+            duration_ms: Check duration in milliseconds
+
+        Returns:
+            True for failed checks and checks over the latency budget
+        """
+        return status == "FAIL" or duration_ms > self.budget_ms
+
+    async def finish(self, status: str, duration_ms: Optional[float] = None) -> Dict[str, str]:
+        """
+        Stop recording the current check; persist its artifacts if it needs debugging
+
+        Args:
+            status: Check status ("PASS", "FAIL", "WARN")
+            duration_ms: Check duration in milliseconds (measured from start() if None)
+
+        Returns:
+            Artifact type ("trace", "screencast") -> saved path (empty when discarded)
+        """
+        if duration_ms is None:
+            duration_ms = (time.perf_counter() - self._started) * 1000
+        await self._stop_screencast()
+        keep = self.should_keep(status, duration_ms)
+        artifacts: Dict[str, str] = {}
+        stem = f"{self.check_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if keep:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        if self._tracing:
+            try:
+                if keep:
+                    trace_path = self.out_dir / f"{stem}_trace.zip"
+                    await self.context.tracing.stop_chunk(path=str(trace_path))
+                    artifacts["trace"] = str(trace_path)
+                else:
+                    await self.context.tracing.stop_chunk()
+            except Exception as e:
+                print(f"[{self.check_id}] Warning: Flight recorder trace chunk not saved: {str(e)}")
+
+        if keep and self.frames:
+            artifacts["screencast"] = self._write_frames(self.out_dir / f"{stem}_screencast.zip")
+        self.frames.clear()
+
+        if keep:
+            self.kept += 1
+            reason = status if status == "FAIL" else f"{duration_ms:.0f} ms > {self.budget_ms:.0f} ms budget"
+            print(f"[{self.check_id}] Flight recorder kept ({reason}): {', '.join(artifacts.values()) or 'nothing recorded'}")
+        else:
+            self.discarded += 1
+        return artifacts
+
+    def _write_frames(self, path: Path) -> str:
+        """
+        Write buffered frames as JPEGs named by their offset in the check
+
+        Args:
+            path: Zip file to write
+
+        Returns:
+            Path of the written file
+        """
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for index, (offset, data) in enumerate(self.frames):
+                archive.writestr(f"{index:04d}_{offset * 1000:08.0f}ms.jpg", base64.b64decode(data))
+        return str(path)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Kept/discarded counts for the performance summary
+
+        Returns:
+            Dictionary with kept, discarded and budget_ms
+        """
+        return {"kept": self.kept, "discarded": self.discarded, "budget_ms": self.budget_ms}
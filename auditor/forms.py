@@ -0,0 +1,238 @@
+"""
+One-pass checkout form discovery and batched filling
+
+A single evaluation per frame lists every fillable input with the hints a
+human would use (name, id, autocomplete, type, label, placeholder). Child
+frames are limited to first-party, Klarna and payment provider frames and
+are scanned concurrently under one deadline. The
+inputs are matched to address fields in Python by score, and all matched
+values are then written in one evaluation per frame, with the input/change
+events frameworks listen for.
+"""
+from __future__ import annotations
+import asyncio
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from auditor.payment_methods import PSP_FRAME_DOMAINS
+from auditor.utils import FRAME_SCAN_TIMEOUT, scan_frames
+
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page
+
+# Lists fillable controls and tags each with data-audit-field for the fill pass
+FORM_SCAN_SCRIPT = """
+() => {
+    const SKIP_TYPES = new Set(['hidden', 'submit', 'button', 'reset', 'image', 'file', 'checkbox', 'radio', 'password']);
+    const text = (el) => (el ? (el.innerText || el.textContent || '') : '').replace(/\\s+/g, ' ').trim().slice(0, 120);
+    const labelOf = (el) => {
+        const parts = [];
+        if (el.labels) for (const label of el.labels) parts.push(text(label));
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) for (const id of labelledBy.split(/\\s+/)) parts.push(text(document.getElementById(id)));
+        if (!parts.length) parts.push(text(el.closest('label')));
+        return parts.filter(Boolean).join(' ');
+    };
+    const inputs = [];
+    document.querySelectorAll('input, select, textarea').forEach((el) => {
+        const type = (el.getAttribute('type') || el.tagName).toLowerCase();
+        if (SKIP_TYPES.has(type) || el.disabled || el.readOnly) return;
+        const rect = el.getBoundingClientRect();
+        if (!rect.width && !rect.height) return;
+        const index = inputs.length;
+        el.setAttribute('data-audit-field', String(index));
+        inputs.push({
+            index: index,
+            tag: el.tagName.toLowerCase(),
+            type: type,
+            name: el.getAttribute('name') || '',
+            id: el.id || '',
+            autocomplete: (el.getAttribute('autocomplete') || '').toLowerCase(),
+            placeholder: el.getAttribute('placeholder') || '',
+            aria_label: el.getAttribute('aria-label') || '',
+            label: labelOf(el),
+            filled: !!el.value && el.tagName !== 'SELECT',
+        });
+    });
+    return {lang: document.documentElement.lang || '', locale: navigator.language || '', inputs: inputs};
+}
+"""
+
+# Writes values through the native setters so React/Vue controlled inputs notice
+FORM_FILL_SCRIPT = """
+(assignments) => {
+    const filled = [];
+    for (const [index, value] of assignments) {
+        const el = document.querySelector(`[data-audit-field="${index}"]`);
+        if (!el) continue;
+        if (el.tagName === 'SELECT') {
+            const wanted = String(value).toLowerCase();
+            const option = Array.from(el.options).find((o) => o.value.toLowerCase() === wanted || o.text.trim().toLowerCase() === wanted);
+            if (!option) continue;
+            el.value = option.value;
+        } else {
+            const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        el.dispatchEvent(new Event('blur'));
+        filled.push(index);
+    }
+    return filled;
+}
+"""
+
+# field -> (autocomplete tokens, keywords, keywords that rule the field out)
+FIELD_HINTS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "first_name": (("given-name",), ("firstname", "first_name", "fname", "givenname", "fornavn", "förnamn",
+                                     "fornamn", "etunimi", "vorname", "first"), ("company", "last")),
+    "last_name": (("family-name",), ("lastname", "last_name", "lname", "surname", "familyname", "efternavn",
+                                     "efternamn", "etternavn", "sukunimi", "nachname", "last"), ("company", "first")),
+    "email": (("email",), ("email", "e-mail", "e-post", "epost", "sähköposti", "mail"), ()),
+    "phone": (("tel", "tel-national"), ("phone", "telephone", "tel", "telefon", "mobil", "mobile", "puhelin",
+                                        "telefonnummer"), ()),
+    "street": (("address-line1", "street-address"), ("street", "address1", "address_line1", "addressline1",
+                                                     "address", "adresse", "adress", "gade", "gatuadress", "vej",
+                                                     "katuosoite", "straße", "strasse"),
+               ("address2", "line2", "address_line2", "addressline2", "email", "mail", "apartment", "c/o", "co")),
+    "postal_code": (("postal-code",), ("postal", "postcode", "postalcode", "zip", "zipcode", "postnummer", "postnr",
+                                       "postinumero", "plz"), ()),
+    "city": (("address-level2",), ("city", "town", "by", "ort", "stad", "postort", "poststed", "kaupunki",
+                                   "stadt"), ()),
+    "region": (("address-level1",), ("region", "state", "province", "county", "län", "bundesland"), ()),
+    "country": (("country", "country-name"), ("country", "land", "maa"), ()),
+}
+
+# Fields whose presence means the page asks for an address
+ADDRESS_FIELDS = ("street", "postal_code", "city")
+
+MIN_SCORE = 4
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-zæøåäöüßé/-]+")
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+
+def _tokens(value: str) -> List[str]:
+    """Lower-case tokens of an attribute: billingFirstName -> billing, first, name"""
+    spaced = _CAMEL.sub(" ", value)
+    return [t for t in _TOKEN_SPLIT.split(spaced.lower()) if t]
+
+
+def score_field(field: str, control: Dict[str, Any]) -> int:
+    """
+    How well a scanned control matches an address field
+
+    autocomplete is authoritative; input types, name/id tokens and then
+    label/placeholder text add weaker evidence. A ruled-out keyword vetoes.
+    """
+    autocomplete_tokens, keywords, vetoes = FIELD_HINTS[field]
+    attributes = f"{control['name']} {control['id']}"
+    texts = f"{control['label']} {control['placeholder']} {control['aria_label']}"
+    attribute_tokens = set(_tokens(attributes))
+    text_tokens = set(_tokens(texts))
+    compact = attributes.lower().replace("-", "").replace("_", "")
+
+    if any(v in attribute_tokens or v in text_tokens or (len(v) > 3 and v in compact) for v in vetoes):
+        return 0
+    score = 0
+    if control["autocomplete"] and set(control["autocomplete"].split()) & set(autocomplete_tokens):
+        score += 10
+    if field == "email" and control["type"] == "email" or field == "phone" and control["type"] == "tel":
+        score += 6
+    if field == "country" and control["tag"] == "select":
+        score += 1
+    for keyword in keywords:
+        flat = keyword.replace("_", "").replace("-", "")
+        if keyword in attribute_tokens:
+            score += 5
+        elif len(flat) > 3 and flat in compact:
+            score += 4
+        if keyword in text_tokens:
+            score += 4
+    return score
+
+
+def match_fields(controls: List[Dict[str, Any]], fields: Optional[List[str]] = None) -> Dict[int, str]:
+    """
+    Assign each control to its best-scoring field
+
+    Several controls may receive the same field (billing and shipping forms);
+    controls scoring below MIN_SCORE for every field are left alone.
+
+    Returns:
+        control index -> field
+    """
+    fields = fields or list(FIELD_HINTS)
+    assignment = {}
+    for control in controls:
+        scored = [(score_field(field, control), -order, field) for order, field in enumerate(fields)]
+        best_score, _, best_field = max(scored)
+        if best_score >= MIN_SCORE:
+            assignment[control["index"]] = best_field
+    return assignment
+
+
+async def scan_forms(page: Page) -> List[Tuple[Frame, Dict[str, Any]]]:
+    """
+    Scan the page and its frames for fillable controls
+
+    Ad, chat and other third-party frames are not scanned (nor tagged);
+    frames that cannot be scanned in time (detached, hung, cross-process
+    errors) or that have no controls are left out. The main frame comes first.
+
+    Returns:
+        [(frame, {"lang", "locale", "inputs"}), ...]
+    """
+    async def scan_main():
+        try:
+            return await asyncio.wait_for(page.main_frame.evaluate(FORM_SCAN_SCRIPT), FRAME_SCAN_TIMEOUT)
+        except Exception:
+            return None
+
+    main, children = await asyncio.gather(
+        scan_main(),
+        scan_frames(page, lambda frame: frame.evaluate(FORM_SCAN_SCRIPT), extra_domains=PSP_FRAME_DOMAINS)
+    )
+    return [
+        (frame, scan) for frame, scan in [(page.main_frame, main)] + children
+        if scan and scan["inputs"]
+    ]
+
+
+def has_address_form(scans: List[Tuple[Frame, Dict[str, Any]]]) -> bool:
+    """Whether any scanned frame asks for a street, postal code or city"""
+    return any(
+        field in ADDRESS_FIELDS
+        for _, scan in scans
+        for field in match_fields(scan["inputs"]).values()
+    )
+
+
+async def fill_forms(scans: List[Tuple[Frame, Dict[str, Any]]], values: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Fill matched controls with one evaluation per frame
+
+    Controls that already hold a value are left alone.
+
+    Args:
+        scans: Result of scan_forms
+        values: field -> value (keys from FIELD_HINTS; empty values are skipped)
+
+    Returns:
+        field -> number of controls filled
+    """
+    filled: Dict[str, int] = {}
+    for frame, scan in scans:
+        assignment = match_fields(scan["inputs"])
+        prefilled = {c["index"] for c in scan["inputs"] if c["filled"]}
+        batch = [
+            [index, str(values[field])] for index, field in assignment.items()
+            if values.get(field) and index not in prefilled
+        ]
+        if not batch:
+            continue
+        for index in await frame.evaluate(FORM_FILL_SCRIPT, batch):
+            field = assignment[index]
+            filled[field] = filled.get(field, 0) + 1
+    return filled
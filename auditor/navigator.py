@@ -1,22 +1,65 @@
 """
 Page navigation logic
 """
-from typing import List, Tuple, Optional
-from playwright.async_api import Page
-from auditor.utils import handle_cookie_banner
+from __future__ import annotations
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, List, Tuple, Optional
+from auditor.text_search import find_keywords
+from auditor.utils import handle_cookie_banner, has_element
+from app.core.host_limiter import HostLimiter
+from app.utils.handles import dispose_quietly
+from app.utils.timeouts import AdaptiveTimeouts
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 
 class Navigator:
     """Handle page navigation and flow"""
     
-    def __init__(self, page: Page, headless: bool = True):
+    def __init__(
+        self,
+        page: Page,
+        headless: bool = True,
+        timeouts: Optional[AdaptiveTimeouts] = None,
+        limiter: Optional[HostLimiter] = None
+    ):
         self.page = page
         self.headless = headless
+        self.timeouts = timeouts
+        self.limiter = limiter
+    
+    def timeout_for(self, step: str, default: int, url: Optional[str] = None) -> int:
+        """Timeout for a step in ms, learned from the domain's latency history if enabled"""
+        if self.timeouts is None:
+            return default
+        return self.timeouts.timeout(url or self.page.url, step, default)
+    
+    def measure(self, step: str, url: Optional[str] = None, timeout_ms: Optional[int] = None):
+        """
+        Record the latency of a step (no-op without latency history)
+
+        Args:
+            step: Step name
+            url: URL whose domain the latency belongs to (the current page if None)
+            timeout_ms: Timeout the step runs with; if given, a timeout of the step
+                is recorded as a censored sample (navigation and load steps only)
+        """
+        if self.timeouts is None:
+            return nullcontext()
+        return self.timeouts.measure(url or self.page.url, step, timeout_ms)
+    
+    async def _goto(self, url: str) -> None:
+        """Navigate to URL with the (adaptive) navigation timeout, through the host limiter if set"""
+        async with self.limiter.slot(url) if self.limiter else nullcontext():
+            timeout = self.timeout_for('goto', 10000, url)
+            with self.measure('goto', url, timeout_ms=timeout):
+                await self.page.goto(url, wait_until='domcontentloaded', timeout=timeout)
     
     async def navigate_to_home(self, home_url: str) -> bool:
         """Navigate to HOME page"""
         try:
-            await self.page.goto(home_url, wait_until='domcontentloaded', timeout=10000)
+            await self._goto(home_url)
             await handle_cookie_banner(self.page)
             return True
         except Exception:
@@ -25,7 +68,7 @@ class Navigator:
     async def navigate_to_pdp(self, pdp_url: str) -> bool:
         """Navigate to PDP page"""
         try:
-            await self.page.goto(pdp_url, wait_until='domcontentloaded', timeout=10000)
+            await self._goto(pdp_url)
             await handle_cookie_banner(self.page)
             return True
         except Exception:
@@ -35,7 +78,9 @@ class Navigator:
         """Click add to cart button on PDP"""
         # Wait for page to be ready first (reduced timeout)
         try:
-            await self.page.wait_for_load_state('domcontentloaded', timeout=5000)
+            timeout = self.timeout_for('load_state', 5000)
+            with self.measure('load_state', timeout_ms=timeout):
+                await self.page.wait_for_load_state('domcontentloaded', timeout=timeout)
         except Exception:
             pass
         
@@ -58,9 +103,12 @@ class Navigator:
             'a[href*="cart"]'
         ]
         
+        selector_timeout = self.timeout_for('add_to_cart_selector', 3000)
         for selector in add_to_cart_selectors:
+            element = None
             try:
-                element = await self.page.wait_for_selector(selector, timeout=3000, state='visible')
+                with self.measure('add_to_cart_selector'):
+                    element = await self.page.wait_for_selector(selector, timeout=selector_timeout, state='visible')
                 if element:
                     # Scroll into view
                     await element.scroll_into_view_if_needed()
@@ -73,6 +121,8 @@ class Navigator:
                     return True
             except Exception as e:
                 continue
+            finally:
+                await dispose_quietly(element)
         
         return False
     
@@ -80,7 +130,7 @@ class Navigator:
         """Navigate to cart page"""
         try:
             cart_url = f"{base_url.rstrip('/')}/cart"
-            await self.page.goto(cart_url, wait_until='domcontentloaded', timeout=10000)
+            await self._goto(cart_url)
             await handle_cookie_banner(self.page)
             return True
         except Exception:
@@ -105,20 +155,27 @@ class Navigator:
             '[id*="checkout"]'
         ]
         
+        selector_timeout = self.timeout_for('checkout_selector', 5000)
         for selector in checkout_selectors:
+            element = None
             try:
-                element = await self.page.wait_for_selector(selector, timeout=5000, state='visible')
+                with self.measure('checkout_selector'):
+                    element = await self.page.wait_for_selector(selector, timeout=selector_timeout, state='visible')
                 if element:
                     await element.click()
                     # Reduced wait time
                     try:
-                        await self.page.wait_for_load_state('domcontentloaded', timeout=5000)
+                        timeout = self.timeout_for('load_state', 5000)
+                        with self.measure('load_state', timeout_ms=timeout):
+                            await self.page.wait_for_load_state('domcontentloaded', timeout=timeout)
                     except Exception:
                         pass
                     await handle_cookie_banner(self.page)
                     return True, None
             except Exception as e:
                 continue
+            finally:
+                await dispose_quietly(element)
         
         # Check if login is required
         login_indicators = [
@@ -129,11 +186,8 @@ class Navigator:
         ]
         
         for indicator in login_indicators:
-            try:
-                if await self.page.query_selector(indicator):
-                    return False, "Login required"
-            except Exception:
-                continue
+            if await has_element(self.page, indicator):
+                return False, "Login required"
         
         return False, "Checkout button not found"
     
@@ -149,28 +203,27 @@ class Navigator:
         """
         try:
             # Wait for DOM content loaded (faster than networkidle)
-            await self.page.wait_for_load_state('domcontentloaded', timeout=min(timeout, 5000))
+            load_timeout = self.timeout_for('load_state', min(timeout, 5000))
+            with self.measure('load_state', timeout_ms=load_timeout):
+                await self.page.wait_for_load_state('domcontentloaded', timeout=load_timeout)
         except Exception:
             pass
         
         # Try selectors (reduced timeout)
         if selectors:
+            selector_timeout = self.timeout_for('ready_selector', 3000)
             for selector in selectors:
                 try:
-                    await self.page.wait_for_selector(selector, timeout=3000, state='visible')
+                    with self.measure('ready_selector'):
+                        await self.page.locator(selector).first.wait_for(state='visible', timeout=selector_timeout)
                     return True, selector, None
                 except Exception:
                     continue
         
         # Fallback to keyword search
         if fallback_keywords:
-            try:
-                page_text = await self.page.text_content()
-                page_text_lower = page_text.lower() if page_text else ""
-                for keyword in fallback_keywords:
-                    if keyword.lower() in page_text_lower:
-                        return True, None, keyword
-            except Exception:
-                pass
+            hits = await find_keywords(self.page, fallback_keywords, limit=1)
+            if hits:
+                return True, None, hits[0].keyword
         
         return False, None, None
@@ -0,0 +1,199 @@
+"""
+Payment method extraction from one snapshot per frame
+
+Each frame (embedded KCO, Adyen and Stripe iframes included) is evaluated
+once. The script tries the selector strategies in order and returns the
+options of the first strategy that finds any, with label text, bounding box
+and visibility. Options from all frames are then merged in visual order.
+Child frames are filtered and scanned under one deadline like in the other
+checks, with payment provider frames allowed in addition.
+"""
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+from app.utils.handles import dispose_quietly
+from auditor.utils import scan_frames
+
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page
+
+# Tried in order; the first strategy that finds options wins (per frame)
+PAYMENT_OPTION_STRATEGIES = [
+    # Radio buttons with labels
+    'input[type="radio"][name*="payment"] + label',
+    # Labels with for attributes
+    'label[for*="payment"]',
+    # PSP widgets: Adyen Drop-in, Stripe Payment Element, Klarna Checkout
+    '.adyen-checkout__payment-method__header, .p-PaymentMethodSelector [role="tab"], .p-AccordionButton, '
+    '[data-cid*="payment-selector-method"], [id^="payment-selector-"][role="radio"]',
+    # Elements with payment class
+    '[class*="payment-method"]',
+    # Payment option containers
+    '[class*="payment-option"]',
+    '[data-payment-method]',
+]
+
+# Registrable domains of payment provider iframes (hosted fields, drop-ins)
+PSP_FRAME_DOMAINS = {
+    'adyen.com', 'stripe.com', 'braintreegateway.com', 'paypal.com', 'checkout.com',
+    'mollie.com', 'nets.eu', 'dibspayment.eu', 'quickpay.net', 'reepay.com', 'worldpay.com',
+}
+
+FALLBACK_KEYWORDS = ['credit card', 'klarna', 'paypal', 'visa', 'mastercard']
+
+PAYMENT_OPTIONS_SCRIPT = """
+([strategies, keywords]) => {
+    const visible = (el, rect) => {
+        if (!rect.width || !rect.height) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+    };
+    let options = [];
+    for (const selector of strategies) {
+        let elements;
+        try { elements = Array.from(document.querySelectorAll(selector)); } catch (e) { continue; }
+        // A wrapper matching the same selector as its options would repeat all their labels
+        elements = elements.filter((el) => !elements.some((other) => other !== el && el.contains(other)));
+        options = [];
+        for (const el of elements) {
+            const rect = el.getBoundingClientRect();
+            const text = (el.innerText || '').replace(/\\s+/g, ' ').trim();
+            const alt = Array.from(el.querySelectorAll('img[alt]')).map((img) => img.alt).join(' ').trim();
+            options.push({
+                text: text || alt || (el.getAttribute('aria-label') || '').trim(),
+                x: rect.x, y: rect.y, width: rect.width, height: rect.height,
+                visible: visible(el, rect),
+            });
+        }
+        if (options.some((o) => o.visible && o.text)) break;
+        options = [];
+    }
+    const fallback = [];
+    if (!options.length && window === window.top && document.body) {
+        const body = document.body.innerText.toLowerCase();
+        for (const keyword of keywords) if (body.includes(keyword)) fallback.push(keyword);
+    }
+    return {options: options, fallback: fallback, scroll: [window.scrollX, window.scrollY]};
+}
+"""
+
+# An option whose top is at most this far (px) below the previous one stays in its row
+ROW_TOLERANCE = 4
+CLIP_PADDING = 16
+
+
+@dataclass
+class PaymentOption:
+    """One payment option as rendered"""
+    text: str
+    x: float  # main viewport coordinates
+    y: float
+    width: float
+    height: float
+    visible: bool
+    frame_url: Optional[str] = None  # None for the main frame
+
+
+@dataclass
+class PaymentSnapshot:
+    """Payment options of every frame, in visual order"""
+    options: List[PaymentOption] = field(default_factory=list)
+    fallback: List[str] = field(default_factory=list)  # keywords found when no option was
+    scroll: Dict[str, float] = field(default_factory=lambda: {"x": 0.0, "y": 0.0})
+
+    @property
+    def labels(self) -> List[str]:
+        """Distinct labels of visible options (fallback keywords if none)"""
+        labels: List[str] = []
+        for option in self.options:
+            if option.visible and option.text and option.text not in labels:
+                labels.append(option.text)
+        return labels or [keyword.title() for keyword in self.fallback]
+
+    def clip(self) -> Optional[Dict[str, float]]:
+        """Padded union of the visible options in page coordinates, for a full-page clip screenshot"""
+        boxes = [o for o in self.options if o.visible]
+        if not boxes:
+            return None
+        left = min(o.x for o in boxes) - CLIP_PADDING
+        top = min(o.y for o in boxes) - CLIP_PADDING
+        right = max(o.x + o.width for o in boxes) + CLIP_PADDING
+        bottom = max(o.y + o.height for o in boxes) + CLIP_PADDING
+        left, top = max(0.0, left + self.scroll["x"]), max(0.0, top + self.scroll["y"])
+        return {
+            "x": left,
+            "y": top,
+            "width": right + self.scroll["x"] - left,
+            "height": bottom + self.scroll["y"] - top,
+        }
+
+
+def visual_order(options: List[PaymentOption]) -> List[PaymentOption]:
+    """Sort options top to bottom, rows left to right"""
+    rows: List[List[PaymentOption]] = []
+    previous_y = None
+    for option in sorted(options, key=lambda o: o.y):
+        if previous_y is None or option.y - previous_y > ROW_TOLERANCE:
+            rows.append([])
+        rows[-1].append(option)
+        previous_y = option.y
+    return [option for row in rows for option in sorted(row, key=lambda o: o.x)]
+
+
+async def _frame_offset(frame: Frame) -> Optional[Dict[str, float]]:
+    """Position of a child frame in the main viewport, None if it is not rendered"""
+    element = None
+    try:
+        element = await frame.frame_element()
+        return await element.bounding_box()
+    except Exception:
+        return None
+    finally:
+        await dispose_quietly(element)
+
+
+async def _snapshot_frame(frame: Frame, is_main: bool) -> Optional[Dict]:
+    try:
+        snapshot = await frame.evaluate(PAYMENT_OPTIONS_SCRIPT, [PAYMENT_OPTION_STRATEGIES, FALLBACK_KEYWORDS])
+    except Exception:
+        return None
+    if not is_main and snapshot["options"]:
+        offset = await _frame_offset(frame)
+        if offset is None:
+            return None
+        for option in snapshot["options"]:
+            option["x"] += offset["x"]
+            option["y"] += offset["y"]
+    return snapshot
+
+
+async def snapshot_payment_methods(page: Page) -> PaymentSnapshot:
+    """
+    Payment options of the page and all its frames
+
+    Frames are evaluated concurrently, one evaluation each; child frames
+    with options cost one more round trip to place them on the page. Child
+    frames are limited to first-party, Klarna and payment provider frames
+    and share one deadline (see scan_frames).
+
+    Args:
+        page: Playwright page (checkout)
+
+    Returns:
+        PaymentSnapshot
+    """
+    main, children = await asyncio.gather(
+        _snapshot_frame(page.main_frame, True),
+        scan_frames(page, lambda frame: _snapshot_frame(frame, False), extra_domains=PSP_FRAME_DOMAINS)
+    )
+    result = PaymentSnapshot()
+    if main is not None:
+        result.fallback = main["fallback"]
+        result.scroll = {"x": main["scroll"][0], "y": main["scroll"][1]}
+        result.options.extend(PaymentOption(**option) for option in main["options"])
+    for frame, snapshot in children:
+        if snapshot is not None:
+            result.options.extend(PaymentOption(frame_url=frame.url, **option) for option in snapshot["options"])
+    result.options = visual_order(result.options)
+    return result
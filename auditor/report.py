@@ -14,6 +14,7 @@ class Evidence:
     screenshot_path: Optional[str] = None
     matched_selector: Optional[str] = None
     matched_text: Optional[str] = None
+    snippet_ref: Optional[str] = None  # EvidenceStore reference of the matched element's HTML
 
 
 @dataclass
@@ -27,6 +28,14 @@ class CheckResult:
     # For CHECKOUT_PAYMENT_POSITION only:
     payment_methods: Optional[List[str]] = None
     klarna_index: Optional[int] = None
+    duration_ms: Optional[float] = None
+    cached: bool = False  # reused from the result cache (page and check unchanged)
+    artifacts: Optional[Dict[str, str]] = None  # flight recorder files (trace, screencast) kept for this check
+
+
+def check_result_from_dict(data: Dict[str, Any]) -> CheckResult:
+    """Rebuild a CheckResult from its asdict() form"""
+    return CheckResult(**{**data, "evidence": Evidence(**(data.get("evidence") or {}))})
 
 
 class ReportGenerator:
@@ -38,17 +47,37 @@ class ReportGenerator:
         self.merchant_dir = self.out_dir / merchant
         self.merchant_dir.mkdir(parents=True, exist_ok=True)
     
-    def generate(self, results: List[CheckResult]) -> str:
-        """Generate JSON report"""
+    def generate(
+        self,
+        results: List[CheckResult],
+        performance: Optional[Dict[str, Any]] = None,
+        columnar: Optional[str] = None
+    ) -> str:
+        """
+        Generate JSON report
+        performance: optional run metrics for the summary
+        columnar: also write a "parquet" or "arrow" file next to report.json (requires pyarrow)
+        """
         report_path = self.merchant_dir / "report.json"
         
         # Generate run_id
         run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Calculate summary
-        passed = sum(1 for r in results if r.status == "PASS")
-        failed = sum(1 for r in results if r.status == "FAIL")
-        warned = sum(1 for r in results if r.status == "WARN")
+        columnar_path = None
+        if columnar:
+            # pyarrow is slow to import; only load it when a columnar file is requested
+            from app.report.columnar import check_results_table, check_summary, write_table
+            table = check_results_table(self.merchant, results)
+            columnar_path = write_table(table, str(report_path), columnar)
+            summary = check_summary(table)
+        else:
+            summary = {
+                "passed": sum(1 for r in results if r.status == "PASS"),
+                "failed": sum(1 for r in results if r.status == "FAIL"),
+                "warned": sum(1 for r in results if r.status == "WARN"),
+                "total": len(results)
+            }
         
         # Build report
         report = {
@@ -56,13 +85,12 @@ class ReportGenerator:
             "run_id": run_id,
             "timestamp": datetime.now().isoformat() + "Z",
             "results": [self._format_result(r) for r in results],
-            "summary": {
-                "passed": passed,
-                "failed": failed,
-                "warned": warned,
-                "total": len(results)
-            }
+            "summary": summary
         }
+        if columnar_path:
+            report["columnar_file"] = Path(columnar_path).name
+        if performance:
+            report["summary"]["performance"] = performance
         
         # Write JSON file
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -83,6 +111,16 @@ class ReportGenerator:
             }
         }
         
+        if result.evidence.snippet_ref:
+            formatted["evidence"]["snippet_ref"] = result.evidence.snippet_ref
+        
+        if result.duration_ms is not None:
+            formatted["duration_ms"] = result.duration_ms
+        if result.cached:
+            formatted["cached"] = True
+        if result.artifacts:
+            formatted["artifacts"] = result.artifacts
+        
         # Add error_reason if FAIL
         if result.status == "FAIL" and result.error_reason:
             formatted["error_reason"] = result.error_reason
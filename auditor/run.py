@@ -4,15 +4,21 @@ CLI entry point for Phase 0 auditor
 import argparse
 import asyncio
 import sys
-from playwright.async_api import async_playwright
-from auditor.checks.footer_klarna_logo import FooterKlarnaLogoCheck
-from auditor.checks.pdp_osm import PDPOSMCheck
-from auditor.checks.cart_klarna import CartKlarnaCheck
-from auditor.checks.checkout_payment import CheckoutPaymentCheck
+import time
+from auditor.checks import CHECKS
+from auditor.flight_recorder import FlightRecorder
 from auditor.navigator import Navigator
 from auditor.screenshot import ScreenshotManager
-from auditor.report import ReportGenerator, CheckResult, Evidence
+from auditor.report import ReportGenerator, CheckResult, Evidence, check_result_from_dict
+from app.utils.metrics import RpcCounter, EventLoopLagMonitor
+from app.core.host_limiter import HostLimiter
+from app.report.history import HistoryStore
+from app.core.result_cache import ResultCache, detector_version, http_fingerprint
+from app.utils.memory import MemoryWatermark
+from app.utils.timeouts import AdaptiveTimeouts, LatencyHistory
+from dataclasses import asdict
 from datetime import datetime
+from pathlib import Path
 
 
 # Test URLs for humac.dk
@@ -27,7 +33,6 @@ def parse_args():
     )
     parser.add_argument(
         '--out-dir',
-        required=True,
         help='Output directory for reports and screenshots'
     )
     parser.add_argument(
@@ -47,22 +52,148 @@ def parse_args():
         default='da-DK',
         help='Browser locale (default: da-DK)'
     )
+    parser.add_argument(
+        '--merchant',
+        default='humac.dk',
+        help='Merchant name used for the output folder (default: humac.dk)'
+    )
+    parser.add_argument(
+        '--home-url',
+        default=HOME_URL,
+        help=f'Merchant HOME URL (default: {HOME_URL})'
+    )
+    parser.add_argument(
+        '--pdp-url',
+        default=PDP_URL,
+        help=f'Merchant PDP URL (default: {PDP_URL})'
+    )
+    parser.add_argument(
+        '--checks',
+        default=None,
+        help='Comma-separated check IDs to run (default: all, e.g. PDP_OSM,CART_KLARNA)'
+    )
+    parser.add_argument(
+        '--list-checks',
+        action='store_true',
+        default=False,
+        help='List available check IDs and exit'
+    )
+    parser.add_argument(
+        '--latency-history',
+        default=None,
+        help='JSON file with per-domain latency history; enables adaptive timeouts'
+    )
+    parser.add_argument(
+        '--per-host-rate',
+        type=float,
+        default=1.0,
+        help='Maximum navigations per second to the merchant host (default: 1.0)'
+    )
+    parser.add_argument(
+        '--columnar',
+        choices=['parquet', 'arrow'],
+        default=None,
+        help='Also write results as Parquet or Arrow IPC for analytics (requires pyarrow)'
+    )
+    parser.add_argument(
+        '--history-db',
+        default=None,
+        help='SQLite audit history; results of this run are added to it (query with python -m app.report.history)'
+    )
+    parser.add_argument(
+        '--result-cache',
+        default=None,
+        help='JSON result cache; HOME/PDP checks are skipped while their page and check code are unchanged'
+    )
+    parser.add_argument(
+        '--heap-watermark-mb',
+        type=float,
+        default=256.0,
+        help='Recycle the page between checks when its JS heap exceeds this many MB (default: 256)'
+    )
+    parser.add_argument(
+        '--flight-recorder',
+        action='store_true',
+        default=False,
+        help='Keep a rolling trace and screencast per check; saved only if the check fails or exceeds --flight-budget-ms'
+    )
+    parser.add_argument(
+        '--flight-budget-ms',
+        type=float,
+        default=30000,
+        help='Latency budget per check for the flight recorder (default: 30000)'
+    )
+    parser.add_argument(
+        '--flight-frames',
+        type=int,
+        default=150,
+        help='Screencast frames kept in the flight recorder ring buffer (default: 150)'
+    )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.list_checks and not args.out_dir:
+        parser.error('the following arguments are required: --out-dir')
+    return args
+
+
+def configure_page(page) -> None:
+    """Apply default timeouts to a page"""
+    # Set timeouts (optimized for speed)
+    page.set_default_timeout(10000)  # element wait: 10s max
+    page.set_default_navigation_timeout(10000)  # navigation: 10s max
+
+
+async def recycle_page(context, page, navigator: Navigator):
+    """
+    Replace a page whose JS heap crossed the watermark
+    The new page reopens the current URL; cart and session state live in the context
+    """
+    url = page.url
+    new_page = await context.new_page()
+    configure_page(new_page)
+    await page.close()
+    if url and url != 'about:blank':
+        try:
+            await new_page.goto(url, wait_until='domcontentloaded')
+        except Exception as e:
+            print(f"Warning: Failed to reopen {url} after recycling page: {str(e)}")
+    navigator.page = new_page
+    return new_page
 
 
 async def main():
     """Main execution function"""
     args = parse_args()
     
+    if args.list_checks:
+        for check_id in CHECKS.ids():
+            print(f"{check_id}\t{CHECKS.spec(check_id)}")
+        return
+    
+    # Validate the selection before launching a browser
+    try:
+        check_ids = CHECKS.select(args.checks)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+    
     print("=" * 60)
     print("Klarna Integration Auto Auditor - Phase 0")
     print("=" * 60)
+    print(f"Merchant: {args.merchant}")
     print(f"Output directory: {args.out_dir}")
     print(f"Headless: {args.headless}")
     print(f"Locale: {args.locale}")
+    print(f"Checks: {', '.join(check_ids)}")
     print("=" * 60)
     
+    rpc_counter = RpcCounter().install()
+    lag_monitor = EventLoopLagMonitor()
+    lag_monitor.start()
+    
+    # Imported here so --help, --list-checks and selection errors don't load Playwright
+    from playwright.async_api import async_playwright
+    
     async with async_playwright() as p:
         # Launch browser
         browser = await p.chromium.launch(
@@ -77,64 +208,119 @@ async def main():
         )
         
         page = await context.new_page()
-        
-        # Set timeouts (optimized for speed)
-        page.set_default_timeout(10000)  # element wait: 10s max
-        page.set_default_navigation_timeout(10000)  # navigation: 10s max
+        configure_page(page)
+        recorder = None
+        if args.flight_recorder:
+            recorder = FlightRecorder(
+                str(Path(args.out_dir) / args.merchant / "flight"),
+                budget_ms=args.flight_budget_ms,
+                max_frames=args.flight_frames
+            )
+            await recorder.attach(context)
+        watermark = MemoryWatermark(args.heap_watermark_mb)
         
         try:
             # Initialize components
-            navigator = Navigator(page, args.headless)
-            screenshot_manager = ScreenshotManager(args.out_dir, "humac.dk")
-            report_generator = ReportGenerator(args.out_dir, "humac.dk")
+            timeouts = None
+            if args.latency_history:
+                timeouts = AdaptiveTimeouts(LatencyHistory(args.latency_history))
+            limiter = HostLimiter(max_concurrent=1, rate=args.per_host_rate)
+            navigator = Navigator(page, args.headless, timeouts=timeouts, limiter=limiter)
+            screenshot_manager = ScreenshotManager(args.out_dir, args.merchant)
+            report_generator = ReportGenerator(args.out_dir, args.merchant)
             
-            # Initialize checks
-            checks = [
-                FooterKlarnaLogoCheck(),
-                PDPOSMCheck(),
-                CartKlarnaCheck(),
-                CheckoutPaymentCheck()
-            ]
+            # Initialize checks (only the selected check modules are imported)
+            checks = CHECKS.instantiate(",".join(check_ids))
+            
+            # Start URL per check; cart and checkout start from HOME
+            check_urls = {"PDP_OSM": args.pdp_url}
+            
+            # Checks that depend on a single page; cart and checkout are stateful and always run
+            cache = ResultCache(args.result_cache) if args.result_cache else None
+            cacheable_urls = {
+                "FOOTER_KLARNA_LOGO": args.home_url,
+                "PDP_OSM": args.pdp_url
+            }
             
             # Execute checks with error isolation
             results = []
             
             for check in checks:
+                started = time.perf_counter()
+                cache_url = cacheable_urls.get(check.CHECK_ID) if cache else None
+                fingerprint = None
+                if cache_url:
+                    fingerprint = await http_fingerprint(cache_url, limiter=limiter)
+                    cached = cache.lookup(
+                        args.merchant, check.CHECK_ID, cache_url, fingerprint, detector_version(check)
+                    )
+                    if cached is not None:
+                        result = check_result_from_dict(cached)
+                        result.cached = True
+                        result.timestamp = datetime.now().isoformat() + "Z"
+                        result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                        print(f"[{check.CHECK_ID}] {result.status} (cached, page unchanged)")
+                        results.append(result)
+                        continue
+                
+                if recorder:
+                    await recorder.start(page, check.CHECK_ID)
                 try:
-                    if isinstance(check, FooterKlarnaLogoCheck):
-                        result = await check.execute(
-                            page, navigator, screenshot_manager, HOME_URL
-                        )
-                    elif isinstance(check, PDPOSMCheck):
-                        result = await check.execute(
-                            page, navigator, screenshot_manager, PDP_URL
-                        )
-                    elif isinstance(check, CartKlarnaCheck):
-                        result = await check.execute(
-                            page, navigator, screenshot_manager, HOME_URL
-                        )
-                    elif isinstance(check, CheckoutPaymentCheck):
+                    with rpc_counter.scope(merchant=args.merchant, check=check.CHECK_ID):
                         result = await check.execute(
-                            page, navigator, screenshot_manager, HOME_URL
+                            page, navigator, screenshot_manager, check_urls.get(check.CHECK_ID, args.home_url)
                         )
-                    else:
-                        continue
-                    
-                    results.append(result)
                     
                 except Exception as e:
                     # Error isolation: continue with next check
                     print(f"[{check.CHECK_ID}] Exception occurred: {str(e)}")
-                    results.append(CheckResult(
+                    result = CheckResult(
                         check_id=check.CHECK_ID,
                         status="FAIL",
                         evidence=Evidence(),
                         timestamp=datetime.now().isoformat() + "Z",
                         error_reason=f"Exception: {str(e)}"
-                    ))
+                    )
+                
+                result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                if recorder:
+                    result.artifacts = await recorder.finish(result.status, result.duration_ms) or None
+                results.append(result)
+                
+                # Results without a screenshot come from navigation failures or exceptions
+                if cache_url and result.evidence.screenshot_path:
+                    cache.store(
+                        args.merchant, check.CHECK_ID, cache_url, fingerprint,
+                        detector_version(check), asdict(result)
+                    )
+                
+                if await watermark.check(page, check.CHECK_ID):
+                    page = await recycle_page(context, page, navigator)
+                    watermark.recycles += 1
+            
+            await lag_monitor.stop()
+            rpc_counter.uninstall()
+            if recorder:
+                await recorder.detach()
+            if timeouts:
+                timeouts.save()
+            if cache:
+                cache.save()
+            performance = {
+                "rpc": rpc_counter.summary(),
+                "event_loop_lag": lag_monitor.summary(),
+                "memory": watermark.summary()
+            }
+            if cache:
+                performance["result_cache"] = cache.summary()
+            if recorder:
+                performance["flight_recorder"] = recorder.summary()
             
             # Generate report
-            report_path = report_generator.generate(results)
+            report_path = report_generator.generate(results, performance=performance, columnar=args.columnar)
+            if args.history_db:
+                with HistoryStore(args.history_db) as history:
+                    history.import_file(report_path)
             
             print("\n" + "=" * 60)
             print("Audit Summary")
@@ -144,10 +330,18 @@ async def main():
             print(f"Total checks: {len(results)}")
             print(f"Passed: {passed}")
             print(f"Failed: {failed}")
+            print(f"Playwright RPC calls: {performance['rpc']['total_calls']}")
+            for check_id, calls in performance['rpc']['by_check'].items():
+                print(f"  {check_id}: {calls}")
+            lag = performance['event_loop_lag']
+            print(f"Event-loop lag: mean {lag['mean_ms']} ms, p95 {lag['p95_ms']} ms, max {lag['max_ms']} ms")
+            print(f"Peak JS heap: {performance['memory']['peak_mb']} MB ({performance['memory']['recycles']} page recycles)")
             print(f"Report: {report_path}")
             print("=" * 60)
             
         finally:
+            await lag_monitor.stop()
+            rpc_counter.uninstall()
             await browser.close()
 
 
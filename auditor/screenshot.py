@@ -1,9 +1,14 @@
 """
 Screenshot management
 """
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional
 from pathlib import Path
 from datetime import datetime
-from playwright.async_api import Page, ElementHandle
+from auditor.evidence_store import EvidenceStore
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, ElementHandle
 
 
 class ScreenshotManager:
@@ -14,6 +19,8 @@ class ScreenshotManager:
         self.merchant = merchant
         self.merchant_dir = self.out_dir / merchant
         self.merchant_dir.mkdir(parents=True, exist_ok=True)
+        # DOM snippets referenced from the report (directory created on first write)
+        self.evidence = EvidenceStore(str(self.merchant_dir / "evidence"))
     
     def _generate_path(self, page_type: str) -> str:
         """
@@ -40,8 +47,8 @@ class ScreenshotManager:
         else:
             # Try to find footer and capture
             try:
-                footer = await page.query_selector('footer')
-                if footer:
+                footer = page.locator('footer').first
+                if await footer.count():
                     await footer.screenshot(path=path)
                 else:
                     await page.screenshot(path=path, full_page=True)
@@ -63,8 +70,8 @@ class ScreenshotManager:
             price_selectors = ['.price', '[class*="price"]', '[data-price]', '#price']
             for selector in price_selectors:
                 try:
-                    price_element = await page.query_selector(selector)
-                    if price_element:
+                    price_element = page.locator(selector).first
+                    if await price_element.count():
                         # Get bounding box and expand to capture surrounding area
                         box = await price_element.bounding_box()
                         if box:
@@ -113,8 +120,8 @@ class ScreenshotManager:
         
         for selector in cart_selectors:
             try:
-                element = await page.query_selector(selector)
-                if element:
+                element = page.locator(selector).first
+                if await element.count():
                     await element.screenshot(path=path)
                     return path
             except Exception:
@@ -127,11 +134,19 @@ class ScreenshotManager:
     async def capture_checkout_payment(
         self,
         page: Page,
-        payment_methods_element: ElementHandle = None
+        payment_methods_element: ElementHandle = None,
+        clip: Optional[Dict[str, float]] = None
     ) -> str:
-        """Capture checkout payment methods screenshot"""
+        """Capture checkout payment methods screenshot (clip: page coordinates)"""
         path = self._generate_path("checkout_payment")
         
+        if clip:
+            try:
+                await page.screenshot(path=path, clip=clip, full_page=True)
+                return path
+            except Exception:
+                pass
+        
         if payment_methods_element:
             try:
                 await payment_methods_element.screenshot(path=path)
@@ -150,8 +165,8 @@ class ScreenshotManager:
         
         for selector in payment_selectors:
             try:
-                element = await page.query_selector(selector)
-                if element:
+                element = page.locator(selector).first
+                if await element.count():
                     await element.screenshot(path=path)
                     return path
             except Exception:
@@ -0,0 +1,145 @@
+"""
+In-page keyword search
+
+Walks the text nodes of a page or frame (open shadow roots included) and
+returns only the hits: keyword, path of the containing block and a short
+snippet around the match. Text is matched per block: the text nodes under
+the same block element are joined with a space, so a phrase split by inline
+markup (`Pay in <b>3</b>`) still matches. Each new node is searched only
+where a match can end in it, so a block costs time linear in its text. Script and style text is skipped, but
+hidden text is not. Every keyword is reported once, and the walk stops as
+soon as every keyword was found or the requested number of hits is reached,
+so the page text never crosses the wire.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Union
+
+if TYPE_CHECKING:
+    from playwright.async_api import Frame, Page
+
+KEYWORD_SEARCH_SCRIPT = """
+({keywords, selector, limit, context}) => {
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    // Tags that do not break a phrase; text under them joins the enclosing block
+    const INLINE = new Set([
+        'A', 'ABBR', 'B', 'BDI', 'BDO', 'CITE', 'CODE', 'DATA', 'DFN', 'EM', 'FONT', 'I', 'KBD', 'LABEL',
+        'MARK', 'Q', 'S', 'SAMP', 'SMALL', 'SPAN', 'STRONG', 'SUB', 'SUP', 'TIME', 'U', 'VAR',
+    ]);
+    const remaining = new Map(keywords.map((k) => [k.toLowerCase(), k]));
+    const hits = [];
+    const pathOf = (el) => {
+        const parts = [];
+        while (el && el.nodeType === 1 && parts.length < 6) {
+            let part = el.tagName.toLowerCase();
+            if (el.id) { parts.unshift(part + '#' + el.id); break; }
+            const cls = (typeof el.className === 'string' ? el.className : '').trim().split(/\\s+/)[0];
+            if (cls) part += '.' + cls;
+            parts.unshift(part);
+            el = el.parentElement || (el.getRootNode() && el.getRootNode().host);
+        }
+        return parts.join(' > ');
+    };
+    const blockOf = (node) => {
+        let el = node.parentElement;
+        while (el && INLINE.has(el.tagName) && el.parentElement) el = el.parentElement;
+        return el || node.parentNode;
+    };
+    let roots;
+    if (selector) {
+        // Every match is a search root, except matches nested in an earlier one
+        roots = [];
+        for (const el of document.querySelectorAll(selector)) {
+            if (!roots.some((root) => root.contains(el))) roots.push(el);
+        }
+    } else {
+        const body = document.body || document.documentElement;
+        roots = body ? [body] : [];
+    }
+    // block element -> {text, lower}: its whitespace-normalized text so far, and that text lowercased
+    const blocks = new Map();
+    while (roots.length && remaining.size && hits.length < limit) {
+        const walker = document.createTreeWalker(roots.shift(), NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+            acceptNode: (node) => node.nodeType === 1 && SKIP.has(node.tagName)
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+        });
+        for (let node = walker.currentNode; node; node = walker.nextNode()) {
+            if (node.nodeType === 1) {
+                if (node.shadowRoot) roots.push(node.shadowRoot);
+                continue;
+            }
+            if (!node.nodeValue || !node.nodeValue.trim()) continue;
+            const block = blockOf(node);
+            let buffer = blocks.get(block);
+            if (!buffer) blocks.set(block, buffer = {text: '', lower: ''});
+            // Nodes join with one space, so cells and list items do not run together
+            let piece = node.nodeValue.replace(/\s+/g, ' ');
+            if (!buffer.text || buffer.text.endsWith(' ')) piece = piece.replace(/^ /, '');
+            else if (!piece.startsWith(' ')) piece = ' ' + piece;
+            const appendedAt = buffer.text.length;
+            buffer.text += piece;
+            buffer.lower += piece.toLowerCase();
+            const {text, lower} = buffer;
+            for (const [needle, keyword] of remaining) {
+                // Earlier text was already searched: only a match reaching into the new piece is new
+                const index = lower.indexOf(needle, Math.max(0, appendedAt - needle.length + 1));
+                if (index < 0) continue;
+                remaining.delete(needle);
+                const snippet = text.slice(Math.max(0, index - context), index + needle.length + context);
+                const holder = block.nodeType === 1 ? block : node.parentElement;
+                hits.push({keyword: keyword, path: pathOf(holder), snippet: snippet.trim()});
+                if (hits.length >= limit) break;
+            }
+            if (!remaining.size || hits.length >= limit) break;
+        }
+    }
+    return hits;
+}
+"""
+
+SNIPPET_CONTEXT = 50
+
+
+@dataclass
+class KeywordHit:
+    """A keyword found in the page"""
+    keyword: str  # as passed in
+    path: str  # CSS-like path of the block element holding the text
+    snippet: str  # text around the match
+
+
+async def find_keywords(
+    scope: Union[Page, Frame],
+    keywords: List[str],
+    limit: Optional[int] = None,
+    selector: Optional[str] = None,
+    context: int = SNIPPET_CONTEXT
+) -> List[KeywordHit]:
+    """
+    Search the text of a page or frame for keywords (case-insensitive)
+
+    Text is matched per block element, hidden text included (the DOM text,
+    not the rendered text).
+
+    Args:
+        scope: Page or Frame
+        keywords: Keywords to look for; each is reported at most once
+        limit: Stop after this many hits (1 answers "is any keyword there?")
+        selector: Only search under the elements matching this selector
+        context: Characters of snippet on each side of a match
+
+    Returns:
+        Hits in document order (empty if the page could not be searched)
+    """
+    if not keywords:
+        return []
+    try:
+        hits = await scope.evaluate(KEYWORD_SEARCH_SCRIPT, {
+            "keywords": keywords,
+            "selector": selector,
+            "limit": limit or len(keywords),
+            "context": context,
+        })
+    except Exception:
+        return []
+    return [KeywordHit(**hit) for hit in hits]
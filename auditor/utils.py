@@ -1,9 +1,20 @@
 """
 Utility functions for auditor
 """
+from __future__ import annotations
 import re
-from typing import Optional, Tuple, Dict
-from playwright.async_api import Page, ElementHandle, Frame
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from app.utils.frames import (  # re-exported for the checks
+    FRAME_SCAN_TIMEOUT, IGNORED_FRAME_PATTERN, KLARNA_FRAME_DOMAINS, is_klarna_frame, is_scannable_frame, scan_frames
+)
+from app.utils.handles import dispose_quietly
+from app.utils.urls import PUBLIC_SUFFIXES, split_host  # re-exported
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, ElementHandle, Frame
+    from auditor.evidence_store import EvidenceStore
 
 
 async def handle_cookie_banner(page: Page) -> None:
@@ -28,8 +39,9 @@ async def handle_cookie_banner(page: Page) -> None:
     
     for selector in cookie_selectors:
         try:
-            element = await page.query_selector(selector)
-            if element and await element.is_visible():
+            # Locators resolve on use and pin no DOM nodes
+            element = page.locator(selector).first
+            if await element.count() and await element.is_visible():
                 await element.click(timeout=1000)
                 await page.wait_for_timeout(200)  # Minimal wait for banner to disappear
                 return
@@ -37,77 +49,107 @@ async def handle_cookie_banner(page: Page) -> None:
             continue
 
 
-async def get_element_snippet_and_path(
-    page: Page,
-    element: ElementHandle
-) -> Dict[str, str]:
+async def has_element(scope, selector: str) -> bool:
     """
-    Get DOM snippet (innerHTML) and selector path (xpath/CSS path)
+    Whether a page or frame contains an element matching selector
+    Counts through a locator so no element handle is created
     """
     try:
-        # Get snippet
-        snippet = await element.inner_html()
-        
-        # Get xpath
-        xpath = await page.evaluate("""
-            (element) => {
-                function getXPath(element) {
-                    if (element.id !== '') return '//*[@id="' + element.id + '"]';
-                    if (element === document.body) return '/html/body';
-                    let ix = 0;
-                    const siblings = element.parentNode.childNodes;
-                    for (let i = 0; i < siblings.length; i++) {
-                        const sibling = siblings[i];
-                        if (sibling === element) {
-                            return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
-                        }
-                        if (sibling.nodeType === 1 && sibling.tagName === element.tagName) ix++;
-                    }
-                }
-                return getXPath(element);
+        return await scope.locator(selector).count() > 0
+    except Exception:
+        return False
+
+
+# Longest snippet stored (characters); the inline preview in reports is shorter
+MAX_SNIPPET_CHARS = 262144
+SNIPPET_PREVIEW_CHARS = 500
+
+ELEMENT_EVIDENCE_SCRIPT = """
+(element, maxChars) => {
+    const getXPath = (el) => {
+        if (el.id !== '') return '//*[@id="' + el.id + '"]';
+        if (el === document.body) return '/html/body';
+        if (!el.parentNode || el.parentNode.nodeType !== 1) return '/' + el.tagName.toLowerCase();
+        let ix = 0;
+        for (const sibling of el.parentNode.childNodes) {
+            if (sibling === el) return getXPath(el.parentNode) + '/' + el.tagName.toLowerCase() + '[' + (ix + 1) + ']';
+            if (sibling.nodeType === 1 && sibling.tagName === el.tagName) ix++;
+        }
+        return '';
+    };
+    const getCssPath = (el) => {
+        const path = [];
+        while (el && el.nodeType === 1) {
+            let selector = el.tagName.toLowerCase();
+            if (el.id) {
+                path.unshift(selector + '#' + el.id);
+                break;
             }
-        """, element)
-        
-        # Get CSS path (simplified)
-        css_path = await page.evaluate("""
-            (element) => {
-                const path = [];
-                while (element && element.nodeType === 1) {
-                    let selector = element.tagName.toLowerCase();
-                    if (element.id) {
-                        selector += '#' + element.id;
-                        path.unshift(selector);
-                        break;
-                    } else {
-                        let sibling = element;
-                        let nth = 1;
-                        while (sibling.previousElementSibling) {
-                            sibling = sibling.previousElementSibling;
-                            if (sibling.tagName === element.tagName) nth++;
-                        }
-                        if (nth !== 1) selector += ':nth-of-type(' + nth + ')';
-                    }
-                    path.unshift(selector);
-                    element = element.parentElement;
-                }
-                return path.join(' > ');
+            let sibling = el;
+            let nth = 1;
+            while (sibling.previousElementSibling) {
+                sibling = sibling.previousElementSibling;
+                if (sibling.tagName === el.tagName) nth++;
             }
-        """, element)
-        
-        return {
-            'snippet': snippet[:500] if len(snippet) > 500 else snippet,  # Limit length
-            'path': css_path or xpath
+            if (nth !== 1) selector += ':nth-of-type(' + nth + ')';
+            path.unshift(selector);
+            el = el.parentElement;
         }
+        return path.join(' > ');
+    };
+    const rect = element.getBoundingClientRect();
+    // The parent gives the element its context (siblings, wrapping link)
+    const context = element.parentElement || element;
+    return {
+        snippet: element.outerHTML.slice(0, maxChars),
+        context: context.outerHTML.slice(0, maxChars),
+        xpath: getXPath(element),
+        css_path: getCssPath(element),
+        bbox: {x: rect.x, y: rect.y, width: rect.width, height: rect.height},
+    };
+}
+"""
+
+
+async def get_element_snippet_and_path(
+    page: Page,
+    element: ElementHandle,
+    store: Optional[EvidenceStore] = None
+) -> Dict[str, Any]:
+    """
+    Get DOM snippet (outerHTML), selector path (CSS path, else XPath) and bounding box
+    in one evaluation; with a store, the element's context HTML is stored
+    compressed and referenced by snippet_ref
+    """
+    try:
+        info = await element.evaluate(ELEMENT_EVIDENCE_SCRIPT, MAX_SNIPPET_CHARS)
     except Exception:
-        return {'snippet': '', 'path': ''}
+        return {'snippet': '', 'path': '', 'xpath': '', 'css_path': '', 'bbox': None, 'snippet_ref': None}
+    
+    snippet_ref = None
+    if store is not None:
+        try:
+            snippet_ref = store.put(info['context'])
+        except OSError as e:
+            print(f"Warning: Failed to store evidence snippet: {str(e)}")
+    return {
+        'snippet': info['snippet'][:SNIPPET_PREVIEW_CHARS],  # Limit length
+        'path': info['css_path'] or info['xpath'],
+        'xpath': info['xpath'],
+        'css_path': info['css_path'],
+        'bbox': info['bbox'],
+        'snippet_ref': snippet_ref
+    }
 
 
 async def find_element_in_frames(
     page: Page,
-    selector: str
+    selector: str,
+    timeout: float = FRAME_SCAN_TIMEOUT
 ) -> Tuple[Optional[ElementHandle], Optional[Frame]]:
     """
-    Find element, checking iframe frames if not found in main frame
+    Find element, checking scannable iframes if not found in main frame
+    The returned handle is owned by the caller, which should dispose it
     """
     # Try main frame first
     try:
@@ -117,34 +159,71 @@ async def find_element_in_frames(
     except Exception:
         pass
     
-    # Check all frames
-    for frame in page.frames:
-        if frame != page.main_frame:
-            try:
-                element = await frame.query_selector(selector)
-                if element:
-                    return element, frame
-            except Exception:
-                continue
-    
-    return None, None
+    # Query the remaining frames concurrently; the first frame in page order wins
+    found = await scan_frames(page, lambda frame: frame.query_selector(selector), timeout)
+    match = next(((element, frame) for frame, element in found if element), (None, None))
+    for _, element in found:
+        if element is not match[0]:
+            await dispose_quietly(element)
+    return match
+
+
+# Country-code TLDs -> ISO country code
+CCTLD_COUNTRIES = {
+    'dk': 'DK', 'se': 'SE', 'no': 'NO', 'fi': 'FI', 'de': 'DE', 'nl': 'NL',
+    'at': 'AT', 'ch': 'CH', 'be': 'BE', 'fr': 'FR', 'es': 'ES', 'it': 'IT',
+    'pl': 'PL', 'pt': 'PT', 'ie': 'IE', 'uk': 'GB', 'gr': 'GR', 'cz': 'CZ',
+    'us': 'US', 'ca': 'CA', 'au': 'AU', 'nz': 'NZ', 'mx': 'MX',
+}
+
+# First path segment naming a market: /dk/, /da-dk/, /en_gb/
+_PATH_MARKET = re.compile(r'^/(?:[a-z]{2}[-_])?([a-z]{2})(?:/|$)', re.IGNORECASE)
 
 
-def detect_country_from_url(url: str) -> Optional[str]:
+@lru_cache(maxsize=4096)
+def country_from_host(host: str) -> Optional[str]:
     """
-    Detect country code from URL
+    Country of a hostname
+
+    The country-code TLD decides (shop.dk, shop.co.uk). Under a generic TLD,
+    a market subdomain does (dk.shop.com); labels of the public suffix are
+    not subdomains, so shop.de.com has no country.
     """
-    country_map = {
-        '.dk': 'DK',
-        '.se': 'SE',
-        '.no': 'NO',
-        '.fi': 'FI',
-        '.de': 'DE',
-        '.nl': 'NL'
-    }
-    
-    for domain, country in country_map.items():
-        if domain in url.lower():
-            return country
-    
+    if not host or '.' not in host:
+        return None
+    registrable, suffix = split_host(host)
+    country = CCTLD_COUNTRIES.get(suffix.rsplit('.', 1)[-1])
+    if country:
+        return country
+    subdomains = host.lower()[:-len(registrable)].rstrip('.').split('.') if host.lower() != registrable else []
+    for label in subdomains:
+        if label in CCTLD_COUNTRIES:
+            return CCTLD_COUNTRIES[label]
     return None
+
+
+def country_from_locale(locale: Optional[str]) -> Optional[str]:
+    """Region of a locale tag: da-DK -> DK, en_GB -> GB (None without a region)"""
+    if not locale:
+        return None
+    parts = re.split(r'[-_]', locale.strip())
+    region = parts[1].upper() if len(parts) > 1 and len(parts[1]) == 2 else None
+    return 'GB' if region == 'UK' else region
+
+
+def detect_country_from_url(url: str, locale: Optional[str] = None) -> Optional[str]:
+    """
+    Detect country code from URL
+
+    Uses the host's country-code TLD; for generic TLDs (.com, .shop, de.com)
+    a market path segment (/dk/, /da-dk/) and then the locale's region
+    (e.g. the page's lang attribute or the browser locale) are used.
+    """
+    parts = urlsplit(url if '://' in url else f'https://{url}')
+    country = country_from_host(parts.hostname or '')
+    if country:
+        return country
+    match = _PATH_MARKET.match(parts.path or '')
+    if match and match.group(1).lower() in CCTLD_COUNTRIES:
+        return CCTLD_COUNTRIES[match.group(1).lower()]
+    return country_from_locale(locale)
@@ -0,0 +1,3 @@
+"""
+Local benchmark harness with fixture merchant sites
+"""
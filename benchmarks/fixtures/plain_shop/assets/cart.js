@@ -0,0 +1,8 @@
+function addToCart() {
+  document.cookie = "fixture_cart=1; path=/";
+  var status = document.getElementById("cart-status");
+  if (status) { status.textContent = "Lagt i kurven"; }
+}
+function cartHasItems() {
+  return document.cookie.indexOf("fixture_cart=1") !== -1;
+}
@@ -0,0 +1,320 @@
+"""
+Benchmark harness: run app.run and auditor.run against local fixture sites
+
+Usage:
+    python -m benchmarks.run --targets app,auditor --concurrency 1,4 --merchants 12
+    python -m benchmarks.run --targets app --concurrency 8,16,32 --synthetic --merchants 1000
+    python -m benchmarks.run --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import cycle
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+
+from app.utils.metrics import percentile
+from benchmarks.server import FixtureServer
+from benchmarks.synthetic import generate_storefronts
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+REPO_ROOT = Path(__file__).parent.parent
+PDP_PATH = "produkter/headphones/airpods-pro-3/"
+# Every fixture shop is served from 127.0.0.1, so the per-host gate would
+# serialise the whole benchmark; lift it far above any concurrency level
+BENCH_PER_HOST_CONCURRENCY = 1000
+BENCH_PER_HOST_RATE = 1000.0
+
+# (site, variants) combinations cycled to build the merchant list
+SITE_MATRIX = [
+    ("klarna_shop", ()),
+    ("plain_shop", ()),
+    ("klarna_shop", ("cookie_banner",)),
+    ("klarna_shop", ("slow_scripts",)),
+    ("plain_shop", ("cookie_banner", "slow_scripts")),
+    ("klarna_shop", ("slow_server",)),
+]
+
+
+def build_merchants(server: FixtureServer, count: int) -> List[Dict[str, str]]:
+    """Build benchmark merchants by cycling through the fixture site matrix"""
+    merchants = []
+    for i, (site, variants) in zip(range(count), cycle(SITE_MATRIX)):
+        base_url = server.site_url(site, *variants)
+        merchants.append({
+            "merchant_id": f"BENCH_{i + 1:04d}",
+            "merchant_name": "--".join((site,) + variants),
+            "base_url": base_url,
+            "product_url": base_url + PDP_PATH,
+        })
+    return merchants
+
+
+def build_synthetic_merchants(server: FixtureServer, count: int, out_dir: Path) -> List[Dict[str, str]]:
+    """Generate synthetic shops into the server's fixture root and list them as merchants"""
+    generate_storefronts(str(out_dir), count, server.base_url)
+    with open(out_dir / "merchant_registry.csv", newline="", encoding="utf-8") as f:
+        return [
+            {key: row[key] for key in ("merchant_id", "merchant_name", "base_url", "product_url")}
+            for row in csv.DictReader(f)
+        ]
+
+
+def run_process(cmd: List[str], log_path: Path) -> Tuple[int, float]:
+    """
+    Run a subprocess and wait for it with wait4 to get its own resource usage
+
+    Returns:
+        Tuple of (exit code, peak RSS in MB of the largest process in its tree)
+    """
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(cmd, cwd=str(REPO_ROOT), stdout=log, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return proc.returncode, rusage.ru_maxrss / divisor
+
+
+def stage_stats(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Aggregate per-stage latency samples"""
+    return {
+        stage: {
+            "mean_ms": round(sum(values) / len(values), 1),
+            "p50_ms": round(percentile(values, 0.5), 1),
+            "p95_ms": round(percentile(values, 0.95), 1),
+        }
+        for stage, values in samples.items() if values
+    }
+
+
+def bench_app(merchants: List[Dict[str, str]], concurrency: int, work_dir: Path) -> Dict[str, Any]:
+    """Run app.run once over all merchants"""
+    registry = work_dir / "merchant_registry.csv"
+    with open(registry, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["merchant_id", "merchant_name", "base_url", "product_url", "status"])
+        writer.writeheader()
+        for merchant in merchants:
+            writer.writerow({**merchant, "status": "active"})
+
+    out_dir = work_dir / "out"
+    cmd = [
+        sys.executable, "-m", "app.run",
+        "--input", str(registry),
+        "--out", str(out_dir),
+        "--concurrency", str(concurrency),
+        "--max-retries", "0",
+        "--per-host-concurrency", str(BENCH_PER_HOST_CONCURRENCY),
+        "--per-host-rate", str(BENCH_PER_HOST_RATE),
+    ]
+    started = time.perf_counter()
+    exit_code, peak_rss_mb = run_process(cmd, work_dir / "app.log")
+    wall_s = time.perf_counter() - started
+
+    samples: Dict[str, List[float]] = {}
+    failures = 0
+    reports = sorted(out_dir.glob("audit_*.json"))
+    if reports:
+        report = json.loads(reports[-1].read_text(encoding="utf-8"))
+        for entry in report["merchants"]:
+            if entry["audit_status"] != "completed":
+                failures += 1
+            for stage, ms in (entry.get("timings_ms") or {}).items():
+                samples.setdefault(stage, []).append(ms)
+
+    return {
+        "exit_code": exit_code,
+        "wall_s": round(wall_s, 2),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "failures": failures,
+        "stages": stage_stats(samples),
+    }
+
+
+def bench_auditor(merchants: List[Dict[str, str]], concurrency: int, work_dir: Path) -> Dict[str, Any]:
+    """Run one auditor.run process per merchant, `concurrency` processes at a time"""
+    out_dir = work_dir / "out"
+
+    def audit(merchant: Dict[str, str]) -> Tuple[int, float]:
+        cmd = [
+            sys.executable, "-m", "auditor.run",
+            "--out-dir", str(out_dir),
+            "--merchant", merchant["merchant_id"],
+            "--home-url", merchant["base_url"],
+            "--pdp-url", merchant["product_url"],
+            "--per-host-rate", str(BENCH_PER_HOST_RATE),
+        ]
+        return run_process(cmd, work_dir / f"{merchant['merchant_id']}.log")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(audit, merchants))
+    wall_s = time.perf_counter() - started
+
+    samples: Dict[str, List[float]] = {}
+    failures = 0
+    for merchant in merchants:
+        report_path = out_dir / merchant["merchant_id"] / "report.json"
+        if not report_path.exists():
+            failures += 1
+            continue
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        for entry in report["results"]:
+            if entry.get("duration_ms") is not None:
+                samples.setdefault(entry["check_id"], []).append(entry["duration_ms"])
+
+    return {
+        "exit_code": max((code for code, _ in outcomes), default=0),
+        "wall_s": round(wall_s, 2),
+        "peak_rss_mb": round(max((rss for _, rss in outcomes), default=0.0), 1),
+        "failures": failures,
+        "stages": stage_stats(samples),
+    }
+
+
+TARGETS = {
+    "app": bench_app,
+    "auditor": bench_auditor,
+}
+
+
+def git_revision() -> str:
+    """Short commit hash of the working tree (with a marker for local changes)"""
+    try:
+        sha = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(REPO_ROOT), text=True
+        ).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=str(REPO_ROOT)) != 0
+        return f"{sha}-dirty" if dirty else sha
+    except Exception:
+        return "unknown"
+
+
+def run_benchmarks(
+    targets: List[str],
+    concurrency_levels: List[int],
+    merchant_count: int,
+    synthetic: bool = False
+) -> Dict[str, Any]:
+    """
+    Run every target at every concurrency level against a fresh fixture server
+
+    Args:
+        targets: Targets to run (keys of TARGETS)
+        concurrency_levels: Concurrency levels to run each target at
+        merchant_count: Number of merchants
+        synthetic: Use generated synthetic shops instead of the fixture site matrix
+    """
+    with tempfile.TemporaryDirectory(prefix="klarna_bench_") as tmp:
+        synthetic_dir = Path(tmp) / "synthetic"
+        server = FixtureServer(fixtures_dir=str(synthetic_dir) if synthetic else None).start()
+        try:
+            if synthetic:
+                merchants = build_synthetic_merchants(server, merchant_count, synthetic_dir)
+            else:
+                merchants = build_merchants(server, merchant_count)
+            runs = _run_matrix(targets, concurrency_levels, merchants, Path(tmp))
+        finally:
+            server.stop()
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "source": "synthetic" if synthetic else "fixtures",
+        "runs": runs,
+    }
+
+
+def _run_matrix(
+    targets: List[str],
+    concurrency_levels: List[int],
+    merchants: List[Dict[str, str]],
+    tmp: Path
+) -> List[Dict[str, Any]]:
+    """Run every target at every concurrency level"""
+    runs = []
+    for target in targets:
+        for concurrency in concurrency_levels:
+            work_dir = Path(tmp) / f"{target}_c{concurrency}"
+            work_dir.mkdir(parents=True)
+            print(f"[bench] {target} concurrency={concurrency} merchants={len(merchants)} ...")
+            result = TARGETS[target](merchants, concurrency, work_dir)
+            result.update({
+                "target": target,
+                "concurrency": concurrency,
+                "merchants": len(merchants),
+                "merchants_per_min": round(len(merchants) / result["wall_s"] * 60, 2) if result["wall_s"] else 0.0,
+            })
+            print(f"[bench]   {result['merchants_per_min']} merchants/min, "
+                  f"peak RSS {result['peak_rss_mb']} MB, failures {result['failures']}")
+            runs.append(result)
+
+    return runs
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print throughput, latency and memory deltas between two result files"""
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    old_runs = {(r["target"], r["concurrency"]): r for r in old["runs"]}
+
+    print(f"{old['revision']} -> {new['revision']}")
+    for run in new["runs"]:
+        key = (run["target"], run["concurrency"])
+        base = old_runs.get(key)
+        if base is None:
+            print(f"{key[0]} c={key[1]}: no baseline")
+            continue
+        print(f"{key[0]} c={key[1]}: "
+              f"merchants/min {base['merchants_per_min']} -> {run['merchants_per_min']}, "
+              f"peak RSS {base['peak_rss_mb']} -> {run['peak_rss_mb']} MB")
+        for stage, stats in run["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats:
+                print(f"    {stage}: p95 {base_stats['p95_ms']} -> {stats['p95_ms']} ms")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the auditors against local fixture sites')
+    parser.add_argument('--targets', default='app,auditor', help='Comma-separated targets: app, auditor (default: app,auditor)')
+    parser.add_argument('--concurrency', default='1,4', help='Comma-separated concurrency levels (default: 1,4)')
+    parser.add_argument('--merchants', type=int, default=len(SITE_MATRIX), help=f'Number of fixture merchants (default: {len(SITE_MATRIX)})')
+    parser.add_argument('--synthetic', action='store_true', help='Benchmark generated synthetic shops (see benchmarks.synthetic)')
+    parser.add_argument('--results-dir', default=str(RESULTS_DIR), help='Directory for result files')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Compare two result files instead of running')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    targets = [t.strip() for t in args.targets.split(',') if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"Unknown targets: {', '.join(unknown)}")
+    concurrency_levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+    results = run_benchmarks(targets, concurrency_levels, args.merchants, synthetic=args.synthetic)
+
+    results_dir = Path(args.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    results_path = results_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{results['revision']}.json"
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"[bench] Results saved to: {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Local HTTP server for fixture merchant sites
+
+URL layout: /<site>[--<variant>...]/<path>
+
+- <site> is a directory under the fixture root (e.g. klarna_shop)
+- Variants are injected into HTML responses, e.g. /klarna_shop--cookie_banner/
+- /_slow.js?ms=N answers after N milliseconds (render-blocking script)
+- /_redirect?to=URL answers 301 to URL
+- A site may contain _meta.json with {"latency_ms": N} to delay every response
+"""
+import json
+import mimetypes
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+COOKIE_BANNER_HTML = """
+<div id="cookie-banner" style="position:fixed;bottom:0;left:0;right:0;padding:24px;background:#222;color:#fff;z-index:1000">
+  Vi bruger cookies for at forbedre din oplevelse.
+  <button id="cookie-accept" class="cookie-accept" onclick="document.getElementById('cookie-banner').remove()">Accepter</button>
+</div>
+"""
+
+SLOW_SCRIPT_HTML = '<script src="/_slow.js?ms=1500"></script>'
+
+# Variant name -> (HTML snippet injected before </body>, extra response latency in ms)
+VARIANTS: Dict[str, tuple] = {
+    "cookie_banner": (COOKIE_BANNER_HTML, 0),
+    "slow_scripts": (SLOW_SCRIPT_HTML, 0),
+    "slow_server": ("", 800),
+}
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """Serve fixture sites with variant injection"""
+
+    fixtures_dir: Path = FIXTURES_DIR
+    _meta_cache: Dict[str, dict] = {}
+
+    def log_message(self, format, *args):
+        """Silence per-request logging"""
+        pass
+
+    def do_HEAD(self):
+        """Handle HEAD request"""
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        """Handle GET request"""
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool) -> None:
+        parsed = urlparse(self.path)
+
+        if parsed.path == "/_slow.js":
+            delay_ms = int(parse_qs(parsed.query).get("ms", ["1000"])[0])
+            time.sleep(delay_ms / 1000)
+            self._respond(200, b"window.__slowScriptLoaded = true;", "application/javascript", send_body)
+            return
+
+        if parsed.path == "/_redirect":
+            self.send_response(301)
+            self.send_header("Location", parse_qs(parsed.query).get("to", ["/"])[0])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        segments = [s for s in unquote(parsed.path).split("/") if s]
+        if not segments:
+            self._respond(404, b"Not found", "text/plain", send_body)
+            return
+
+        prefix = segments[0]
+        site, *variants = prefix.split("--")
+        site_dir = self.fixtures_dir / site
+        if not site_dir.is_dir() or any(v not in VARIANTS for v in variants):
+            self._respond(404, b"Not found", "text/plain", send_body)
+            return
+
+        file_path = self._resolve(site_dir, segments[1:])
+        if file_path is None:
+            self._respond(404, b"Not found", "text/plain", send_body)
+            return
+
+        latency_ms = self._site_meta(site_dir).get("latency_ms", 0)
+        latency_ms += sum(VARIANTS[v][1] for v in variants)
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+        content_type = mimetypes.guess_type(str(file_path))[0] or "application/octet-stream"
+        body = file_path.read_bytes()
+        if content_type == "text/html":
+            html = body.decode("utf-8")
+            # Resolve relative links against the site root, whatever the request path
+            html = html.replace("<head>", f'<head><base href="/{prefix}/">', 1)
+            injected = "".join(VARIANTS[v][0] for v in variants)
+            if injected:
+                html = html.replace("</body>", injected + "</body>", 1)
+            body = html.encode("utf-8")
+
+        self._respond(200, body, content_type, send_body)
+
+    def _resolve(self, site_dir: Path, parts) -> Optional[Path]:
+        """Map URL path segments to a file inside the site directory"""
+        candidate = site_dir.joinpath(*parts) if parts else site_dir
+        try:
+            candidate.resolve().relative_to(site_dir.resolve())
+        except ValueError:
+            return None
+        if candidate.is_dir():
+            candidate = candidate / "index.html"
+        return candidate if candidate.is_file() else None
+
+    def _site_meta(self, site_dir: Path) -> dict:
+        """Read (and cache) the site's _meta.json"""
+        key = str(site_dir)
+        if key not in self._meta_cache:
+            meta_path = site_dir / "_meta.json"
+            self._meta_cache[key] = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        return self._meta_cache[key]
+
+    def _respond(self, status: int, body: bytes, content_type: str, send_body: bool) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8" if content_type.startswith("text/") else content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class FixtureServer:
+    """Run the fixture HTTP server in a background thread"""
+
+    def __init__(self, fixtures_dir: str = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize server
+
+        Args:
+            fixtures_dir: Directory containing fixture sites (default: benchmarks/fixtures)
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        handler = type(
+            "BoundFixtureRequestHandler",
+            (FixtureRequestHandler,),
+            {"fixtures_dir": Path(fixtures_dir) if fixtures_dir else FIXTURES_DIR, "_meta_cache": {}}
+        )
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Server root URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def site_url(self, site: str, *variants: str) -> str:
+        """URL of a fixture site (with optional variants)"""
+        return f"{self.base_url}/{'--'.join((site,) + variants)}/"
+
+    def start(self) -> "FixtureServer":
+        """Start serving in a daemon thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
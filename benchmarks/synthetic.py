@@ -0,0 +1,351 @@
+"""
+Synthetic storefront generator for scale and stress testing
+
+Generates N distinct shops servable by benchmarks.server.FixtureServer plus a
+matching merchant_registry.csv and a shops.json with the expected outcome of
+every check (ground truth).
+
+Usage:
+    python -m benchmarks.synthetic generate --count 10000 --out out/synthetic --base-url http://127.0.0.1:8765
+    python -m benchmarks.synthetic serve --dir out/synthetic --port 8765
+"""
+import argparse
+import csv
+import json
+import random
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Button texts and paths per selector dialect
+DIALECTS: Dict[str, Dict[str, str]] = {
+    "da": {
+        "lang": "da",
+        "add_to_cart": "Læg i kurv",
+        "checkout": "Til kassen",
+        "cart_empty": "Kurven er tom",
+        "cart": "Kurv",
+        "product_dir": "produkter",
+        "osm_text": "Del op i 3 rentefrie betalinger med Klarna",
+        "footer_text": "Betal sikkert med Klarna",
+        "currency": "kr",
+    },
+    "sv": {
+        "lang": "sv",
+        "add_to_cart": "Lägg i varukorg",
+        "checkout": "Till kassan",
+        "cart_empty": "Varukorgen är tom",
+        "cart": "Varukorg",
+        "product_dir": "produkter",
+        "osm_text": "Dela upp i 3 räntefria betalningar med Klarna",
+        "footer_text": "Betala tryggt med Klarna",
+        "currency": "kr",
+    },
+    "en": {
+        "lang": "en",
+        "add_to_cart": "Add to cart",
+        "checkout": "Checkout",
+        "cart_empty": "Cart is empty",
+        "cart": "Cart",
+        "product_dir": "products",
+        "osm_text": "Pay in 3 interest-free payments with Klarna",
+        "footer_text": "Pay securely with Klarna",
+        "currency": "EUR",
+    },
+}
+
+# Where Klarna appears, per placement profile
+PLACEMENTS: Dict[str, Tuple[str, ...]] = {
+    "full": ("footer_logo", "pdp_osm", "cart_text", "checkout_method"),
+    "footer_only": ("footer_logo",),
+    "footer_text": ("footer_text",),
+    "osm_only": ("pdp_osm",),
+    "checkout_only": ("checkout_method",),
+    "none": (),
+}
+
+OTHER_PAYMENT_METHODS = ["Betalingskort", "MobilePay", "PayPal", "Apple Pay", "Swish", "Vipps"]
+PRODUCTS = ["AirPods Pro 3", "Running Shoe X", "Wool Sweater", "Desk Lamp", "Coffee Grinder", "Backpack 30L"]
+
+FILLER_SENTENCE = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. "
+)
+
+
+@dataclass
+class GeneratorConfig:
+    """Distribution of synthetic shop properties"""
+    page_weight_kb: Tuple[int, int] = (20, 200)
+    dialects: Sequence[str] = ("da", "sv", "en")
+    placements: Sequence[str] = tuple(PLACEMENTS)
+    max_iframe_depth: int = 2
+    latency_ms: Tuple[int, int] = (0, 0)
+    class_hint_rate: float = 0.5  # Share of shops whose buttons carry class hints (add-to-cart, checkout)
+
+
+@dataclass
+class ShopSpec:
+    """Properties of one generated shop (also the ground truth for its checks)"""
+    shop_id: str
+    name: str
+    dialect: str
+    placement: str
+    page_weight_kb: int
+    iframe_depth: int
+    latency_ms: int
+    class_hints: bool
+    product: str
+    klarna_position: Optional[int]
+    payment_methods: List[str] = field(default_factory=list)
+    expected: Dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def product_path(self) -> str:
+        """PDP path relative to the shop root"""
+        slug = self.product.lower().replace(" ", "-")
+        return f"{DIALECTS[self.dialect]['product_dir']}/{slug}/"
+
+
+def make_spec(index: int, rng: random.Random, config: GeneratorConfig) -> ShopSpec:
+    """Draw the properties of one shop"""
+    dialect = rng.choice(list(config.dialects))
+    placement = rng.choice(list(config.placements))
+    features = PLACEMENTS[placement]
+
+    others = rng.sample(OTHER_PAYMENT_METHODS, rng.randint(1, 3))
+    klarna_position = None
+    if "checkout_method" in features:
+        klarna_position = rng.randint(1, len(others) + 1)
+        others.insert(klarna_position - 1, "Klarna")
+
+    return ShopSpec(
+        shop_id=f"shop{index:05d}",
+        name=f"Synthetic Shop {index:05d}",
+        dialect=dialect,
+        placement=placement,
+        page_weight_kb=rng.randint(*config.page_weight_kb),
+        iframe_depth=rng.randint(0, config.max_iframe_depth),
+        latency_ms=rng.randint(*config.latency_ms),
+        class_hints=rng.random() < config.class_hint_rate,
+        product=rng.choice(PRODUCTS),
+        klarna_position=klarna_position,
+        payment_methods=others,
+        expected={
+            "FOOTER_KLARNA_LOGO": bool({"footer_logo", "footer_text"} & set(features)),
+            "PDP_OSM": "pdp_osm" in features,
+            "CART_KLARNA": "cart_text" in features,
+            "CHECKOUT_PAYMENT_POSITION": "checkout_method" in features,
+        },
+    )
+
+
+def _filler(weight_kb: int) -> str:
+    """Product-grid filler reaching roughly weight_kb of HTML"""
+    card = '<div class="product-card"><h3>Produkt</h3><p>' + FILLER_SENTENCE * 4 + '</p></div>\n'
+    return card * max(0, (weight_kb * 1024) // len(card))
+
+
+def _page(spec: ShopSpec, title: str, body: str, footer: str) -> str:
+    words = DIALECTS[spec.dialect]
+    return (
+        f'<!DOCTYPE html>\n<html lang="{words["lang"]}">\n<head>\n'
+        f'  <meta charset="utf-8">\n  <title>{title} - {spec.name}</title>\n'
+        f'  <script>function addToCart(){{document.cookie="synthetic_cart_{spec.shop_id}=1; path=/";}}'
+        f' function cartHasItems(){{return document.cookie.indexOf("synthetic_cart_{spec.shop_id}=1")!==-1;}}</script>\n'
+        f'</head>\n<body>\n'
+        f'  <header><a href="./">{spec.name}</a> | <a href="{spec.product_path}">{spec.product}</a> | <a href="cart">{words["cart"]}</a></header>\n'
+        f'  <main>\n{body}\n  </main>\n'
+        f'  <footer>\n{footer}\n  </footer>\n</body>\n</html>\n'
+    )
+
+
+def render_shop(spec: ShopSpec, shop_dir: Path) -> None:
+    """Write the HTML files of one shop"""
+    words = DIALECTS[spec.dialect]
+    features = PLACEMENTS[spec.placement]
+
+    # Klarna footer only on the home page, where the footer check looks; other
+    # pages keep a plain footer so it cannot leak into the PDP and cart checks
+    plain_footer = f'    <p>&copy; {spec.name}</p>'
+    footer = plain_footer
+    if "footer_logo" in features:
+        footer += '\n    <img src="data:image/svg+xml,%3Csvg xmlns=%22http://www.w3.org/2000/svg%22/%3E" alt="Klarna" width="80" height="32">'
+    if "footer_text" in features:
+        footer += f'\n    <p>{words["footer_text"]}</p>'
+
+    files: Dict[str, str] = {}
+    files["index.html"] = _page(spec, "Home", f'    <h1>{spec.name}</h1>\n{_filler(spec.page_weight_kb)}', footer)
+
+    # PDP with OSM inline (depth 0) or nested iframes
+    osm = ""
+    if "pdp_osm" in features:
+        osm_div = f'<div class="klarna-osm">{words["osm_text"]}</div>'
+        if spec.iframe_depth == 0:
+            osm = f'    {osm_div}'
+        else:
+            for level in range(spec.iframe_depth, 0, -1):
+                inner = osm_div if level == spec.iframe_depth else (
+                    f'<iframe src="osm/frame_{level + 1}.html" width="420" height="60" style="border:0"></iframe>'
+                )
+                files[f"osm/frame_{level}.html"] = (
+                    f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head>'
+                    f'<body style="margin:0">{inner}</body></html>\n'
+                )
+            osm = '    <iframe class="klarna-placement" src="osm/frame_1.html" width="440" height="80" style="border:0"></iframe>'
+
+    button_class = ' class="add-to-cart"' if spec.class_hints else ' class="btn btn-primary"'
+    pdp_body = (
+        f'    <h1>{spec.product}</h1>\n'
+        f'    <div class="product-price price">1.999 {words["currency"]}</div>\n'
+        f'{osm}\n'
+        f'    <p><button{button_class} onclick="addToCart()">{words["add_to_cart"]}</button></p>\n'
+        f'{_filler(spec.page_weight_kb // 2)}'
+    )
+    files[spec.product_path + "index.html"] = _page(spec, spec.product, pdp_body, plain_footer)
+
+    cart_extra = f"<p>{words['osm_text']}</p>" if "cart_text" in features else ""
+    checkout_class = ' class="checkout"' if spec.class_hints else ' class="btn"'
+    cart_body = (
+        '    <div id="cart-content"></div>\n'
+        '    <script>\n'
+        '      document.getElementById("cart-content").innerHTML = cartHasItems()\n'
+        f'        ? \'<div class="cart-summary"><p>{spec.product} - 1.999 {words["currency"]}</p>{cart_extra}'
+        f'<a{checkout_class} href="checkout/">{words["checkout"]}</a></div>\'\n'
+        f'        : \'<p>{words["cart_empty"]}</p>\';\n'
+        '    </script>'
+    )
+    files["cart/index.html"] = _page(spec, words["cart"], cart_body, plain_footer)
+
+    radios = "\n".join(
+        f'      <input type="radio" name="payment_method" id="pm{i}" value="pm{i}">'
+        f'<label for="pm{i}" class="payment-method">{method}</label>'
+        for i, method in enumerate(spec.payment_methods, start=1)
+    )
+    files["checkout/index.html"] = _page(
+        spec, words["checkout"], f'    <div class="payment-methods">\n{radios}\n    </div>', plain_footer
+    )
+
+    for relative, content in files.items():
+        path = shop_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    if spec.latency_ms:
+        (shop_dir / "_meta.json").write_text(json.dumps({"latency_ms": spec.latency_ms}), encoding="utf-8")
+
+
+def generate_storefronts(
+    out_dir: str,
+    count: int,
+    base_url: str,
+    config: GeneratorConfig = None,
+    seed: int = 0
+) -> List[ShopSpec]:
+    """
+    Generate synthetic shops, merchant_registry.csv and shops.json
+
+    Args:
+        out_dir: Output directory (served as the fixture root)
+        count: Number of shops
+        base_url: URL the fixture server will be reachable at (e.g. http://127.0.0.1:8765)
+        config: Property distributions (default: GeneratorConfig())
+        seed: Random seed; the same seed always yields the same shops
+
+    Returns:
+        List of generated shop specs
+    """
+    config = config or GeneratorConfig()
+    rng = random.Random(seed)
+    root = Path(out_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    base_url = base_url.rstrip("/")
+
+    specs = []
+    with open(root / "merchant_registry.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[
+            "merchant_id", "merchant_name", "base_url", "checkout_url",
+            "product_url", "cart_url", "status", "priority", "notes"
+        ])
+        writer.writeheader()
+        for index in range(1, count + 1):
+            spec = make_spec(index, rng, config)
+            render_shop(spec, root / spec.shop_id)
+            shop_url = f"{base_url}/{spec.shop_id}/"
+            writer.writerow({
+                "merchant_id": spec.shop_id.upper(),
+                "merchant_name": spec.name,
+                "base_url": shop_url,
+                "checkout_url": "/checkout/",
+                "product_url": shop_url + spec.product_path,
+                "cart_url": "/cart",
+                "status": "active",
+                "priority": 5,
+                "notes": f"synthetic:{spec.dialect}:{spec.placement}",
+            })
+            specs.append(spec)
+
+    with open(root / "shops.json", "w", encoding="utf-8") as f:
+        json.dump([asdict(spec) for spec in specs], f, indent=1, ensure_ascii=False)
+
+    return specs
+
+
+def _range(value: str) -> Tuple[int, int]:
+    """Parse "MIN,MAX" (or a single value) into a tuple"""
+    parts = [int(p) for p in value.split(",")]
+    return (parts[0], parts[-1])
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Synthetic storefront generator')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    gen = subparsers.add_parser('generate', help='Generate synthetic shops and merchant_registry.csv')
+    gen.add_argument('--count', type=int, required=True, help='Number of shops')
+    gen.add_argument('--out', required=True, help='Output directory')
+    gen.add_argument('--base-url', default='http://127.0.0.1:8765', help='URL the shops will be served from')
+    gen.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    gen.add_argument('--page-weight-kb', type=_range, default=(20, 200), help='Page weight range MIN,MAX in KB')
+    gen.add_argument('--dialects', default='da,sv,en', help='Comma-separated button-text dialects')
+    gen.add_argument('--placements', default=','.join(PLACEMENTS), help='Comma-separated Klarna placement profiles')
+    gen.add_argument('--max-iframe-depth', type=int, default=2, help='Maximum OSM iframe nesting depth')
+    gen.add_argument('--latency-ms', type=_range, default=(0, 0), help='Artificial latency range MIN,MAX in ms')
+
+    serve = subparsers.add_parser('serve', help='Serve generated shops')
+    serve.add_argument('--dir', required=True, help='Directory with generated shops')
+    serve.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    serve.add_argument('--port', type=int, default=8765, help='Port to bind')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        config = GeneratorConfig(
+            page_weight_kb=args.page_weight_kb,
+            dialects=[d.strip() for d in args.dialects.split(',') if d.strip()],
+            placements=[p.strip() for p in args.placements.split(',') if p.strip()],
+            max_iframe_depth=args.max_iframe_depth,
+            latency_ms=args.latency_ms,
+        )
+        unknown = [d for d in config.dialects if d not in DIALECTS] + [p for p in config.placements if p not in PLACEMENTS]
+        if unknown:
+            parser.error(f"Unknown dialects/placements: {', '.join(unknown)}")
+        specs = generate_storefronts(args.out, args.count, args.base_url, config, args.seed)
+        print(f"Generated {len(specs)} shops in {args.out}")
+        print(f"Registry: {Path(args.out) / 'merchant_registry.csv'}")
+    else:
+        from benchmarks.server import FixtureServer
+        server = FixtureServer(fixtures_dir=args.dir, host=args.host, port=args.port).start()
+        print(f"Serving {args.dir} at {server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
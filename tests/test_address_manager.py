@@ -0,0 +1,52 @@
+"""
+Test for the test-address registry and country detection
+"""
+import json
+from auditor.data.address_manager import AddressManager
+from auditor.utils import country_from_host, detect_country_from_url, split_host
+
+
+def address(last_name, country="DK"):
+    return {
+        "first_name": "Test", "last_name": last_name, "email": "customer@email.dk", "phone": "+4542555628",
+        "street": "Dantes Plads 7", "postal_code": "1556", "city": "København Ø", "country": country
+    }
+
+
+def test_addresses_rotate_per_country(tmp_path):
+    """Test that a country with several addresses hands them out round-robin"""
+    path = tmp_path / "addresses.json"
+    path.write_text(json.dumps({"dk": [address("A"), address("B")], "SE": address("S", "SE")}), encoding="utf-8")
+    manager = AddressManager(str(path))
+
+    assert [manager.get_address("DK").last_name for _ in range(3)] == ["A", "B", "A"]
+    assert manager.get_address("se").last_name == "S"
+    assert manager.get_address("FI") is None
+
+
+def test_shared_manager_loads_once(tmp_path):
+    """Test that the shared manager is not re-read per checkout"""
+    path = tmp_path / "addresses.json"
+    path.write_text(json.dumps({"DK": address("A")}), encoding="utf-8")
+
+    first = AddressManager.shared(str(path))
+    path.write_text(json.dumps({"DK": address("Changed")}), encoding="utf-8")
+
+    assert AddressManager.shared(str(path)) is first
+    assert first.get_address("DK").last_name == "A"
+
+
+def test_country_detection_uses_tld_not_substrings():
+    """Test that only the TLD (or an explicit market) decides the country"""
+    assert detect_country_from_url("https://www.humac.dk/") == "DK"
+    assert detect_country_from_url("https://shop.dev/checkout") is None
+    assert detect_country_from_url("https://www.nord.com/") is None
+    assert detect_country_from_url("https://shop.co.uk/") == "GB"
+    assert detect_country_from_url("https://dk.shop.com/") == "DK"
+    assert detect_country_from_url("https://shop.de.com/") is None
+    assert detect_country_from_url("https://shop.com/da-dk/product") == "DK"
+    assert detect_country_from_url("https://shop.com/", locale="sv-SE") == "SE"
+    assert split_host("www.shop.co.uk") == ("shop.co.uk", "co.uk")
+    assert split_host("shop.co.jp") == ("shop.co.jp", "co.jp")
+    assert split_host("www.shop.gv.at") == ("shop.gv.at", "gv.at")
+    assert country_from_host("localhost") is None
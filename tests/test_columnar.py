@@ -0,0 +1,72 @@
+"""
+Test for columnar export of audit results
+"""
+import json
+import pytest
+from app.report.report_generator import AuditResult, ReportGenerator
+from auditor.report import CheckResult, Evidence, ReportGenerator as CheckReportGenerator
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+feather = pytest.importorskip("pyarrow.feather")
+
+
+def make_result(merchant_id, passed, audit_status="completed", timings=None):
+    return AuditResult(
+        merchant_id=merchant_id,
+        merchant_name=merchant_id,
+        base_url=f"https://{merchant_id}.dk",
+        audit_status=audit_status,
+        audit_timestamp="2026-10-18T02:00:00.123456Z",
+        rule_id="FOOTER_KLARNA_LOGO",
+        rule_description="Detect Klarna logo in footer",
+        passed=passed,
+        confidence=0.95 if passed else 0.0,
+        matched_selectors=[],
+        screenshot_path=None,
+        message="",
+        timings=timings or {}
+    )
+
+
+def test_app_report_writes_typed_parquet_with_same_summary(tmp_path):
+    """Test that the columnar summary matches the list-based one"""
+    results = [
+        make_result("A", True, timings={"navigate": 1200.0, "detect": 80.0}),
+        make_result("B", False, timings={"navigate": 3400.0}),
+        make_result("C", False, audit_status="skipped"),
+        make_result("D", False, audit_status="failed"),
+    ]
+    generator = ReportGenerator(str(tmp_path))
+    plain = json.loads(open(generator.generate(results, "plain.json"), encoding="utf-8").read())
+    columnar = json.loads(open(generator.generate(results, "col.json", columnar="parquet"), encoding="utf-8").read())
+
+    table = pq.read_table(tmp_path / "col.parquet")
+
+    for key in plain["summary"]:
+        assert columnar["summary"][key] == plain["summary"][key]
+    assert columnar["summary"]["timings_ms"]["navigate"]["max"] == 3400.0
+    assert columnar["audit_metadata"]["columnar_file"] == "col.parquet"
+    assert table.schema.field("confidence").type == pa.float32()
+    assert table.schema.field("timing_detect_ms").type == pa.float32()
+    assert table["timing_detect_ms"].null_count == 3
+    assert pa.types.is_dictionary(table.schema.field("status").type)
+
+
+def test_auditor_report_writes_arrow_ipc(tmp_path):
+    """Test that check results export klarna_index as a nullable integer"""
+    results = [
+        CheckResult("PDP_OSM", "PASS", Evidence(), "2026-10-18T02:00:00Z", duration_ms=900.0),
+        CheckResult("CHECKOUT_PAYMENT_POSITION", "FAIL", Evidence(), "2026-10-18T02:01:00Z",
+                    klarna_index=None, duration_ms=4000.0),
+        CheckResult("CHECKOUT_PAYMENT_POSITION", "PASS", Evidence(), "2026-10-18T02:02:00Z",
+                    klarna_index=2, duration_ms=3000.0),
+    ]
+    report_path = CheckReportGenerator(str(tmp_path), "humac.dk").generate(results, columnar="arrow")
+    report = json.loads(open(report_path, encoding="utf-8").read())
+
+    table = feather.read_table(tmp_path / "humac.dk" / "report.arrow")
+
+    assert report["summary"]["passed"] == 2 and report["summary"]["failed"] == 1
+    assert table["klarna_index"].to_pylist() == [None, None, 2]
+    assert table.schema.field("klarna_index").type == pa.int16()
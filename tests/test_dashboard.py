@@ -0,0 +1,58 @@
+"""
+Test for the static HTML dashboard
+"""
+import json
+from app.report.dashboard import build_dashboard
+
+
+def write_report(path, count, screenshot_dir):
+    records = []
+    for i in range(count):
+        screenshot = screenshot_dir / f"M{i}.png"
+        screenshot.write_bytes(b"png")
+        records.append({
+            "merchant_id": f"M{i}",
+            "rule_id": "FOOTER_KLARNA_LOGO",
+            "audit_status": "completed",
+            "status": "passed" if i % 3 else "failed",
+            "evidence": {"screenshot_path": str(screenshot), "matched_selectors": ["keyword:klarna"]},
+            "error": None
+        })
+    path.write_text(json.dumps({"audit_metadata": {"audit_id": "A"}, "merchants": records}), encoding="utf-8")
+    return str(path)
+
+
+def load_js(path, prefix):
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith(prefix) and text.endswith(");\n")
+    return json.loads(text[len(prefix):-3])
+
+
+def test_dashboard_is_sharded_and_references_evidence(tmp_path):
+    """Test that rows are split into shards and screenshots are linked, not inlined"""
+    screenshots = tmp_path / "screenshots"
+    screenshots.mkdir()
+    report = write_report(tmp_path / "audit.json", 25, screenshots)
+    out = tmp_path / "dashboard"
+
+    index_path = build_dashboard([report], str(out), shard_size=10, thumbnails=False)
+
+    index = load_js(out / "data" / "index.js", "window.dashboardIndex(")
+    last_shard = load_js(out / "data" / "shard_00002.js", "window.dashboardShard(2, ")
+    assert index["total"] == 25 and index["shards"] == 3
+    assert index["counts"] == {"FOOTER_KLARNA_LOGO": {"FAIL": 9, "PASS": 16}}
+    assert len(last_shard) == 5
+    assert last_shard[0]["o"] == "../screenshots/M20.png"
+    assert "t" not in last_shard[0]
+    assert "data/index.js" in open(index_path, encoding="utf-8").read()
+
+
+def test_rebuild_removes_stale_shards(tmp_path):
+    """Test that a smaller rebuild does not leave old shards behind"""
+    screenshots = tmp_path / "screenshots"
+    screenshots.mkdir()
+    out = tmp_path / "dashboard"
+    build_dashboard([write_report(tmp_path / "big.json", 30, screenshots)], str(out), shard_size=10, thumbnails=False)
+    build_dashboard([write_report(tmp_path / "small.json", 5, screenshots)], str(out), shard_size=10, thumbnails=False)
+
+    assert sorted(p.name for p in (out / "data").glob("shard_*.js")) == ["shard_00000.js"]
@@ -0,0 +1,111 @@
+"""
+Test for the run-to-run report diff
+"""
+import json
+from app.report import diff as diff_module
+from app.report.__main__ import main
+from app.report.diff import diff_reports, iter_report_records
+
+
+def write_app_report(path, records):
+    report = {
+        "audit_metadata": {"audit_id": "AUDIT_1", "timestamp": "2026-10-01T00:00:00Z"},
+        "summary": {"total_merchants_audited": len(records)},
+        "merchants": records
+    }
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return str(path)
+
+
+def app_record(merchant_id, passed, selectors, screenshot="s.png"):
+    return {
+        "merchant_id": merchant_id,
+        "rule_id": "FOOTER_KLARNA_LOGO",
+        "audit_status": "completed",
+        "status": "passed" if passed else "failed",
+        "evidence": {"screenshot_path": screenshot, "matched_selectors": selectors}
+    }
+
+
+def test_stream_reader_handles_chunk_boundaries(tmp_path, monkeypatch):
+    """Test that records split across read chunks decode correctly"""
+    monkeypatch.setattr(diff_module, "CHUNK_SIZE", 7)
+    path = write_app_report(tmp_path / "r.json", [app_record(f"M{i}", True, ["keyword:klarna"]) for i in range(50)])
+
+    records = list(iter_report_records(path))
+
+    assert [m for m, _, _ in records] == [f"M{i}" for i in range(50)]
+
+
+def test_diff_reports_only_meaningful_changes(tmp_path):
+    """Test that status/evidence changes are reported and screenshot paths ignored"""
+    old = write_app_report(tmp_path / "old.json", [
+        app_record("same", True, ["keyword:klarna"], "old.png"),
+        app_record("lost", True, ["keyword:klarna"]),
+        app_record("evidence", True, ["keyword:klarna"]),
+        app_record("gone", True, []),
+    ])
+    new = write_app_report(tmp_path / "new.json", [
+        app_record("same", True, ["keyword:klarna"], "new.png"),
+        app_record("lost", False, []),
+        app_record("evidence", True, ["img:alt=Klarna"]),
+        app_record("fresh", False, []),
+    ])
+
+    changes = {c["merchant_id"]: c for c in diff_reports(old, new)}
+
+    assert set(changes) == {"lost", "evidence", "fresh", "gone"}
+    assert changes["lost"]["fields"] == ["status", "evidence"]
+    assert changes["lost"]["old"]["status"] == "PASS" and changes["lost"]["new"]["status"] == "FAIL"
+    assert changes["evidence"]["new"]["evidence"] == {"matched_selectors": ["img:alt=Klarna"]}
+    assert changes["fresh"]["change"] == "added"
+    assert changes["gone"]["change"] == "removed"
+
+
+def test_diff_ignores_run_timestamps_in_app_reports(tmp_path):
+    """Test that identical app.run results with new timestamps produce no changes"""
+    def record(timestamp):
+        return {
+            "merchant_id": "M1",
+            "rule_id": "FOOTER_KLARNA_LOGO",
+            "audit_status": "completed",
+            "audit_timestamp": timestamp,
+            "status": "passed",
+            "evidence": {
+                "screenshot_path": f"screenshots/M1_{timestamp}.png",
+                "matched_selectors": ["keyword:klarna"],
+                "url": "https://shop.dk",
+                "timestamp": timestamp
+            }
+        }
+
+    old = write_app_report(tmp_path / "old.json", [record("2026-10-01T00:00:00Z")])
+    new = write_app_report(tmp_path / "new.json", [record("2026-10-08T00:00:00Z")])
+
+    assert list(diff_reports(old, new)) == []
+
+
+def test_diff_cli_compares_auditor_reports(tmp_path):
+    """Test that auditor reports diff on klarna_index and write a changes file"""
+    def auditor_report(path, index):
+        path.write_text(json.dumps({
+            "merchant": "humac.dk",
+            "run_id": "1",
+            "results": [{
+                "check_id": "CHECKOUT_PAYMENT_POSITION",
+                "status": "PASS",
+                "evidence": {"matched_text": "Payment method"},
+                "payment_methods": ["Kort", "Klarna"],
+                "klarna_index": index
+            }],
+            "summary": {"total": 1}
+        }), encoding="utf-8")
+        return str(path)
+
+    out = tmp_path / "changes.jsonl"
+    code = main(["diff", auditor_report(tmp_path / "a.json", 2), auditor_report(tmp_path / "b.json", 1),
+                 "--out", str(out), "--fail-on-change"])
+
+    change = json.loads(out.read_text(encoding="utf-8"))
+    assert code == 1
+    assert (change["merchant_id"], change["fields"]) == ("humac.dk", ["klarna_index"])
@@ -0,0 +1,67 @@
+"""
+Test for compressed DOM evidence snippets
+"""
+import pytest
+from auditor.evidence_store import EvidenceStore
+from auditor.report import CheckResult, Evidence, ReportGenerator
+from auditor.utils import ELEMENT_EVIDENCE_SCRIPT, MAX_SNIPPET_CHARS, get_element_snippet_and_path
+
+
+class FakeElement:
+    """Element answering the evidence script in one evaluation"""
+
+    def __init__(self, html):
+        self.html = html
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append((script, arg))
+        return {
+            "snippet": self.html, "context": f"<a href='/klarna'>{self.html}</a>",
+            "xpath": "/html/body/footer[1]/a[1]/img[1]", "css_path": "footer > a > img",
+            "bbox": {"x": 10, "y": 900, "width": 80, "height": 24},
+        }
+
+
+def test_snippets_stored_once_per_content(tmp_path):
+    """Test that identical snippets share one compressed file"""
+    store = EvidenceStore(str(tmp_path), codec="gzip")
+    html = "<footer>" + "<img alt='Klarna' src='/klarna.svg'>" * 200 + "</footer>"
+
+    ref = store.put(html)
+
+    assert store.put(html) == ref
+    files = list(tmp_path.rglob("*.html.gz"))
+    assert len(files) == 1 and files[0].stat().st_size < len(html) / 10
+    assert store.get(ref) == html
+    assert store.get("0" * 64) is None
+    with pytest.raises(ValueError):
+        EvidenceStore(str(tmp_path), codec="brotli")
+
+
+@pytest.mark.asyncio
+async def test_element_evidence_in_one_evaluation(tmp_path):
+    """Test that snippet, paths and box come from one call and the context is stored"""
+    store = EvidenceStore(str(tmp_path), codec="gzip")
+    element = FakeElement("<img alt='Klarna'>")
+
+    info = await get_element_snippet_and_path(None, element, store)
+
+    assert element.calls == [(ELEMENT_EVIDENCE_SCRIPT, MAX_SNIPPET_CHARS)]
+    assert info["path"] == "footer > a > img"
+    assert info["bbox"]["y"] == 900
+    assert store.get(info["snippet_ref"]) == "<a href='/klarna'><img alt='Klarna'></a>"
+
+
+def test_report_references_snippet(tmp_path):
+    """Test that the report carries the snippet reference, not the HTML"""
+    result = CheckResult(
+        check_id="FOOTER_KLARNA_LOGO",
+        status="PASS",
+        evidence=Evidence(matched_selector="footer > a > img", snippet_ref="ab" * 32),
+        timestamp="2025-01-01T00:00:00Z"
+    )
+
+    formatted = ReportGenerator(str(tmp_path), "shop.dk")._format_result(result)
+
+    assert formatted["evidence"]["snippet_ref"] == "ab" * 32
@@ -0,0 +1,38 @@
+"""
+Test for the benchmark fixture server
+"""
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import pytest
+from benchmarks.server import FixtureServer
+
+
+@pytest.fixture
+def server():
+    """Running fixture server"""
+    with FixtureServer() as fixture_server:
+        yield fixture_server
+
+
+def test_fixture_server_serves_site_with_base_href(server):
+    """Test that HTML pages resolve relative links against the site root"""
+    html = urlopen(server.site_url("klarna_shop") + "cart").read().decode("utf-8")
+
+    assert '<base href="/klarna_shop/">' in html
+    assert "Kurven er tom" in html
+
+
+def test_fixture_server_injects_variants(server):
+    """Test that variants are injected into HTML responses"""
+    html = urlopen(server.site_url("klarna_shop", "cookie_banner", "slow_scripts")).read().decode("utf-8")
+
+    assert 'id="cookie-accept"' in html
+    assert '/_slow.js?ms=' in html
+
+
+def test_fixture_server_rejects_unknown_sites_and_variants(server):
+    """Test that unknown sites, variants and path traversal return 404"""
+    for path in ["/unknown_shop/", "/klarna_shop--unknown/", "/klarna_shop/../../README.md"]:
+        with pytest.raises(HTTPError) as exc_info:
+            urlopen(server.base_url + path)
+        assert exc_info.value.code == 404
@@ -0,0 +1,94 @@
+"""
+Test for the failure-only flight recorder
+"""
+import base64
+import zipfile
+import pytest
+from auditor.flight_recorder import FlightRecorder
+
+
+class FakeTracing:
+    def __init__(self):
+        self.calls = []
+
+    async def start(self, **kwargs):
+        self.calls.append("start")
+
+    async def start_chunk(self, title=None):
+        self.calls.append(f"start_chunk:{title}")
+
+    async def stop_chunk(self, path=None):
+        self.calls.append(f"stop_chunk:{'saved' if path else 'discarded'}")
+        if path:
+            with open(path, "wb") as f:
+                f.write(b"trace")
+
+    async def stop(self):
+        self.calls.append("stop")
+
+
+class FakeCDPSession:
+    def __init__(self):
+        self.handlers = {}
+        self.sent = []
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def send(self, method, params=None):
+        self.sent.append(method)
+
+    async def detach(self):
+        pass
+
+    def emit_frames(self, count):
+        for i in range(count):
+            data = base64.b64encode(f"jpeg{i}".encode()).decode()
+            self.handlers["Page.screencastFrame"]({"data": data, "sessionId": i})
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+        self.cdp = FakeCDPSession()
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+
+@pytest.mark.asyncio
+async def test_passing_check_discards_recording(tmp_path):
+    """Test that a fast passing check writes nothing"""
+    context = FakeContext()
+    recorder = FlightRecorder(str(tmp_path / "flight"), budget_ms=1000)
+    await recorder.attach(context)
+
+    await recorder.start(page=None, check_id="CART_KLARNA")
+    context.cdp.emit_frames(5)
+    artifacts = await recorder.finish("PASS", duration_ms=200)
+
+    assert artifacts == {}
+    assert context.tracing.calls == ["start", "start_chunk:CART_KLARNA", "stop_chunk:discarded"]
+    assert not (tmp_path / "flight").exists()
+    assert recorder.summary()["discarded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_or_slow_check_keeps_last_frames(tmp_path):
+    """Test that failures and budget overruns persist the trace and the newest frames"""
+    context = FakeContext()
+    recorder = FlightRecorder(str(tmp_path), budget_ms=1000, max_frames=3)
+    await recorder.attach(context)
+
+    await recorder.start(page=None, check_id="CART_KLARNA")
+    context.cdp.emit_frames(10)
+    artifacts = await recorder.finish("FAIL", duration_ms=200)
+
+    assert set(artifacts) == {"trace", "screencast"}
+    with zipfile.ZipFile(artifacts["screencast"]) as archive:
+        assert [archive.read(n) for n in archive.namelist()] == [b"jpeg7", b"jpeg8", b"jpeg9"]
+    assert context.cdp.sent.count("Page.screencastFrameAck") == 10
+
+    await recorder.start(page=None, check_id="PDP_OSM")
+    assert "trace" in await recorder.finish("PASS", duration_ms=5000)
+    assert recorder.summary()["kept"] == 2
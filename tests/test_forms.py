@@ -0,0 +1,84 @@
+"""
+Test for checkout form discovery and batched filling
+"""
+import pytest
+from auditor.forms import FORM_FILL_SCRIPT, FORM_SCAN_SCRIPT, fill_forms, has_address_form, match_fields, scan_forms
+
+
+def control(index, name="", id="", autocomplete="", type="text", label="", placeholder="", tag="input", filled=False):
+    return {
+        "index": index, "tag": tag, "type": type, "name": name, "id": id, "autocomplete": autocomplete,
+        "placeholder": placeholder, "aria_label": "", "label": label, "filled": filled
+    }
+
+
+class FakeFrame:
+    """Frame returning a canned scan and recording fill batches"""
+
+    def __init__(self, inputs, url="https://shop.dk/checkout"):
+        self.inputs = inputs
+        self.url = url
+        self.batches = []
+        self.scanned = False
+
+    async def evaluate(self, script, arg=None):
+        if script == FORM_SCAN_SCRIPT:
+            self.scanned = True
+            return {"lang": "da", "locale": "en-US", "inputs": self.inputs}
+        assert script == FORM_FILL_SCRIPT
+        self.batches.append(arg)
+        return [index for index, _ in arg]
+
+
+class FakePage:
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.main_frame = frames[0]
+        self.url = frames[0].url
+
+
+def test_match_fields_uses_all_hints():
+    """Test that autocomplete, name/id, type and label text each identify a field"""
+    controls = [
+        control(0, name="billing[firstName]"),
+        control(1, id="checkout-lastname"),
+        control(2, name="contact", type="email"),
+        control(3, autocomplete="shipping tel"),
+        control(4, name="address1"),
+        control(5, name="address2", label="Apartment, suite"),
+        control(6, name="field_7", label="Postnummer"),
+        control(7, name="city"),
+        control(8, name="company", label="Company name"),
+        control(9, name="country", tag="select", type="select"),
+    ]
+
+    assert match_fields(controls) == {
+        0: "first_name", 1: "last_name", 2: "email", 3: "phone", 4: "street",
+        6: "postal_code", 7: "city", 9: "country"
+    }
+
+
+def test_email_address_is_not_a_street():
+    """Test that an "Email address" label does not match the street field"""
+    assert match_fields([control(0, name="login", label="Email address")]) == {0: "email"}
+    assert not has_address_form([(None, {"inputs": [control(0, name="q", label="Search")]})])
+
+
+@pytest.mark.asyncio
+async def test_all_frames_filled_in_one_batch_each():
+    """Test that every frame is scanned once and filled with one evaluation"""
+    main = FakeFrame([control(0, name="email", type="email"), control(1, name="zip", filled=True)])
+    iframe = FakeFrame([control(0, autocomplete="street-address"), control(1, autocomplete="address-level2")],
+                       url="https://checkoutshopper-live.adyen.com/checkoutshopper/securedfields.html")
+    chat = FakeFrame([control(0, name="email", type="email")], url="https://widget.intercom.io/frame")
+    page = FakePage(main, FakeFrame([]), iframe, chat)
+
+    scans = await scan_forms(page)
+    filled = await fill_forms(scans, {"email": "a@b.dk", "postal_code": "1556", "street": "Dantes Plads 7", "city": ""})
+
+    assert [frame for frame, _ in scans] == [main, iframe]
+    assert not chat.scanned
+    assert has_address_form(scans)
+    assert main.batches == [[[0, "a@b.dk"]]]
+    assert iframe.batches == [[[0, "Dantes Plads 7"]]]
+    assert filled == {"email": 1, "street": 1}
@@ -0,0 +1,76 @@
+"""
+Test for origin-filtered, concurrent frame scanning
+"""
+import asyncio
+import time
+import pytest
+from auditor.utils import find_element_in_frames, is_scannable_frame, scan_frames
+
+
+class FakeElement:
+    def __init__(self):
+        self.disposed = False
+
+    async def dispose(self):
+        self.disposed = True
+
+
+class FakeFrame:
+    def __init__(self, url, delay=0.0, element=None):
+        self.url = url
+        self.delay = delay
+        self.element = element
+        self.queried = False
+
+    async def query_selector(self, selector):
+        self.queried = True
+        await asyncio.sleep(self.delay)
+        return self.element
+
+
+class FakePage(FakeFrame):
+    def __init__(self, *child_frames):
+        super().__init__("https://www.shop.dk/product/1")
+        self.main_frame = self
+        self.frames = [self] + list(child_frames)
+
+
+def test_is_scannable_frame():
+    """Test that only Klarna and first-party frames are scanned"""
+    page_url = "https://www.shop.dk/product/1"
+
+    assert is_scannable_frame("https://x.klarnaservices.com/osm", page_url)
+    assert is_scannable_frame("https://js.klarna.com/web-sdk/placement", page_url)
+    assert is_scannable_frame("https://static.shop.dk/widget.html", page_url)
+    assert not is_scannable_frame("https://tpc.googlesyndication.com/ad", page_url)
+    assert not is_scannable_frame("https://www.shop.dk/recaptcha/anchor", page_url)
+    assert not is_scannable_frame("about:blank", page_url)
+
+
+@pytest.mark.asyncio
+async def test_slow_frames_share_one_deadline():
+    """Test that frames are scanned concurrently and slow ones are cut off at the deadline"""
+    slow = [FakeFrame(f"https://www.shop.dk/slow/{i}", delay=5) for i in range(3)]
+    fast = FakeFrame("https://js.klarna.com/osm", element=FakeElement())
+    ad = FakeFrame("https://ads.example.net/banner")
+    page = FakePage(*slow, fast, ad)
+
+    started = time.perf_counter()
+    found = await scan_frames(page, lambda frame: frame.query_selector("klarna-placement"), timeout=0.2)
+
+    assert time.perf_counter() - started < 1
+    assert found == [(fast, fast.element)]
+    assert all(frame.queried for frame in slow) and not ad.queried
+
+
+@pytest.mark.asyncio
+async def test_find_element_in_frames_keeps_first_match():
+    """Test that the first frame in page order wins and other handles are disposed"""
+    first = FakeFrame("https://www.shop.dk/a", delay=0.05, element=FakeElement())
+    second = FakeFrame("https://js.klarna.com/b", element=FakeElement())
+    page = FakePage(first, second)
+
+    element, frame = await find_element_in_frames(page, "footer")
+
+    assert (element, frame) == (first.element, first)
+    assert second.element.disposed and not first.element.disposed
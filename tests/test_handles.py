@@ -0,0 +1,58 @@
+"""
+Test for handle disposal and memory watermarks
+"""
+import pytest
+from app.utils.handles import HandleArena
+from app.utils.memory import MemoryWatermark
+
+
+class FakeHandle:
+    def __init__(self, fail=False):
+        self.disposed = False
+        self.fail = fail
+
+    async def dispose(self):
+        if self.fail:
+            raise RuntimeError("Target closed")
+        self.disposed = True
+
+
+class FakePage:
+    def __init__(self, heap_bytes):
+        self.heap_bytes = heap_bytes
+
+    async def evaluate(self, script):
+        return self.heap_bytes
+
+
+@pytest.mark.asyncio
+async def test_arena_disposes_tracked_handles():
+    """Test that all tracked handles are disposed, even if one fails"""
+    single, kept = FakeHandle(), FakeHandle()
+    listed = [FakeHandle(), FakeHandle(fail=True), FakeHandle()]
+
+    async with HandleArena() as arena:
+        assert arena.track(single) is single
+        arena.track(listed)
+        arena.track(None)
+        arena.track(kept)
+        arena.release(kept)
+        assert len(arena) == 4
+
+    assert single.disposed
+    assert [h.disposed for h in listed] == [True, False, True]
+    assert not kept.disposed
+
+
+@pytest.mark.asyncio
+async def test_watermark_reports_pages_over_limit():
+    """Test that heap samples above the limit request a recycle"""
+    watermark = MemoryWatermark(limit_mb=100)
+
+    assert not await watermark.check(FakePage(50 * 1024 * 1024), "PDP_OSM")
+    assert await watermark.check(FakePage(150 * 1024 * 1024), "CART_KLARNA")
+    assert not await watermark.check(FakePage(None), "CHECKOUT_PAYMENT_POSITION")
+
+    summary = watermark.summary()
+    assert summary["peak_mb"] == 150.0
+    assert summary["by_label"] == {"PDP_OSM": 50.0, "CART_KLARNA": 150.0}
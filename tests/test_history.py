@@ -0,0 +1,69 @@
+"""
+Test for the SQLite audit history store
+"""
+import json
+from app.report.history import HistoryStore, main
+from app.report.report_generator import AuditResult, ReportGenerator
+from auditor.report import CheckResult, Evidence, ReportGenerator as CheckReportGenerator
+
+
+def make_result(merchant_id, passed, day, audit_status="completed"):
+    return AuditResult(
+        merchant_id=merchant_id,
+        merchant_name=merchant_id,
+        base_url=f"https://{merchant_id}.dk",
+        audit_status=audit_status,
+        audit_timestamp=f"2026-10-{day:02d}T02:00:00Z",
+        rule_id="FOOTER_KLARNA_LOGO",
+        rule_description="Detect Klarna logo in footer",
+        passed=passed,
+        confidence=0.95 if passed else 0.0,
+        matched_selectors=[],
+        screenshot_path=None,
+        message=""
+    )
+
+
+def test_history_answers_latest_regressions_and_trend(tmp_path):
+    """Test that imported runs can be queried across runs"""
+    generator = ReportGenerator(str(tmp_path))
+    first = generator.generate([make_result("shop_a", True, 1), make_result("shop_b", True, 1)], "run1.json")
+    second = generator.generate(
+        [make_result("shop_a", False, 8), make_result("shop_b", False, 8, audit_status="failed")], "run2.json"
+    )
+
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        # The generator's audit_id has second resolution; give each run its own ID
+        for index, path in enumerate([first, second]):
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            report["audit_metadata"]["audit_id"] = f"RUN_{index}"
+            store.record_report(report)
+
+        latest = {r["merchant_id"]: r["status"] for r in store.latest(rule_id="FOOTER_KLARNA_LOGO")}
+        regressions = store.regressions(since="2026-10-05")
+        trend = [(r["day"], r["passed"], r["total"]) for r in store.trend()]
+
+    assert latest == {"shop_a": "FAIL", "shop_b": "ERROR"}
+    assert [(r["merchant_id"], r["previous_status"], r["status"]) for r in regressions] == [
+        ("shop_a", "PASS", "FAIL"), ("shop_b", "PASS", "ERROR")
+    ]
+    assert trend == [("2026-10-01", 2, 2), ("2026-10-08", 0, 2)]
+
+
+def test_history_imports_auditor_reports_idempotently(tmp_path, capsys):
+    """Test that auditor reports import through the CLI and re-imports replace the run"""
+    results = [
+        CheckResult("PDP_OSM", "PASS", Evidence(matched_text="Klarna"), "2026-10-01T02:00:00Z"),
+        CheckResult("CHECKOUT_PAYMENT_POSITION", "FAIL", Evidence(), "2026-10-01T02:01:00Z", klarna_index=None),
+    ]
+    report_path = CheckReportGenerator(str(tmp_path), "humac.dk").generate(results)
+    db = str(tmp_path / "history.sqlite")
+
+    assert main(["--db", db, "import", report_path, report_path]) == 0
+    assert main(["--db", db, "latest", "--status", "FAIL"]) == 0
+
+    output = capsys.readouterr().out
+    assert "CHECKOUT_PAYMENT_POSITION" in output.splitlines()[-1]
+    with HistoryStore(db) as store:
+        assert len(store.history(merchant_id="humac.dk")) == 2
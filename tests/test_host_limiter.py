@@ -0,0 +1,134 @@
+"""
+Test for per-host rate limiting and circuit breaking
+"""
+import asyncio
+import pytest
+from app.core.browser import BrowserManager
+from app.core.host_limiter import HostLimiter
+from app.core.retry import CircuitOpenError, FailureKind, classify_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_host():
+    """Test that navigations to one host are capped while other hosts proceed"""
+    limiter = HostLimiter(max_concurrent=2, rate=1000, burst=100)
+    active = {"shop.dk": 0, "other.dk": 0}
+    peak = {"shop.dk": 0, "other.dk": 0}
+
+    async def navigate(url, host):
+        async with limiter.slot(url):
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    await asyncio.gather(
+        *[navigate(f"https://www.shop.dk/p{i}", "shop.dk") for i in range(6)],
+        *[navigate(f"https://other.dk/p{i}", "other.dk") for i in range(3)]
+    )
+
+    assert peak == {"shop.dk": 2, "other.dk": 2}
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_timeouts_and_probes_after_cooldown():
+    """Test that repeated timeouts fast-fail a host until the cool-down passes"""
+    clock = FakeClock()
+    limiter = HostLimiter(rate=1000, burst=100, failure_threshold=2, cooldown=60, clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            async with limiter.slot("https://slow.dk/"):
+                raise TimeoutError()
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        async with limiter.slot("https://slow.dk/cart"):
+            pass
+    assert classify_error(exc_info.value) == FailureKind.PERMANENT
+
+    # Other hosts are unaffected
+    async with limiter.slot("https://fast.dk/"):
+        pass
+
+    clock.now = 61
+    async with limiter.slot("https://slow.dk/"):
+        pass
+    assert limiter.summary() == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_block_the_host():
+    """Test that cancelling the half-open probe lets a later request probe again"""
+    clock = FakeClock()
+    limiter = HostLimiter(rate=1000, burst=100, failure_threshold=1, cooldown=60, clock=clock)
+    with pytest.raises(TimeoutError):
+        async with limiter.slot("https://slow.dk/"):
+            raise TimeoutError()
+
+    clock.now = 61
+    entered = asyncio.Event()
+
+    async def probe():
+        async with limiter.slot("https://slow.dk/"):
+            entered.set()
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(probe())
+    await entered.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    async with limiter.slot("https://slow.dk/"):
+        pass
+    assert limiter.summary() == {}
+
+
+@pytest.mark.asyncio
+async def test_waiting_requests_fail_fast_once_the_circuit_opens():
+    """Test that requests queued for a slot re-check the circuit after waiting"""
+    limiter = HostLimiter(max_concurrent=1, rate=1000, burst=100, failure_threshold=1, cooldown=60)
+
+    async def navigate(fail):
+        async with limiter.slot("https://slow.dk/"):
+            await asyncio.sleep(0.01)
+            if fail:
+                raise TimeoutError()
+
+    outcomes = await asyncio.gather(navigate(True), navigate(False), return_exceptions=True)
+
+    assert isinstance(outcomes[0], TimeoutError)
+    assert isinstance(outcomes[1], CircuitOpenError)
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+
+class FakePage:
+    async def goto(self, url, wait_until=None, timeout=None):
+        return FakeResponse()
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_goto_latency_excludes_limiter_wait():
+    """Test that time spent queued behind the host limiter is not recorded as page latency"""
+    browser = BrowserManager(limiter=HostLimiter(rate=5, burst=1))
+    browser.page = FakePage()
+
+    assert await browser.navigate("https://shop.dk/", wait_time=0)
+    assert await browser.navigate("https://shop.dk/cart", wait_time=0)  # waits ~200 ms for a token
+
+    assert browser.last_goto_ms is not None and browser.last_goto_ms < 100
@@ -0,0 +1,63 @@
+"""
+Test for runtime instrumentation (RPC counter, event-loop lag monitor)
+"""
+import asyncio
+import time
+import pytest
+from app.utils.metrics import RpcCounter, EventLoopLagMonitor
+
+
+def test_rpc_counter_attributes_calls_to_scopes():
+    """Test that protocol calls are counted per merchant and per check"""
+    counter = RpcCounter()
+
+    with counter.scope(merchant="MERCHANT_001"):
+        with counter.scope(check="FOOTER_KLARNA_LOGO"):
+            counter.record("querySelectorAll")
+            counter.record("getAttribute")
+            counter.record("getAttribute")
+        with counter.scope(check="PDP_OSM"):
+            counter.record("textContent")
+    counter.record("close")
+
+    summary = counter.summary()
+
+    assert summary["total_calls"] == 5
+    assert summary["by_merchant"] == {"MERCHANT_001": 4, "unscoped": 1}
+    assert summary["by_check"]["FOOTER_KLARNA_LOGO"] == 3
+    assert summary["by_check"]["PDP_OSM"] == 1
+    assert summary["top_methods"]["getAttribute"] == 2
+    assert counter.total(merchant="MERCHANT_001", check="PDP_OSM") == 1
+
+
+@pytest.mark.asyncio
+async def test_rpc_counter_scopes_are_isolated_between_tasks():
+    """Test that concurrent audits do not leak their scope into each other"""
+    counter = RpcCounter()
+
+    async def audit(merchant_id, calls):
+        with counter.scope(merchant=merchant_id):
+            for _ in range(calls):
+                counter.record("evaluateExpression")
+                await asyncio.sleep(0)
+
+    await asyncio.gather(audit("A", 3), audit("B", 5))
+
+    assert counter.total(merchant="A") == 3
+    assert counter.total(merchant="B") == 5
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor_detects_blocking_call():
+    """Test that a blocking call shows up as event-loop lag"""
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)  # Block the loop
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    summary = monitor.summary()
+
+    assert summary["samples"] > 0
+    assert summary["max_ms"] >= 50
@@ -0,0 +1,35 @@
+"""
+Test for the bounded page source view
+"""
+from app.detectors.page_source import PageSourceView
+
+
+def test_small_page_is_kept_whole_and_lower_cased():
+    """Test that pages within the cap are searched in full"""
+    view = PageSourceView.from_html("<HTML><Footer>Powered by KLARNA</Footer></HTML>", cap=100)
+
+    assert "powered by klarna" in view
+    assert not view.truncated
+    assert view.tail == ""
+
+
+def test_large_page_keeps_head_and_tail_only():
+    """Test that large pages are capped to head and tail"""
+    html = "<head>Klarna-Config</head>" + "x" * 10000 + "MIDDLE" + "y" * 10000 + "<footer>Footer</footer>"
+
+    view = PageSourceView.from_html(html, cap=1000)
+
+    assert len(view.head) + len(view.tail) == 2000
+    assert view.length == len(html)
+    assert view.truncated
+    assert "klarna-config" in view
+    assert "<footer>footer</footer>" in view
+    assert "middle" not in view
+
+
+def test_coerce_reuses_existing_view():
+    """Test that a view passed to a detector is not rebuilt"""
+    view = PageSourceView.from_html("<p>Klarna</p>")
+
+    assert PageSourceView.coerce(view) is view
+    assert "klarna" in PageSourceView.coerce("<p>Klarna</p>")
@@ -0,0 +1,90 @@
+"""
+Test for payment method extraction across frames
+"""
+import pytest
+from auditor.payment_methods import PAYMENT_OPTIONS_SCRIPT, PaymentOption, snapshot_payment_methods, visual_order
+
+
+def option(text, x, y, visible=True):
+    return {"text": text, "x": x, "y": y, "width": 200, "height": 40, "visible": visible}
+
+
+class FakeElement:
+    def __init__(self, box):
+        self.box = box
+        self.disposed = False
+
+    async def bounding_box(self):
+        return self.box
+
+    async def dispose(self):
+        self.disposed = True
+
+
+class FakeFrame:
+    """Frame returning a canned snapshot, placed at an offset in the page"""
+
+    def __init__(self, options, url="https://shop.dk/checkout", offset=None, fallback=(), scroll=(0, 0)):
+        self.snapshot = {"options": options, "fallback": list(fallback), "scroll": list(scroll)}
+        self.url = url
+        self.element = FakeElement(offset)
+        self.calls = 0
+
+    async def evaluate(self, script, arg):
+        assert script == PAYMENT_OPTIONS_SCRIPT
+        self.calls += 1
+        return self.snapshot
+
+    async def frame_element(self):
+        return self.element
+
+
+class FakePage:
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.main_frame = frames[0]
+        self.url = frames[0].url
+
+
+@pytest.mark.asyncio
+async def test_options_merged_in_visual_order():
+    """Test that options of a PSP iframe are placed by the iframe's position"""
+    main = FakeFrame([option("Gift card", 20, 600), option("Hidden", 20, 10, visible=False)], scroll=(0, 100))
+    psp = FakeFrame([option("Card", 0, 0), option("Klarna", 0, 50)], url="https://checkoutshopper-live.adyen.com/",
+                    offset={"x": 20, "y": 300, "width": 400, "height": 120})
+    chat = FakeFrame([option("Chat", 0, 0)], url="https://widget.intercom.io/chat",
+                     offset={"x": 0, "y": 0, "width": 100, "height": 100})
+    page = FakePage(main, psp, chat)
+
+    snapshot = await snapshot_payment_methods(page)
+
+    assert snapshot.labels == ["Card", "Klarna", "Gift card"]
+    assert snapshot.options[1].frame_url == "https://checkoutshopper-live.adyen.com/"
+    assert (main.calls, psp.calls, chat.calls) == (1, 1, 0)
+    assert psp.element.disposed
+    assert snapshot.clip() == {"x": 4, "y": 384, "width": 232, "height": 372}
+
+
+@pytest.mark.asyncio
+async def test_fallback_keywords_and_unrendered_frames():
+    """Test keyword fallback and that options of an unrendered frame are dropped"""
+    main = FakeFrame([], fallback=["klarna", "visa"])
+    hidden = FakeFrame([option("Klarna", 0, 0)], url="https://js.stripe.com/", offset=None)
+    page = FakePage(main, hidden)
+
+    snapshot = await snapshot_payment_methods(page)
+
+    assert snapshot.options == []
+    assert snapshot.labels == ["Klarna", "Visa"]
+    assert snapshot.clip() is None
+
+
+def test_visual_order_groups_rows_by_gap():
+    """Test that options a pixel apart share a row even across a rounding boundary"""
+    options = [
+        PaymentOption("Right", 300, 101.9, 100, 40, True),
+        PaymentOption("Left", 20, 102.1, 100, 40, True),
+        PaymentOption("Below", 20, 160, 100, 40, True),
+    ]
+
+    assert [o.text for o in visual_order(options)] == ["Left", "Right", "Below"]
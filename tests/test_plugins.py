@@ -0,0 +1,54 @@
+"""
+Test for the lazily imported check/detector registry
+"""
+import subprocess
+import sys
+import pytest
+from app.detectors import DETECTORS
+from app.utils.plugins import PluginRegistry, load_object
+from auditor.checks import CHECKS
+
+
+def test_manifest_ids_match_plugin_classes():
+    """Test that every registered id imports to a class with that id"""
+    for check_id in CHECKS.ids(include_external=False):
+        assert CHECKS.load(check_id).CHECK_ID == check_id
+    for rule_id in DETECTORS.ids(include_external=False):
+        assert DETECTORS.load(rule_id).RULE_ID == rule_id
+
+
+def test_select_validates_ids():
+    """Test that selections keep their order and reject unknown ids"""
+    registry = PluginRegistry({"A": "json:dumps", "B": "json:loads"})
+
+    assert registry.select(None) == ["A", "B"]
+    assert registry.select("B, A") == ["B", "A"]
+    with pytest.raises(ValueError, match="Unknown id"):
+        registry.select("A,C")
+    with pytest.raises(ValueError):
+        load_object("json.dumps")
+
+
+def test_cli_startup_does_not_import_playwright():
+    """Test that importing the CLIs and listing checks never loads Playwright"""
+    code = (
+        "import asyncio, sys\n"
+        "import app.run, auditor.run\n"
+        "sys.argv = ['auditor.run', '--list-checks']\n"
+        "asyncio.run(auditor.run.main())\n"
+        "loaded = [m for m in sys.modules if m.split('.')[0] in ('playwright', 'pyarrow')]\n"
+        "assert not loaded, loaded\n"
+        "assert 'auditor.checks.checkout_payment' not in sys.modules\n"
+        "assert 'app.detectors.footer_klarna_logo_detector' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert "PDP_OSM" in result.stdout
+
+
+def test_auditor_resolves_default_detector_through_registry():
+    """Test that the default detector is loaded from the registry when none are given"""
+    from app.core.auditor import Auditor
+
+    assert [type(d) for d in Auditor().detectors] == [DETECTORS.load("FOOTER_KLARNA_LOGO")]
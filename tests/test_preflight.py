@@ -0,0 +1,112 @@
+"""
+Test for registry preflight validation and reachability probes
+"""
+import socket
+from urllib.parse import quote
+import pytest
+from app.data import preflight as preflight_module
+from app.data.preflight import normalize_url, preflight, probe, validate_registry
+from benchmarks.server import FixtureServer
+
+HEADER = "merchant_id,merchant_name,base_url,checkout_url,product_url,cart_url,status,priority,notes\n"
+
+
+def write_registry(tmp_path, rows):
+    path = tmp_path / "merchant_registry.csv"
+    path.write_text(HEADER + "".join(row + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def closed_port_url():
+    """URL of a local port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_normalize_url():
+    """Test that equivalent base URLs normalize identically"""
+    assert normalize_url("Shop.DK/") == "https://shop.dk"
+    assert normalize_url("HTTPS://www.Shop.dk:443/#top") == "https://www.shop.dk"
+    assert normalize_url("http://shop.dk:8080/dk/") == "http://shop.dk:8080/dk/"
+    for bad in ("ftp://shop.dk", "https://", "not a url"):
+        with pytest.raises(ValueError):
+            normalize_url(bad)
+
+
+def test_validate_registry_reports_bad_rows(tmp_path):
+    """Test that malformed and duplicate rows are reported, not raised"""
+    path = write_registry(tmp_path, [
+        "M1,Shop,https://shop.dk,,,,active,8,",
+        "M2,Shop again,HTTPS://SHOP.DK/,,,,active,5,",
+        "M1,Other,https://other.dk,,,,active,5,",
+        "M3,,https://third.dk,,,,active,5,",
+        "M4,Broken,ftp://broken.dk,,,,active,5,",
+        "M5,Fine,fine.dk,,,,active,high,",
+    ])
+
+    merchants, issues = validate_registry(path)
+
+    assert [m.merchant_id for m in merchants] == ["M1", "M5"]
+    assert merchants[1].base_url == "https://fine.dk" and merchants[1].priority == 5
+    fatal = {i.row: i.problem for i in issues if i.fatal}
+    assert "duplicate base_url" in fatal[3]
+    assert "duplicate merchant_id" in fatal[4]
+    assert "missing merchant_name" in fatal[5]
+    assert "scheme" in fatal[6]
+
+
+class FlakyPool:
+    """Connection pool failing the first `failures` requests"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.requests = 0
+
+    def request(self, method, url):
+        self.requests += 1
+        if self.requests <= self.failures:
+            raise ConnectionResetError("connection reset by peer")
+        return FakeResponse()
+
+
+class FakeResponse:
+    status = 200
+
+    def getheader(self, name):
+        return None
+
+
+def test_probe_retries_network_errors_once(monkeypatch):
+    """Test that one network failure is retried and two mark the URL unreachable"""
+    monkeypatch.setattr(preflight_module, "PROBE_RETRY_DELAY", 0)
+
+    result = probe("https://shop.dk", FlakyPool(failures=1))
+    assert result.reachable and result.error is None
+
+    result = probe("https://shop.dk", FlakyPool(failures=2))
+    assert not result.reachable and result.error.startswith("ConnectionResetError")
+
+
+@pytest.mark.asyncio
+async def test_preflight_skips_unreachable_merchants(tmp_path, monkeypatch):
+    """Test probes against a local server: live, redirected, 404 and refused"""
+    monkeypatch.setattr(preflight_module, "PROBE_RETRY_DELAY", 0)
+    with FixtureServer() as server:
+        live = server.site_url("klarna_shop")
+        redirect = f"{server.base_url}/_redirect?to={quote(server.site_url('plain_shop'), safe='')}"
+        path = write_registry(tmp_path, [
+            f"LIVE,Live,{live},,,,active,5,",
+            f"MOVED,Moved,{redirect},,,,active,5,",
+            f"GONE,Gone,{server.base_url}/no_such_shop/,,,,active,5,",
+            f"DOWN,Down,{closed_port_url()},,,,active,5,",
+        ])
+
+        report = await preflight(path, concurrency=4, timeout=5)
+
+    assert [m.merchant_id for m in report.registry] == ["LIVE", "MOVED", "GONE", "DOWN"]
+    assert [m.merchant_id for m in report.merchants] == ["LIVE", "MOVED"]
+    assert {m.merchant_id: p.status for m, p in report.skipped} == {"GONE": 404, "DOWN": None}
+    moved = report.probes[report.merchants[1].base_url]
+    assert moved.status == 200 and moved.final_url.endswith("/plain_shop/")
+    assert report.to_dict()["skipped"][1]["reason"].startswith("ConnectionRefusedError")
@@ -0,0 +1,98 @@
+"""
+Test for opt-in merchant profiling
+"""
+import asyncio
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from app.utils.profiling import MerchantProfiler
+
+
+def test_profiler_selects_explicit_merchant_ids(tmp_path):
+    """Test that explicit merchant IDs override sampling"""
+    profiler = MerchantProfiler(str(tmp_path), sample_rate=0.0, merchant_ids=["MERCHANT_002"])
+
+    assert profiler.is_selected("MERCHANT_002") is True
+    assert profiler.is_selected("MERCHANT_001") is False
+
+
+def test_profiler_sampling_is_deterministic(tmp_path):
+    """Test that the same merchants are sampled on every run"""
+    profiler = MerchantProfiler(str(tmp_path), sample_rate=0.3)
+    merchant_ids = [f"MERCHANT_{i:03d}" for i in range(200)]
+
+    first = [m for m in merchant_ids if profiler.is_selected(m)]
+    second = [m for m in merchant_ids if profiler.is_selected(m)]
+
+    assert first == second
+    assert 20 < len(first) < 100
+
+
+@pytest.mark.asyncio
+async def test_profiler_saves_pstats_and_discards_fast_trace(tmp_path):
+    """Test that pstats are saved and a fast, successful trace is discarded"""
+    profiler = MerchantProfiler(str(tmp_path), trace=True, trace_threshold_ms=60000)
+    context = MagicMock()
+    context.tracing.start = AsyncMock()
+    context.tracing.stop = AsyncMock()
+
+    session = await profiler.start("MERCHANT_001", context)
+    artifacts = await profiler.finish(session, failed=False)
+
+    assert Path(artifacts["pstats"]).exists()
+    assert "trace" not in artifacts
+    context.tracing.stop.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_profiler_keeps_trace_on_failure(tmp_path):
+    """Test that a failed audit keeps its trace"""
+    profiler = MerchantProfiler(str(tmp_path), trace=True, trace_threshold_ms=60000)
+    context = MagicMock()
+    context.tracing.start = AsyncMock()
+    context.tracing.stop = AsyncMock()
+
+    session = await profiler.start("MERCHANT_001", context)
+    artifacts = await profiler.finish(session, failed=True)
+
+    assert artifacts["trace"].endswith(".zip")
+    context.tracing.stop.assert_awaited_once_with(path=artifacts["trace"])
+
+
+@pytest.mark.asyncio
+async def test_profiler_moves_trace_to_restarted_browser(tmp_path):
+    """Test that a browser restart keeps the abandoned trace and traces the new context"""
+    profiler = MerchantProfiler(str(tmp_path), trace=True, trace_threshold_ms=60000)
+    old_context, new_context = MagicMock(), MagicMock()
+    for context in (old_context, new_context):
+        context.tracing.start = AsyncMock()
+        context.tracing.stop = AsyncMock()
+
+    session = await profiler.start("MERCHANT_001", old_context)
+    await profiler.save_attempt_trace(session, attempt=0)
+    await profiler.resume_tracing(session, new_context)
+    artifacts = await profiler.finish(session, failed=False)
+
+    old_context.tracing.stop.assert_awaited_once_with(path=artifacts["trace_attempt0"])
+    new_context.tracing.start.assert_awaited_once()
+    new_context.tracing.stop.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_profiled_merchants_run_alone(tmp_path):
+    """Test that a profiled merchant never overlaps another audit while the rest run side by side"""
+    profiler = MerchantProfiler(str(tmp_path), merchant_ids=["MERCHANT_003"])
+    running, overlaps = set(), {}
+
+    async def audit(merchant_id):
+        async with profiler.slot(merchant_id):
+            running.add(merchant_id)
+            overlaps[merchant_id] = max(overlaps.get(merchant_id, 0), len(running))
+            await asyncio.sleep(0.01)
+            overlaps[merchant_id] = max(overlaps[merchant_id], len(running))
+            running.discard(merchant_id)
+
+    await asyncio.gather(*(audit(f"MERCHANT_{i:03d}") for i in range(1, 7)))
+
+    assert overlaps["MERCHANT_003"] == 1
+    assert max(overlaps.values()) > 1
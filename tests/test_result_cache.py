@@ -0,0 +1,92 @@
+"""
+Test for the incremental re-audit result cache
+"""
+import pytest
+from app.core import auditor as auditor_module
+from app.core.auditor import Auditor
+from app.core.host_limiter import HostLimiter
+from app.core.result_cache import (
+    ResultCache, header_fingerprint, html_fingerprint, http_fingerprint, project_modules
+)
+from app.data.merchant_loader import Merchant
+from benchmarks.server import FixtureServer
+from tests.test_retry import FakeBrowser
+
+
+def test_fingerprints_prefer_validators_and_ignore_volatile_html():
+    """Test that validators win and scripts/nonces do not change the HTML hash"""
+    assert header_fingerprint({"ETag": '"abc"', "Last-Modified": "Mon"}) == 'etag:"abc"'
+    assert header_fingerprint({"last-modified": "Mon"}) == "last-modified:Mon"
+    assert header_fingerprint({"content-type": "text/html"}) is None
+
+    first = html_fingerprint('<p>Klarna</p><script nonce="1">t=1</script>')
+    second = html_fingerprint('<p>Klarna</p>\n<script nonce="2">t=2</script>')
+    assert first == second
+    assert html_fingerprint('<p>PayPal</p>') != first
+
+
+def test_cache_hits_only_for_same_page_and_version(tmp_path):
+    """Test that URL, fingerprint and detector version all key the cache"""
+    path = tmp_path / "cache.json"
+    cache = ResultCache(str(path))
+    cache.store("M1", "RULE", "https://shop.dk/", "etag:1", "v1", {"passed": True})
+    cache.save()
+
+    cache = ResultCache(str(path))
+    assert cache.lookup("M1", "RULE", "https://shop.dk/", "etag:1", "v1") == {"passed": True}
+    assert cache.lookup("M1", "RULE", "https://shop.dk/", "etag:2", "v1") is None
+    assert cache.lookup("M1", "RULE", "https://shop.dk/", "etag:1", "v2") is None
+    assert cache.lookup("M1", "RULE", "https://shop.dk/", None, "v1") is None
+    assert cache.summary() == {"hits": 1, "misses": 3, "entries": 1}
+
+
+def test_detector_version_covers_imported_helper_modules():
+    """Test that a check's version follows the helper modules it imports"""
+    from auditor.checks import pdp_osm
+
+    names = [module.__name__ for module in project_modules(pdp_osm)]
+    assert {"auditor.checks.pdp_osm", "auditor.text_search", "auditor.utils", "auditor.navigator"} <= set(names)
+    assert not any(name.split(".")[0] in ("playwright", "asyncio") for name in names)
+
+
+@pytest.mark.asyncio
+async def test_http_fingerprint_goes_through_host_limiter():
+    """Test that the fingerprint fetch fast-fails while the host's circuit is open"""
+    limiter = HostLimiter(failure_threshold=1)
+    limiter.breaker("https://shop.dk/").record_failure()
+
+    assert await http_fingerprint("https://shop.dk/", limiter=limiter) is None
+
+
+@pytest.mark.asyncio
+async def test_http_fingerprint_is_stable_for_unchanged_page():
+    """Test that an unchanged fixture page fingerprints identically"""
+    with FixtureServer() as server:
+        url = server.site_url("klarna_shop")
+        assert await http_fingerprint(url) == await http_fingerprint(url)
+        assert await http_fingerprint(url) != await http_fingerprint(server.site_url("plain_shop"))
+
+
+@pytest.mark.asyncio
+async def test_auditor_reuses_cached_result(monkeypatch, tmp_path):
+    """Test that an unchanged page skips detection and is marked cached"""
+    async def fingerprint(page, headers=None):
+        return "dom:unchanged"
+
+    async def capture_screenshot(self, path):
+        return True
+
+    monkeypatch.setattr(FakeBrowser, "capture_screenshot", capture_screenshot)
+    monkeypatch.setattr(FakeBrowser, "page", None, raising=False)
+    monkeypatch.setattr(FakeBrowser, "last_headers", None, raising=False)
+    monkeypatch.setattr(auditor_module, "BrowserManager", FakeBrowser)
+    monkeypatch.setattr(auditor_module, "page_fingerprint", fingerprint)
+    merchant = Merchant("M1", "Shop", "https://shop.dk", "https://shop.dk")
+    auditor = Auditor(cache=ResultCache())
+
+    [first] = await auditor.audit_merchant(merchant, str(tmp_path))
+    [second] = await auditor.audit_merchant(merchant, str(tmp_path))
+
+    assert not first.cached and second.cached
+    assert second.passed == first.passed
+    assert "page_source" not in FakeBrowser.instances[-1].calls
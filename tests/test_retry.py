@@ -0,0 +1,141 @@
+"""
+Test for stage-level retry, failure classification and detector sharing
+"""
+import random
+import pytest
+from app.core import auditor as auditor_module
+from app.core.auditor import Auditor
+from app.core.retry import FailureKind, NavigationError, backoff_delay, classify_error
+from app.data.merchant_loader import Merchant
+from app.detectors.footer_klarna_logo_detector import DetectionResult, FooterKlarnaLogoDetector
+
+
+def test_classify_error():
+    """Test that errors map to retryable and non-retryable kinds"""
+    assert classify_error(NavigationError("https://shop.dk", status=503)) == FailureKind.TRANSIENT_NETWORK
+    assert classify_error(NavigationError("https://shop.dk", status=429)) == FailureKind.TRANSIENT_NETWORK
+    assert classify_error(NavigationError("https://shop.dk", status=404)) == FailureKind.PERMANENT
+    assert classify_error(TimeoutError()) == FailureKind.TIMEOUT
+    assert classify_error(Exception("net::ERR_NAME_NOT_RESOLVED at https://x.dk")) == FailureKind.PERMANENT
+    assert classify_error(ConnectionResetError()) == FailureKind.TRANSIENT_NETWORK
+    assert classify_error(KeyError("footer")) == FailureKind.DETECTOR_BUG
+
+
+def test_backoff_delay_is_capped_full_jitter():
+    """Test that backoff grows exponentially within the cap"""
+    rng = random.Random(0)
+    for attempt in range(8):
+        delay = backoff_delay(attempt, base=1.0, cap=5.0, rng=rng)
+        assert 0 <= delay <= min(5.0, 2 ** attempt)
+
+
+class FakeBrowser:
+    """BrowserManager stand-in failing the first screenshot"""
+    instances = []
+
+    def __init__(self, headless=True, timeout=30000, limiter=None):
+        self.context = None
+        self.last_error = None
+        self.last_goto_ms = None
+        self.calls = []
+        self.screenshot_failures = 1
+        FakeBrowser.instances.append(self)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+    async def navigate(self, url, wait_time=5000, timeout=None):
+        self.calls.append("navigate")
+        return True
+
+    async def get_page_source_view(self):
+        self.calls.append("page_source")
+        return "<footer>klarna</footer>"
+
+    async def find_elements(self, selector):
+        return []
+
+    async def capture_screenshot(self, path):
+        self.calls.append("screenshot")
+        if self.screenshot_failures:
+            self.screenshot_failures -= 1
+            self.last_error = ConnectionResetError("connection reset")
+            return False
+        return True
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_from_failed_stage(monkeypatch, tmp_path):
+    """Test that a transient screenshot failure does not redo navigation"""
+    monkeypatch.setattr(auditor_module, "BrowserManager", FakeBrowser)
+    monkeypatch.setattr(auditor_module, "backoff_delay", lambda attempt, base: 0)
+    merchant = Merchant("M1", "Shop", "https://shop.dk", "https://shop.dk")
+
+    [result] = await Auditor(max_retries=2).audit_merchant(merchant, str(tmp_path))
+
+    browser = FakeBrowser.instances[-1]
+    assert result.audit_status == "completed"
+    assert result.attempts == 2
+    assert browser.calls.count("navigate") == 1
+    assert browser.calls.count("screenshot") == 2
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_is_not_retried(monkeypatch, tmp_path):
+    """Test that HTTP 404 fails immediately with its failure kind"""
+    async def not_found(self, url, wait_time=5000, timeout=None):
+        self.last_error = NavigationError(url, status=404)
+        return False
+
+    monkeypatch.setattr(FakeBrowser, "navigate", not_found)
+    monkeypatch.setattr(auditor_module, "BrowserManager", FakeBrowser)
+    merchant = Merchant("M2", "Shop", "https://shop.dk", "https://shop.dk")
+
+    [result] = await Auditor(max_retries=2).audit_merchant(merchant, str(tmp_path))
+
+    assert result.audit_status == "failed"
+    assert result.failure_kind == "permanent"
+    assert result.attempts == 1
+
+
+class TwoRuleDetector:
+    """Detector reporting two rules from one call"""
+    rules = [("OSM_BANNER", "Detect OSM banner"), ("NO_AFTERPAY", "No Afterpay badge")]
+
+    def __init__(self):
+        self.calls = 0
+
+    async def detect(self, page_source, browser_manager):
+        self.calls += 1
+        return [
+            DetectionResult("OSM_BANNER", True, True, True, 0.95, ["selector:klarna-placement (1)"], "found"),
+            DetectionResult("NO_AFTERPAY", False, False, True, 0.95, ["selector:.afterpay (1)"], "found"),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_detectors_share_one_navigation(monkeypatch, tmp_path):
+    """Test that all rules of a merchant cost one navigation and one page source"""
+    monkeypatch.setattr(auditor_module, "BrowserManager", FakeBrowser)
+    monkeypatch.setattr(auditor_module, "backoff_delay", lambda attempt, base: 0)
+    merchant = Merchant("M3", "Shop", "https://shop.dk", "https://shop.dk")
+    extra = TwoRuleDetector()
+
+    results = await Auditor(detectors=[FooterKlarnaLogoDetector(), extra]).audit_merchant(merchant, str(tmp_path))
+
+    browser = FakeBrowser.instances[-1]
+    assert [r.rule_id for r in results] == ["FOOTER_KLARNA_LOGO", "OSM_BANNER", "NO_AFTERPAY"]
+    assert [r.passed for r in results] == [True, True, False]
+    assert browser.calls.count("navigate") == 1
+    assert browser.calls.count("page_source") == 1
+    assert extra.calls == 1
+    assert len({r.screenshot_path for r in results}) == 1
+
+    with pytest.raises(ValueError):
+        Auditor(detectors=[FooterKlarnaLogoDetector(), FooterKlarnaLogoDetector()])
@@ -0,0 +1,191 @@
+"""
+Test for the declarative rule engine
+"""
+import pytest
+from app.core.result_cache import detector_version
+from app.core.rule_engine import EVALUATOR_JS, RuleEngine, RuleSetDetector
+from app.data.rule_loader import RuleLoader
+
+
+def footer_rule(**overrides):
+    rule = {
+        "rule_id": "FOOTER_KLARNA_LOGO",
+        "description": "Detect Klarna logo in footer",
+        "severity": "medium",
+        "page_type": "homepage",
+        "detection": {
+            "type": "any",
+            "conditions": [
+                {"type": "keyword", "selector": "footer", "keywords": ["Klarna"]},
+                {"type": "attribute", "selector": "footer img, [class*='footer'] img", "attributes": ["alt", "src"], "pattern": "klarna"},
+            ],
+        },
+    }
+    rule.update(overrides)
+    return rule
+
+
+class FakeFrame:
+    """Frame returning canned outcomes and recording evaluations"""
+
+    def __init__(self, outcomes, url="https://shop.dk/"):
+        self.outcomes = outcomes
+        self.url = url
+        self.plans = []
+
+    async def evaluate(self, script, plan):
+        assert script == EVALUATOR_JS
+        self.plans.append(plan)
+        return [dict(self.outcomes[p["id"]], id=p["id"]) for p in plan]
+
+
+class FakePage(FakeFrame):
+    def __init__(self, outcomes, child_frames=()):
+        super().__init__(outcomes)
+        self.main_frame = self
+        self.frames = [self] + list(child_frames)
+
+
+def test_validate_rule_reports_errors():
+    """Test that invalid rules are rejected with readable errors"""
+    assert RuleLoader.validate_rule(footer_rule()) == (True, [])
+
+    valid, errors = RuleLoader.validate_rule(footer_rule(
+        page_type="blog",
+        detection={"type": "any", "frames": "some", "conditions": [{"type": "network"}]}
+    ))
+    assert not valid
+    assert any("page_type" in e for e in errors)
+    assert any("conditions[0].type" in e for e in errors)
+    assert any("frames" in e for e in errors)
+
+    with pytest.raises(ValueError):
+        RuleLoader.parse_rule(footer_rule(detection={"type": "selector"}))
+
+
+def test_validate_rule_rejects_unusable_patterns():
+    """Test that attribute patterns must compile and be portable to JavaScript"""
+    for pattern in ["(klarna", "(?P<brand>klarna)", "(?i)klarna"]:
+        valid, errors = RuleLoader.validate_rule(footer_rule(
+            detection={"type": "attribute", "selector": "img", "attributes": ["alt"], "pattern": pattern}
+        ))
+        assert not valid and any("pattern" in e for e in errors), pattern
+
+
+@pytest.mark.asyncio
+async def test_rule_error_fails_only_that_rule():
+    """Test that a rule throwing in the page yields an error result for itself only"""
+    engine = RuleEngine([
+        RuleLoader.parse_rule(footer_rule()),
+        RuleLoader.parse_rule(footer_rule(
+            rule_id="BROKEN",
+            detection={"type": "attribute", "selector": "img", "attributes": ["alt"], "pattern": "klarna"}
+        )),
+    ])
+    page = FakePage({
+        "FOOTER_KLARNA_LOGO": {"found": True, "evidence": ["keyword:klarna"]},
+        "BROKEN": {"found": False, "evidence": [], "error": "SyntaxError: Invalid regular expression"},
+    })
+
+    results = await engine.evaluate(page, "homepage")
+
+    assert results[0].passed
+    assert not results[1].passed and "rule error" in results[1].message
+
+
+def test_load_from_directory(tmp_path):
+    """Test that the shipped rule files load and compile"""
+    rules = RuleLoader.load_from_directory("configs/rules")
+    engine = RuleEngine(rules)
+
+    assert "FOOTER_KLARNA_LOGO" in [r.rule_id for r in engine.match_rules("homepage")]
+    for page_type in ("homepage", "product", "cart", "checkout"):
+        assert engine.compile(page_type)[1]
+
+    (tmp_path / "a.yaml").write_text("rules:\n  - rule_id: X\n    description: x\n    page_type: all\n"
+                                     "    detection: {type: selector, selector: footer}\n")
+    (tmp_path / "b.yaml").write_text((tmp_path / "a.yaml").read_text())
+    with pytest.raises(ValueError, match="duplicate"):
+        RuleLoader.load_from_directory(str(tmp_path))
+
+
+def test_compile_folds_keywords_and_is_cached():
+    """Test that plans are built once per page type"""
+    engine = RuleEngine([
+        RuleLoader.parse_rule(footer_rule()),
+        RuleLoader.parse_rule(footer_rule(rule_id="DISABLED", enabled=False)),
+        RuleLoader.parse_rule(footer_rule(rule_id="CART_ONLY", page_type="cart")),
+    ])
+
+    rules, plan, frame_plan = engine.compile("homepage")
+
+    assert [r.rule_id for r in rules] == ["FOOTER_KLARNA_LOGO"]
+    assert plan[0]["cond"]["c"][0]["k"] == ["klarna"]
+    assert frame_plan == []
+    assert engine.compile("homepage")[1] is plan
+
+
+@pytest.mark.asyncio
+async def test_all_rules_evaluated_in_one_call():
+    """Test that every rule of a page is evaluated in a single page evaluation"""
+    engine = RuleEngine([
+        RuleLoader.parse_rule(footer_rule()),
+        RuleLoader.parse_rule(footer_rule(
+            rule_id="NO_AFTERPAY",
+            description="No Afterpay badge",
+            page_type="all",
+            detection={"type": "selector", "selector": ".afterpay", "expected": False}
+        )),
+    ])
+    page = FakePage({
+        "FOOTER_KLARNA_LOGO": {"found": True, "evidence": ["keyword:klarna", "img[alt=Klarna]"]},
+        "NO_AFTERPAY": {"found": False, "evidence": []},
+    })
+
+    results = await engine.evaluate(page, "homepage")
+
+    assert len(page.plans) == 1
+    assert [r.rule_id for r in results] == ["FOOTER_KLARNA_LOGO", "NO_AFTERPAY"]
+    assert results[0].passed and results[0].confidence == 1.0
+    assert results[1].passed and not results[1].actual
+
+
+@pytest.mark.asyncio
+async def test_frame_scoped_rules_search_child_frames():
+    """Test that only frames: all rules are evaluated in child frames"""
+    engine = RuleEngine([
+        RuleLoader.parse_rule(footer_rule()),
+        RuleLoader.parse_rule(footer_rule(
+            rule_id="PDP_KLARNA_OSM",
+            page_type="homepage",
+            detection={"type": "selector", "selector": "klarna-placement", "frames": "all"}
+        )),
+    ])
+    child = FakeFrame(
+        {"PDP_KLARNA_OSM": {"found": True, "evidence": ["selector:klarna-placement (1)"]}},
+        url="https://js.klarna.com/web-sdk/osm.html"
+    )
+    ad = FakeFrame({}, url="https://googleads.g.doubleclick.net/pagead/ads")
+    page = FakePage({
+        "FOOTER_KLARNA_LOGO": {"found": False, "evidence": []},
+        "PDP_KLARNA_OSM": {"found": False, "evidence": []},
+    }, child_frames=[child, ad])
+
+    results = await engine.evaluate(page, "homepage")
+
+    assert [p["id"] for p in child.plans[0]] == ["PDP_KLARNA_OSM"]
+    assert ad.plans == []
+    assert not results[0].passed
+    assert results[1].passed
+    assert results[1].matched_selectors == ["frame:selector:klarna-placement (1)"]
+
+
+def test_rule_set_detector_version_follows_rules():
+    """Test that editing a rule changes the cache version of the rule set"""
+    first = RuleSetDetector(RuleEngine([RuleLoader.parse_rule(footer_rule())]))
+    edited = RuleSetDetector(RuleEngine([RuleLoader.parse_rule(footer_rule(
+        detection={"type": "selector", "selector": "footer img[alt*='Klarna']"}
+    ))]))
+
+    assert first.rules == [("FOOTER_KLARNA_LOGO", "Detect Klarna logo in footer")]
+    assert detector_version(first) != detector_version(edited)
@@ -0,0 +1,70 @@
+"""
+Test for the synthetic storefront generator
+"""
+import csv
+import json
+from app.data.merchant_loader import MerchantLoader
+from benchmarks.synthetic import GeneratorConfig, generate_storefronts
+
+
+def test_generator_emits_loadable_registry(tmp_path):
+    """Test that the generated registry loads with MerchantLoader and matches the shops"""
+    specs = generate_storefronts(str(tmp_path), 12, "http://127.0.0.1:8765", seed=7)
+
+    merchants = MerchantLoader.load(str(tmp_path / "merchant_registry.csv"))
+
+    assert len(merchants) == 12
+    assert len({m.base_url for m in merchants}) == 12
+    for merchant, spec in zip(merchants, specs):
+        assert merchant.base_url == f"http://127.0.0.1:8765/{spec.shop_id}/"
+        assert (tmp_path / spec.shop_id / spec.product_path / "index.html").exists()
+
+
+def test_generator_is_deterministic_per_seed(tmp_path):
+    """Test that the same seed yields the same shops"""
+    first = generate_storefronts(str(tmp_path / "a"), 20, "http://localhost", seed=3)
+    second = generate_storefronts(str(tmp_path / "b"), 20, "http://localhost", seed=3)
+
+    assert [s.placement for s in first] == [s.placement for s in second]
+    assert [s.dialect for s in first] == [s.dialect for s in second]
+
+
+def test_generator_renders_klarna_placement_and_iframe_depth(tmp_path):
+    """Test that placements and iframe nesting follow the config"""
+    config = GeneratorConfig(dialects=["sv"], placements=["full"], max_iframe_depth=3, page_weight_kb=(1, 1))
+    specs = generate_storefronts(str(tmp_path), 5, "http://localhost", config, seed=1)
+
+    for spec in specs:
+        shop_dir = tmp_path / spec.shop_id
+        pdp = (shop_dir / spec.product_path / "index.html").read_text(encoding="utf-8")
+        checkout = (shop_dir / "checkout" / "index.html").read_text(encoding="utf-8")
+        assert "Lägg i varukorg" in pdp
+        assert spec.expected == {
+            "FOOTER_KLARNA_LOGO": True,
+            "PDP_OSM": True,
+            "CART_KLARNA": True,
+            "CHECKOUT_PAYMENT_POSITION": True,
+        }
+        assert spec.payment_methods[spec.klarna_position - 1] == "Klarna"
+        assert "Klarna" in checkout
+        assert len(list((shop_dir / "osm").glob("frame_*.html"))) == spec.iframe_depth
+
+    saved = json.loads((tmp_path / "shops.json").read_text(encoding="utf-8"))
+    assert [s["shop_id"] for s in saved] == [s.shop_id for s in specs]
+
+
+def test_generator_keeps_footer_text_off_the_cart_page(tmp_path):
+    """Test that a footer-only placement does not put Klarna on pages whose checks expect none"""
+    config = GeneratorConfig(dialects=["sv"], placements=["footer_text"], page_weight_kb=(1, 1))
+    specs = generate_storefronts(str(tmp_path), 3, "http://localhost", config, seed=2)
+
+    for spec in specs:
+        shop_dir = tmp_path / spec.shop_id
+        home = (shop_dir / "index.html").read_text(encoding="utf-8")
+        cart = (shop_dir / "cart" / "index.html").read_text(encoding="utf-8")
+        pdp = (shop_dir / spec.product_path / "index.html").read_text(encoding="utf-8")
+        assert "klarna" in home.lower()
+        assert "klarna" not in cart.lower()
+        assert "klarna" not in pdp.lower()
+        assert spec.expected["CART_KLARNA"] is False
+        assert spec.expected["PDP_OSM"] is False
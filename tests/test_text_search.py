@@ -0,0 +1,81 @@
+"""
+Test for the in-page keyword search
+"""
+import pytest
+from auditor.checks.cart_klarna import CartKlarnaCheck
+from auditor.checks.pdp_osm import PDPOSMCheck
+from auditor.text_search import KEYWORD_SEARCH_SCRIPT, find_keywords
+
+
+class FakePage:
+    """Page answering the search script with canned hits"""
+
+    def __init__(self, hits=(), error=None, url="https://shop.dk/p/1", frames=()):
+        self.hits = list(hits)
+        self.error = error
+        self.args = []
+        self.url = url
+        self.main_frame = self
+        self.frames = [self] + list(frames)
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def evaluate(self, script, arg):
+        assert script == KEYWORD_SEARCH_SCRIPT
+        self.args.append(arg)
+        if self.error:
+            raise self.error
+        return self.hits[:arg["limit"]]
+
+
+@pytest.mark.asyncio
+async def test_only_hits_cross_the_wire():
+    """Test that the search returns hits and asks for an early exit when limited"""
+    page = FakePage([
+        {"keyword": "Klarna", "path": "div.osm > span", "snippet": "Betal med Klarna"},
+        {"keyword": "Del op", "path": "div.osm > p", "snippet": "Del op i 3"},
+    ])
+
+    hits = await find_keywords(page, ["Klarna", "Del op", "Pay in 3"])
+    first = await find_keywords(page, ["Klarna", "Del op"], limit=1)
+
+    assert [h.keyword for h in hits] == ["Klarna", "Del op"]
+    assert hits[0].path == "div.osm > span"
+    assert page.args[0]["limit"] == 3 and page.args[1]["limit"] == 1
+    assert [h.keyword for h in first] == ["Klarna"]
+
+
+@pytest.mark.asyncio
+async def test_search_failures_are_no_hits():
+    """Test that a page that cannot be searched yields no hits"""
+    assert await find_keywords(FakePage(error=RuntimeError("detached")), ["Klarna"]) == []
+    assert await find_keywords(FakePage(), []) == []
+
+
+@pytest.mark.asyncio
+async def test_cart_klarna_uses_snippet_as_context():
+    """Test that the cart check reports the snippet around the match"""
+    page = FakePage([{"keyword": "klarna", "path": "div.totals", "snippet": "Betal senere med Klarna"}])
+
+    assert await CartKlarnaCheck().detect_klarna_in_cart(page) == (True, "Betal senere med Klarna")
+    assert page.args[0]["limit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_osm_search_is_scoped_to_klarna_containers():
+    """Test that generic keywords only count inside OSM containers, except in Klarna frames"""
+    klarna_frame = FakePage([{"keyword": "Kort", "path": "div", "snippet": "Kort"}],
+                            url="https://js.klarna.com/web-sdk/osm.html")
+    shop_frame = FakePage(url="https://shop.dk/widget")
+    page = FakePage([{"keyword": "Klarna", "path": "div.klarna-osm", "snippet": "Klarna"}],
+                    frames=[klarna_frame, shop_frame])
+
+    found, keywords = await PDPOSMCheck().detect_osm_keywords(page)
+
+    assert found and keywords == ["Klarna", "Kort"]
+    assert page.args[0]["selector"] == PDPOSMCheck.OSM_CONTAINER_SELECTOR
+    assert shop_frame.args[0]["selector"] == PDPOSMCheck.OSM_CONTAINER_SELECTOR
+    assert klarna_frame.args[0]["selector"] is None
+    assert page.args[0]["limit"] == len(PDPOSMCheck.KEYWORDS)
+    assert klarna_frame.args[0]["limit"] == len(PDPOSMCheck.KEYWORDS) - 1
@@ -0,0 +1,83 @@
+"""
+Test for adaptive per-domain timeouts
+"""
+import pytest
+from app.utils.timeouts import AdaptiveTimeouts, LatencyHistory
+
+
+def test_new_domain_falls_back_to_default():
+    """Test that domains without enough history use the default timeout"""
+    timeouts = AdaptiveTimeouts(LatencyHistory(), min_samples=5)
+    for _ in range(4):
+        timeouts.record("https://www.shop.dk/", "goto", 200)
+
+    assert timeouts.timeout("https://shop.dk/cart", "goto", 10000) == 10000
+
+
+def test_timeout_is_quantile_times_factor_clamped():
+    """Test that learned timeouts follow p99 x factor within min/max"""
+    timeouts = AdaptiveTimeouts(LatencyHistory(), factor=3.0, min_ms=1000, max_ms=20000, min_samples=3)
+    for latency in [300, 400, 500]:
+        timeouts.record("https://fast.dk/", "goto", latency)
+    for latency in [100, 120, 150]:
+        timeouts.record("https://fast.dk/", "ready_selector", latency)
+    for latency in [9000, 12000, 15000]:
+        timeouts.record("https://slow.dk/", "goto", latency)
+
+    assert timeouts.timeout("https://fast.dk/", "goto", 10000) == 1500
+    assert timeouts.timeout("https://fast.dk/", "ready_selector", 3000) == 1000  # clamped to min
+    assert timeouts.timeout("https://slow.dk/", "goto", 10000) == 20000  # clamped to max
+
+
+def test_measure_records_timeouts_as_censored_samples():
+    """Test that timed-out steps record their timeout and other failures record nothing"""
+    history = LatencyHistory()
+    timeouts = AdaptiveTimeouts(history)
+
+    with timeouts.measure("https://shop.dk/", "goto", timeout_ms=2000):
+        pass
+    with pytest.raises(TimeoutError):
+        with timeouts.measure("https://shop.dk/", "goto", timeout_ms=2000):
+            raise TimeoutError()
+    with pytest.raises(ValueError):
+        with timeouts.measure("https://shop.dk/", "goto", timeout_ms=2000):
+            raise ValueError()
+    with pytest.raises(TimeoutError):
+        with timeouts.measure("https://shop.dk/", "ready_selector"):
+            raise TimeoutError()
+
+    samples = history.samples("shop.dk", "goto")
+    assert len(samples) == 2 and samples[1] == 2000
+    assert history.samples("shop.dk", "ready_selector") == []
+
+
+def test_timeout_grows_back_when_domain_gets_slower():
+    """Test that a domain that slows past its learned timeout gets a longer one"""
+    history = LatencyHistory(max_samples=10)
+    timeouts = AdaptiveTimeouts(history, min_samples=5, max_ms=60000)
+    url = "https://shop.dk/"
+    for _ in range(10):
+        timeouts.record(url, "goto", 500)
+    assert timeouts.timeout(url, "goto", 10000) == 1500
+
+    # The shop now needs ~4 s: every attempt hits the learned timeout
+    for _ in range(3):
+        current = timeouts.timeout(url, "goto", 10000)
+        with pytest.raises(TimeoutError):
+            with timeouts.measure(url, "goto", timeout_ms=current):
+                raise TimeoutError()
+
+    assert timeouts.timeout(url, "goto", 10000) > 4000
+
+
+def test_history_persists_and_keeps_recent_samples(tmp_path):
+    """Test that history round-trips through JSON and is bounded"""
+    path = tmp_path / "latency.json"
+    history = LatencyHistory(str(path), max_samples=3)
+    for latency in [1, 2, 3, 4, 5]:
+        history.record("shop.dk", "goto", latency)
+    history.save()
+
+    reloaded = LatencyHistory(str(path), max_samples=3)
+
+    assert reloaded.samples("shop.dk", "goto") == [3, 4, 5]